@@ -0,0 +1,198 @@
+import os
+import bisect
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from caching import normalize_query
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Upper edges (seconds) of the search_time histogram buckets; the last one is open-ended
+LATENCY_EDGES = (0.25, 0.5, 1, 1.5, 2, 3, 4, 5, 7.5, 10, 15, 20, 30, 60)
+
+
+def bucket_start(when: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return when.replace(minute=0, second=0, microsecond=0)
+    return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def latency_bucket(search_time: float) -> int:
+    return bisect.bisect_left(LATENCY_EDGES, search_time)
+
+
+def histogram_percentile(histogram: Dict[str, int], percentile: float) -> Optional[float]:
+    """Percentile estimated from bucket counts, interpolating inside the bucket"""
+    counts = [histogram.get(str(i), 0) for i in range(len(LATENCY_EDGES) + 1)]
+    total = sum(counts)
+    if not total:
+        return None
+    target = percentile * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if count and seen + count >= target:
+            low = LATENCY_EDGES[i - 1] if i > 0 else 0.0
+            high = LATENCY_EDGES[i] if i < len(LATENCY_EDGES) else LATENCY_EDGES[-1] * 2
+            return round(low + (high - low) * (target - seen) / count, 3)
+        seen += count
+    return None
+
+
+class SearchAnalytics:
+    """Hourly and daily rollups of search history, updated as records are written.
+
+    Each flushed batch of search records becomes one $inc upsert per
+    (granularity, bucket) in `rollups`, holding counts, sums and a
+    search_time histogram, plus per-day query counts in `query_counts`.
+    Reports read only these documents, so their cost depends on the number
+    of buckets asked for, not on traffic. Hourly buckets expire after
+    ANALYTICS_HOURLY_RETENTION_DAYS; daily buckets are kept.
+
+    Raw search_history is kept unless SEARCH_HISTORY_TTL_DAYS is set. The
+    rollups only cover records written since they were introduced, so
+    setting it deletes older history that no rollup has counted.
+    """
+
+    def __init__(self, rollups, query_counts, history_ttl_days: float = None,
+                 hourly_retention_days: float = None):
+        self.rollups = rollups
+        self.query_counts = query_counts
+        self.history_ttl_days = history_ttl_days if history_ttl_days is not None else float(
+            os.environ.get('SEARCH_HISTORY_TTL_DAYS') or 0)
+        self.hourly_retention_days = hourly_retention_days or float(
+            os.environ.get('ANALYTICS_HOURLY_RETENTION_DAYS', 30))
+
+        self.records_applied = 0
+        self.apply_errors = 0
+
+    async def ensure_indexes(self, history_collection):
+        await self.rollups.create_index([("granularity", 1), ("bucket", 1)])
+        await self.rollups.create_index("expires_at", expireAfterSeconds=0)
+        await self.query_counts.create_index([("day", 1), ("count", -1)])
+        if self.history_ttl_days > 0:
+            # Raw history ages out; the rollups keep the aggregates
+            await history_collection.create_index(
+                "timestamp", expireAfterSeconds=int(self.history_ttl_days * 86400)
+            )
+
+    @staticmethod
+    def _field_key(value: str) -> str:
+        # Mongo field names may not contain '.' or start with '$'
+        return value.replace('.', '_').lstrip('$') or '_'
+
+    def _rollup_updates(self, records: Iterable[Dict[str, Any]]) -> Tuple[List[UpdateOne], List[UpdateOne]]:
+        increments: Dict[Tuple[str, datetime], Dict[str, float]] = {}
+        queries: Dict[Tuple[datetime, str], int] = {}
+        for record in records:
+            timestamp = record.get("timestamp")
+            if not isinstance(timestamp, datetime):
+                continue
+            results = record.get("results_count") or 0
+            google = record.get("google_results") or 0
+            search_time = record.get("search_time") or 0.0
+            fields = {
+                "searches": 1,
+                "zero_results": 1 if results == 0 else 0,
+                "results_total": results,
+                "google_results_total": google,
+                "search_time_total": search_time,
+                f"latency_histogram.{latency_bucket(search_time)}": 1
+            }
+            for source in record.get("sources_used") or []:
+                fields[f"sources.{self._field_key(source)}"] = 1
+            for granularity in GRANULARITIES:
+                bucket = increments.setdefault((granularity, bucket_start(timestamp, granularity)), {})
+                for field, value in fields.items():
+                    bucket[field] = bucket.get(field, 0) + value
+
+            query = normalize_query(record.get("original_query", ""))
+            if query:
+                key = (bucket_start(timestamp, "day"), query)
+                queries[key] = queries.get(key, 0) + 1
+
+        updates = []
+        for (granularity, bucket), inc in increments.items():
+            on_insert: Dict[str, Any] = {"granularity": granularity, "bucket": bucket}
+            if granularity == "hour":
+                on_insert["expires_at"] = bucket + timedelta(days=self.hourly_retention_days)
+            updates.append(UpdateOne(
+                {"_id": f"{granularity}:{bucket.isoformat()}"},
+                {"$inc": inc, "$setOnInsert": on_insert},
+                upsert=True
+            ))
+        query_updates = [
+            UpdateOne({"_id": f"{day.date().isoformat()}:{query}"},
+                      {"$inc": {"count": count}, "$setOnInsert": {"day": day, "query": query}},
+                      upsert=True)
+            for (day, query), count in queries.items()
+        ]
+        return updates, query_updates
+
+    async def apply(self, records: List[Dict[str, Any]]):
+        """Fold a batch of written search records into the rollups (write-behind flush hook)"""
+        updates, query_updates = self._rollup_updates(records)
+        try:
+            if updates:
+                await self.rollups.bulk_write(updates, ordered=False)
+            if query_updates:
+                await self.query_counts.bulk_write(query_updates, ordered=False)
+            self.records_applied += len(records)
+        except Exception as e:
+            self.apply_errors += 1
+            logger.error(f"Error updating search analytics rollups: {e}")
+
+    async def report(self, granularity: str, since: datetime, until: datetime, top_queries: int = 10) -> Dict[str, Any]:
+        """Per-bucket metrics and totals for [since, until), read from the rollups only"""
+        docs = await self.rollups.find(
+            {"granularity": granularity, "bucket": {"$gte": bucket_start(since, granularity), "$lt": until}},
+            {"_id": 0, "expires_at": 0}
+        ).sort("bucket", 1).to_list(None)
+
+        totals: Dict[str, Any] = {"latency_histogram": {}, "sources": {}}
+        buckets = []
+        for doc in docs:
+            buckets.append({"bucket": doc["bucket"], **self._metrics(doc)})
+            for field in ("searches", "zero_results", "results_total", "google_results_total", "search_time_total"):
+                totals[field] = totals.get(field, 0) + doc.get(field, 0)
+            for group in ("latency_histogram", "sources"):
+                for key, count in (doc.get(group) or {}).items():
+                    totals[group][key] = totals[group].get(key, 0) + count
+
+        top = await self.query_counts.aggregate([
+            {"$match": {"day": {"$gte": bucket_start(since, "day"), "$lt": until}}},
+            {"$group": {"_id": "$query", "count": {"$sum": "$count"}}},
+            {"$sort": {"count": -1}},
+            {"$limit": top_queries}
+        ]).to_list(None)
+
+        return {
+            "granularity": granularity,
+            "since": since,
+            "until": until,
+            "totals": {**self._metrics(totals), "sources": totals["sources"]},
+            "top_queries": [{"query": row["_id"], "count": row["count"]} for row in top],
+            "buckets": buckets
+        }
+
+    @staticmethod
+    def _metrics(doc: Dict[str, Any]) -> Dict[str, Any]:
+        searches = doc.get("searches", 0)
+        results = doc.get("results_total", 0)
+        histogram = doc.get("latency_histogram") or {}
+        return {
+            "searches": searches,
+            "zero_result_rate": round(doc.get("zero_results", 0) / searches, 4) if searches else None,
+            "avg_results": round(results / searches, 2) if searches else None,
+            "google_share": round(doc.get("google_results_total", 0) / results, 4) if results else None,
+            "search_time_avg": round(doc.get("search_time_total", 0) / searches, 3) if searches else None,
+            "search_time_p50": histogram_percentile(histogram, 0.5),
+            "search_time_p95": histogram_percentile(histogram, 0.95)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"records_applied": self.records_applied, "apply_errors": self.apply_errors}
@@ -0,0 +1,80 @@
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+ARXIV = '{http://arxiv.org/schemas/atom}'
+OPENSEARCH = '{http://a9.com/-/spec/opensearch/1.1/}'
+
+_ENTRY = ATOM + 'entry'
+_TOTAL_RESULTS = OPENSEARCH + 'totalResults'
+
+
+class ArxivFeedParser:
+    """Incremental parser for arXiv Atom feeds.
+
+    feed() takes the response body a chunk at a time (bytes or str) and
+    returns the entries completed by that chunk as plain dicts. Every entry
+    is read in one pass over its children and then cleared from the tree,
+    so memory stays flat however large the feed is, and no single call holds
+    the event loop for longer than its chunk takes to parse.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._root: Optional[ET.Element] = None
+        self.total_results: Optional[int] = None
+        self.entries = 0
+
+    def feed(self, chunk: Union[bytes, str]) -> List[Dict[str, Any]]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[Dict[str, Any]]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        entries = []
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = element
+                continue
+            if element.tag == _ENTRY:
+                entries.append(self._entry(element))
+                # Drop the finished entry (and anything before it) from the tree
+                self._root.clear()
+            elif element.tag == _TOTAL_RESULTS and element.text:
+                try:
+                    self.total_results = int(element.text)
+                except ValueError:
+                    pass
+        self.entries += len(entries)
+        return entries
+
+    @staticmethod
+    def _entry(entry: ET.Element) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {'title': None, 'summary': None, 'published': None, 'pdf_url': None, 'doi': None}
+        for child in entry:
+            tag = child.tag
+            if tag == ATOM + 'title':
+                fields['title'] = child.text
+            elif tag == ATOM + 'summary':
+                fields['summary'] = child.text
+            elif tag == ATOM + 'published':
+                fields['published'] = child.text
+            elif tag == ATOM + 'link':
+                if fields['pdf_url'] is None and child.get('type') == 'application/pdf':
+                    fields['pdf_url'] = child.get('href')
+            elif tag == ARXIV + 'doi':
+                fields['doi'] = child.text
+        return fields
+
+
+def parse_feed(xml_data: Union[bytes, str]) -> List[Dict[str, Any]]:
+    """All entries of a complete feed"""
+    parser = ArxivFeedParser()
+    return parser.feed(xml_data) + parser.close()
@@ -0,0 +1,201 @@
+import os
+import math
+import heapq
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from caching import normalize_query
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(2020, 1, 1)
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Best (score, query) pairs completing this prefix, highest first
+        self.top: List[Tuple[float, str]] = []
+
+
+class AutocompleteIndex:
+    """In-memory type-ahead over past search queries.
+
+    Queries live in a character trie and every node keeps its own top-K
+    completions, so a lookup is one walk down the prefix and no scan.
+
+    Scores combine frequency and recency in log space: each search adds
+    exp(t / tau) to its query's weight (kept as a log via logaddexp), so a
+    search counts half as much as one made half_life_days later, and stored
+    scores never need decaying. Because scores only grow, updating the top-K
+    lists along one query's path keeps every node exact.
+
+    The index holds about `max_queries` queries. Once new queries push it
+    `rebuild_slack` past that, a fresh trie of the best-scoring max_queries
+    is built in a worker thread and swapped in; searches recorded meanwhile
+    are replayed onto it. Dropping single queries instead would leave holes
+    in the top-K lists that only a rescan of the subtree could fill.
+    """
+
+    def __init__(self, top_k: int = None, half_life_days: float = None, max_depth: int = None,
+                 max_query_length: int = 100, max_queries: int = None, rebuild_slack: float = 0.25):
+        self.top_k = top_k or int(os.environ.get('AUTOCOMPLETE_TOP_K', 10))
+        half_life = half_life_days or float(os.environ.get('AUTOCOMPLETE_HALF_LIFE_DAYS', 14))
+        self.tau = half_life * 86400 / math.log(2)
+        # Prefixes longer than this share the deepest node's completions
+        self.max_depth = max_depth or int(os.environ.get('AUTOCOMPLETE_MAX_DEPTH', 40))
+        self.max_query_length = max_query_length
+        self.history_days = int(os.environ.get('AUTOCOMPLETE_HISTORY_DAYS', 180))
+        self.max_queries = max_queries or int(os.environ.get('AUTOCOMPLETE_MAX_QUERIES', 20000))
+        self.rebuild_slack = rebuild_slack
+
+        self._root = _Node()
+        self._scores: Dict[str, float] = {}
+        self.nodes = 1
+        self.lookups = 0
+        self.rebuilds = 0
+        self.loaded = False
+        # Queries recorded while a rebuild runs, replayed onto the new trie
+        self._recorded_during_rebuild: Optional[set] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+    def _time_score(self, when: Optional[datetime]) -> float:
+        return ((when or datetime.utcnow()) - _EPOCH).total_seconds() / self.tau
+
+    def record(self, query: str, when: Optional[datetime] = None, count: int = 1):
+        """Count `count` searches for query made at `when` (default now)"""
+        query = normalize_query(query)
+        if not query or len(query) > self.max_query_length:
+            return
+        added = math.log(count) + self._time_score(when)
+        previous = self._scores.get(query)
+        score = added if previous is None else _logaddexp(previous, added)
+        self._scores[query] = score
+        self.nodes += self._insert(self._root, query, score)
+
+        if self._recorded_during_rebuild is not None:
+            self._recorded_during_rebuild.add(query)
+        elif len(self._scores) > self.max_queries * (1 + self.rebuild_slack):
+            self._start_rebuild()
+
+    def _insert(self, root: _Node, query: str, score: float) -> int:
+        """Put query on its path under root; returns the number of nodes created"""
+        created = 0
+        node = root
+        for char in query[:self.max_depth]:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+                created += 1
+            node = child
+            self._update_top(node, query, score)
+        return created
+
+    def _build(self, entries: List[Tuple[str, float]]) -> Tuple[_Node, int]:
+        root = _Node()
+        nodes = 1
+        for query, score in entries:
+            nodes += self._insert(root, query, score)
+        return root, nodes
+
+    def _start_rebuild(self):
+        entries = heapq.nlargest(self.max_queries, self._scores.items(), key=lambda item: item[1])
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, tests): rebuild in place
+            self._finish_rebuild(entries, *self._build(entries))
+            return
+        self._recorded_during_rebuild = set()
+        self._rebuild_task = loop.create_task(self._rebuild(entries))
+
+    async def _rebuild(self, entries: List[Tuple[str, float]]):
+        try:
+            root, nodes = await asyncio.to_thread(self._build, entries)
+        except Exception as e:
+            logger.error(f"Error rebuilding autocomplete index: {e}")
+            self._recorded_during_rebuild = None
+            return
+        self._finish_rebuild(entries, root, nodes)
+
+    def _finish_rebuild(self, entries: List[Tuple[str, float]], root: _Node, nodes: int):
+        scores = dict(entries)
+        for query in self._recorded_during_rebuild or ():
+            scores[query] = self._scores[query]
+            nodes += self._insert(root, query, scores[query])
+        self._recorded_during_rebuild = None
+        self._root, self._scores, self.nodes = root, scores, nodes
+        self.rebuilds += 1
+        logger.info(f"Autocomplete index rebuilt with {len(scores)} queries ({nodes} trie nodes)")
+
+    def _update_top(self, node: _Node, query: str, score: float):
+        top = node.top
+        for i, (_, existing) in enumerate(top):
+            if existing == query:
+                del top[i]
+                break
+        else:
+            if len(top) >= self.top_k and score <= top[-1][0]:
+                return
+        # Lists are short (top_k), so a linear insert beats anything cleverer
+        i = 0
+        while i < len(top) and top[i][0] >= score:
+            i += 1
+        top.insert(i, (score, query))
+        del top[self.top_k:]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Best past queries starting with prefix"""
+        self.lookups += 1
+        prefix = normalize_query(prefix)
+        if not prefix:
+            return []
+        node = self._root
+        for char in prefix[:self.max_depth]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        completions = [query for _, query in node.top]
+        if len(prefix) > self.max_depth:
+            completions = [query for query in completions if query.startswith(prefix)]
+        return completions[:limit]
+
+    async def load(self, collection):
+        """Seed the trie from recent search history, most searched queries first"""
+        since = datetime.utcnow() - timedelta(days=self.history_days)
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": since}}},
+            {"$group": {"_id": {"$toLower": "$original_query"}, "count": {"$sum": 1}, "last": {"$max": "$timestamp"}}},
+            {"$sort": {"count": -1}},
+            {"$limit": self.max_queries}
+        ]
+        loaded = 0
+        try:
+            async for row in collection.aggregate(pipeline):
+                if row["_id"]:
+                    # Aggregated counts are all credited to the latest search
+                    self.record(row["_id"], row["last"], row["count"])
+                    loaded += 1
+        except Exception as e:
+            logger.error(f"Error loading autocomplete index: {e}")
+            return
+        self.loaded = True
+        logger.info(f"Autocomplete index loaded {loaded} queries ({self.nodes} trie nodes)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "queries": len(self._scores),
+            "nodes": self.nodes,
+            "lookups": self.lookups,
+            "rebuilds": self.rebuilds
+        }
+
+
+def _logaddexp(a: float, b: float) -> float:
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Microbenchmark: ResultDeduplicator on synthetic multi-source result sets.
+
+Each set mixes unique papers with near-duplicate copies (arXiv abs/pdf URLs,
+DOI links, retitled copies) the way Google, arXiv and Semantic Scholar return
+them. Compares LSH candidate generation with an all-pairs title comparison.
+
+Usage (from backend/):  python benchmarks/bench_dedup.py [--sizes 100 500 2000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import BaseModel  # noqa: E402
+from typing import List, Optional  # noqa: E402
+
+from dedup import ResultDeduplicator, title_tokens  # noqa: E402
+
+VOCAB = (
+    "learning neural deep graph quantum model models network networks efficient scalable robust "
+    "analysis survey transformer attention language vision policy climate energy market data "
+    "optimization sparse bayesian inference estimation control adaptive distributed federated"
+).split()
+
+
+class Result(BaseModel):
+    # Mirrors the PDFResult fields the deduplicator reads and merges
+    title: str
+    url: str
+    download_url: Optional[str] = None
+    source: str = "bench"
+    description: Optional[str] = None
+    authors: Optional[List[str]] = None
+    publication_date: Optional[str] = None
+    file_size: Optional[str] = None
+    page_count: Optional[int] = None
+    language: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    relevance_score: Optional[float] = None
+    ai_summary: Optional[str] = None
+    categories: Optional[List[str]] = None
+    doi: Optional[str] = None
+    citation_count: Optional[int] = None
+    domain: Optional[str] = None
+    google_rank: Optional[int] = None
+
+
+def make_results(count, rng):
+    results = []
+    while len(results) < count:
+        n = len(results)
+        title = " ".join(rng.choice(VOCAB) for _ in range(rng.randint(5, 10))).capitalize()
+        paper = f"{rng.randint(1501, 2412)}.{rng.randint(10000, 99999)}"
+        results.append(Result(title=title, url=f"https://site{n}.edu/{n}.pdf", download_url=f"https://site{n}.edu/{n}.pdf"))
+        if rng.random() < 0.3:
+            results.append(Result(title=title + ".", url=f"http://arxiv.org/abs/{paper}v2",
+                                  download_url=f"http://arxiv.org/pdf/{paper}v2"))
+            results.append(Result(title=title, url=f"https://www.semanticscholar.org/paper/{n}",
+                                  doi=f"10.48550/arXiv.{paper}", citation_count=rng.randint(0, 500)))
+        elif rng.random() < 0.2:
+            results.append(Result(title=f"{title} (extended version)", url=f"https://mirror{n}.org/{n}.pdf"))
+    rng.shuffle(results)
+    return results[:count]
+
+
+def all_pairs(results, min_similarity=0.8):
+    """Reference: compare every pair of titles"""
+    sets = [set(title_tokens(r.title)) for r in results]
+    pairs = 0
+    for i in range(len(sets)):
+        for j in range(i):
+            if sets[i] and sets[j] and len(sets[i] & sets[j]) / len(sets[i] | sets[j]) >= min_similarity:
+                pairs += 1
+    return pairs
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    print(f"{'results':>8} {'unique':>7} {'dedup ms':>9} {'pairs ms':>9} {'candidates':>11}")
+    for size in args.sizes:
+        results = make_results(size, rng)
+        dedup = ResultDeduplicator()
+        unique = len(dedup.deduplicate(results))
+        candidates = dedup.candidate_pairs
+        dedup_time = best_of(lambda: ResultDeduplicator().deduplicate(results), args.repeat)
+        pairs_time = best_of(lambda: all_pairs(results), 1)
+        print(f"{size:>8} {unique:>7} {dedup_time * 1000:>9.2f} {pairs_time * 1000:>9.2f} {candidates:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the CPU-side search paths in server.py, with baselines.
+
+Cases (each run at every --sizes value, N results or feed entries):
+  format_google    GooglePDFSearch._format_google_result over N CSE items
+  relevance_score  GooglePDFSearch._calculate_relevance_score over N (domain, year, rank)
+  filter_rank      GooglePDFSearch._filter_and_rank_by_date over N results
+  dedup            MultiSourceSearchManager._deduplicate_results over N results, ~20% duplicates
+  arxiv_parse      ArxivSearch._parse_arxiv_xml on an N-entry Atom feed
+  s2_format        SemanticScholarSearch._format_result over N papers
+
+Corpora come from fake_upstreams and are seeded, so every run sees the same
+input. Each case reports the median of --repeat timed runs (fewer once a
+case has used --max-time), and each run repeats the call until it takes at
+least --min-time seconds, so even a microsecond case is timed over a batch
+long enough to be stable. The spread of the runs (interquartile range over
+median) is reported and kept with the timing.
+
+--save-baseline writes the timings to --baseline. Otherwise timings are
+compared with the stored ones, and the run exits with status 1 if any case,
+at any size, is more than --threshold slower after up to --confirm
+re-measurements.
+
+A fixed pure-Python reference workload is timed next to every case and
+stored with it. Comparisons use the case/reference ratio, so a machine that
+is uniformly slower or faster, or whose clock drifts during the run, does
+not read as a regression. Baselines are still best compared on the machine
+that recorded them (the file notes where that was), so re-save after
+changing hardware or Python.
+
+Usage (from backend/):
+    python benchmarks/bench_hot_paths.py [--sizes 10 100 1000 10000 100000] [--cases dedup arxiv_parse]
+    python benchmarks/bench_hot_paths.py --save-baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# server.py reads these at import time; nothing here touches Mongo or the network
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "pdfscope_bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("GOOGLE_API_KEY", "bench")
+os.environ.setdefault("GOOGLE_CSE_ID", "bench")
+os.environ.setdefault("LOCAL_INDEX_PATH", str(Path(tempfile.gettempdir()) / "pdfscope-bench-index.sqlite3"))
+
+import server  # noqa: E402
+from fake_upstreams import DOMAINS, arxiv_feed, google_items, s2_papers  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "hot_paths.json"
+START_YEAR, END_YEAR = 2000, 2025
+
+google = server.search_manager.google_search
+arxiv = server.search_manager.other_engines["arxiv"]
+semantic_scholar = server.search_manager.other_engines["semantic_scholar"]
+
+
+def cse_items(count):
+    items = []
+    page = 0
+    while len(items) < count:
+        items.extend(google_items(f"benchmark topic {page}", 1, 100))
+        page += 1
+    return items[:count]
+
+
+def formatted_results(count):
+    results = [google._format_google_result(item, rank % 100 + 1, 1975, 2025)
+               for rank, item in enumerate(cse_items(count))]
+    return [result for result in results if result]
+
+
+def with_duplicates(results, share, rng):
+    """Replace a share of results with copies of others under variant URLs and titles"""
+    mixed = list(results)
+    for i in rng.sample(range(len(mixed)), int(len(mixed) * share)):
+        original = results[rng.randrange(len(results))]
+        mixed[i] = original.model_copy(update={
+            "id": f"dup-{i}",
+            "title": original.title + ".",
+            "url": original.url.replace("https://", "http://") + "?download=1",
+            "source": "Semantic Scholar",
+        })
+    return mixed
+
+
+def case_format_google(size, rng):
+    items = cse_items(size)
+
+    def run():
+        for rank, item in enumerate(items):
+            google._format_google_result(item, rank % 100 + 1, 1975, 2025)
+    return run
+
+
+def case_relevance_score(size, rng):
+    inputs = [(f"{rng.choice(['www.', 'cs.', ''])}{rng.choice(DOMAINS)}", rng.choice([None, rng.randint(1980, 2025)]),
+               rng.randint(1, 100)) for _ in range(size)]
+    score = google._calculate_relevance_score
+
+    def run():
+        for domain, year, rank in inputs:
+            score(domain, year, rank)
+    return run
+
+
+def case_filter_rank(size, rng):
+    results = formatted_results(size)
+    return lambda: google._filter_and_rank_by_date(results, START_YEAR, END_YEAR)
+
+
+def case_dedup(size, rng):
+    results = with_duplicates(formatted_results(size), 0.2, rng)
+    return lambda: server.search_manager._deduplicate_results(results)
+
+
+def case_arxiv_parse(size, rng):
+    feed = arxiv_feed("benchmark topic", 0, size)
+    return lambda: arxiv._parse_arxiv_xml(feed)
+
+
+def case_s2_format(size, rng):
+    papers = []
+    while len(papers) < size:
+        papers.extend(paper for paper in s2_papers(f"benchmark topic {len(papers)}", 100) if paper.get("openAccessPdf"))
+    papers = papers[:size]
+
+    def run():
+        for paper in papers:
+            semantic_scholar._format_result(paper)
+    return run
+
+
+CASES = {
+    "format_google": case_format_google,
+    "relevance_score": case_relevance_score,
+    "filter_rank": case_filter_rank,
+    "dedup": case_dedup,
+    "arxiv_parse": case_arxiv_parse,
+    "s2_format": case_s2_format,
+}
+
+
+def measure(run, repeat, min_time, max_time):
+    """Seconds per call for up to `repeat` runs of at least min_time each"""
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                run()
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+            number *= 2
+        samples = [elapsed / number]
+        spent = elapsed
+        # Long cases stop early, but always with enough runs for a median
+        while len(samples) < repeat and (len(samples) < 3 or spent < max_time):
+            started = time.perf_counter()
+            for _ in range(number):
+                run()
+            elapsed = time.perf_counter() - started
+            samples.append(elapsed / number)
+            spent += elapsed
+        return samples
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def summarize(samples):
+    """Median and relative interquartile spread of per-call timings"""
+    samples = sorted(samples)
+    median = statistics.median(samples)
+    if len(samples) < 4:
+        return median, (samples[-1] - samples[0]) / median
+    q1, _, q3 = statistics.quantiles(samples, n=4)
+    return median, (q3 - q1) / median
+
+
+def reference_workload():
+    """Fixed pure-Python work timed alongside the cases to factor out machine speed"""
+    rng = random.Random(0)
+    words = [f"w{rng.randrange(5000)}" for _ in range(20000)]
+
+    def run():
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return run
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def main(args):
+    baseline = {}
+    if not args.save_baseline and Path(args.baseline).exists():
+        stored = json.loads(Path(args.baseline).read_text())
+        baseline = stored.get("results", {})
+        recorded_on = stored.get("environment", {})
+        if recorded_on and recorded_on != environment():
+            print(f"note: baseline recorded on {recorded_on}, comparing anyway")
+
+    reference_run = reference_workload()
+
+    def sample(run):
+        # The reference is timed right next to each case, so clock changes
+        # (turbo, throttling, noisy neighbours) affect both alike
+        reference, _ = summarize(measure(reference_run, 5, args.min_time / 2, args.max_time))
+        seconds, spread = summarize(measure(run, args.repeat, args.min_time, args.max_time))
+        return {"seconds": seconds, "reference": reference, "spread": round(spread, 4)}
+
+    def ratio(current, base):
+        if args.normalize:
+            return (current["seconds"] / current["reference"]) / (base["seconds"] / base["reference"])
+        return current["seconds"] / base["seconds"]
+
+    allowance = 1 + args.threshold
+
+    results = {}
+    regressions = []
+    print(f"{'case':<22} {'size':>7} {'per call':>12} {'per item':>11} {'spread':>7} {'baseline':>12} {'ratio':>7}")
+    for name in args.cases:
+        for size in args.sizes:
+            key = f"{name}[{size}]"
+            run = CASES[name](size, random.Random(size))
+            current = sample(run)
+            line = (f"{name:<22} {size:>7} {current['seconds'] * 1000:>10.3f}ms {current['seconds'] / size * 1e6:>9.2f}us"
+                    f" {current['spread']:>7.1%}")
+            base = baseline.get(key)
+            if base:
+                # A slow reading is re-measured before it counts as a regression
+                for _ in range(args.confirm):
+                    if ratio(current, base) <= allowance:
+                        break
+                    current = min(current, sample(run), key=lambda timing: ratio(timing, base))
+                status = ""
+                if ratio(current, base) > allowance:
+                    regressions.append((key, ratio(current, base)))
+                    status = "  REGRESSION"
+                line += f" {base['seconds'] * 1000:>10.3f}ms {ratio(current, base):>6.2f}x{status}"
+            results[key] = current
+            print(line, flush=True)
+
+    if args.save_baseline:
+        path = Path(args.baseline)
+        stored = json.loads(path.read_text()) if path.exists() else {}
+        if stored.get("environment") not in (None, environment()):
+            # Timings from another machine are not comparable; start over
+            stored = {}
+        stored.setdefault("results", {}).update(results)
+        stored["environment"] = environment()
+        stored["saved_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"\nsaved {len(results)} timings to {path}")
+        return 0
+
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} case(s) more than {args.threshold:.0%} slower than baseline:")
+        for key, slowdown in regressions:
+            print(f"  {key}: {slowdown:.2f}x")
+        return 1
+    if baseline:
+        print(f"\nPASS: no case more than {args.threshold:.0%} slower than baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=9, help="timed runs per case; the median is used")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timed run")
+    parser.add_argument("--max-time", type=float, default=10.0,
+                        help="seconds per case after which no further runs start (at least 3 are taken)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing, e.g. 0.25 = 25%%")
+    parser.add_argument("--confirm", type=int, default=2, help="re-measurements before a slow case counts as a regression")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--no-normalize", dest="normalize", action="store_false",
+                        help="compare raw timings instead of scaling by the reference workload")
+    parser.add_argument("--save-baseline", action="store_true", help="record these timings instead of comparing")
+    sys.exit(main(parser.parse_args()))
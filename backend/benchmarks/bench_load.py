@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Load benchmark: /api/search end to end against local fake upstreams.
+
+Starts FakeUpstreams (Google CSE, arXiv, Semantic Scholar and the LLM chat
+call, see fake_upstreams.py) and a uvicorn server for server.app in a child
+process pointed at them, then drives POST /api/search at each --concurrency
+level. Reports req/s, p50/p95/p99 latency, failures and upstream calls per
+request. Each run uses fresh queries, so result and LLM caches start cold
+unless --repeat-ratio asks for repeats.
+
+Needs a reachable MongoDB: MONGO_URL (default mongodb://localhost:27017).
+The --db database is dropped before the run. The LLM client is replaced
+by a stub that posts to the fake chat endpoint, and the Google/OpenAI rate
+limiters are opened up unless --keep-rate-limits is given.
+
+Usage (from backend/):
+    python benchmarks/bench_load.py [--concurrency 1 8 32] [--requests 200]
+        [--google-latency 0.15] [--llm-latency 0.4] [--google-error-rate 0.05]
+
+To drive a server started separately (e.g. under a profiler), start the fake
+upstreams on a fixed port and run the server with the printed URLs:
+    GOOGLE_CSE_URL=... FAKE_LLM_URL=... python benchmarks/bench_load.py --serve --port 8001
+    python benchmarks/bench_load.py --server-url http://127.0.0.1:8001 --upstream-port 9100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import aiohttp  # noqa: E402
+
+from fake_upstreams import UPSTREAMS, FakeUpstreams, UpstreamProfile, WORDS  # noqa: E402
+
+# Rate limiter settings that keep the server's own pacing out of the numbers
+OPEN_RATE_LIMITS = {
+    "GOOGLE_CSE_RATE_PER_SEC": "10000", "GOOGLE_CSE_BURST": "10000", "GOOGLE_CSE_DAILY_QUOTA": "100000000",
+    "OPENAI_RATE_PER_SEC": "10000", "OPENAI_BURST": "10000",
+}
+
+
+class FakeLlmError(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"fake LLM returned status {status}")
+        self.status_code = status
+
+
+def serve(host: str, port: int):
+    """Child process: server.app with the LLM client swapped for the fake chat endpoint"""
+    import uvicorn
+    import server
+
+    llm_url = os.environ["FAKE_LLM_URL"]
+
+    class FakeLlmChat:
+        # Same surface as emergentintegrations' LlmChat as used by AISearchEngine
+        def __init__(self, api_key, session_id, system_message):
+            pass
+
+        def with_model(self, provider, model):
+            return self
+
+        def with_max_tokens(self, max_tokens):
+            return self
+
+        async def send_message(self, message):
+            async with server.http_pool.session.post(llm_url, json={"text": message.text}) as response:
+                if response.status != 200:
+                    raise FakeLlmError(response.status)
+                return (await response.json())["reply"]
+
+    server.LlmChat = FakeLlmChat
+    uvicorn.run(server.app, host=host, port=port, log_level="warning")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def make_queries(count, repeat_ratio, rng):
+    salt = uuid.uuid4().hex[:6]
+    queries = []
+    for i in range(count):
+        if queries and rng.random() < repeat_ratio:
+            queries.append(rng.choice(queries))
+        else:
+            queries.append(f"{rng.choice(WORDS)} {rng.choice(WORDS)} {salt}{i}")
+    return queries
+
+
+async def run_level(session, url, queries, concurrency, max_results):
+    """Send every query with `concurrency` in flight; returns (wall seconds, latencies, failures)"""
+    latencies, failures = [], 0
+    position = 0
+
+    async def worker():
+        nonlocal position, failures
+        while position < len(queries):
+            query = queries[position]
+            position += 1
+            started = time.perf_counter()
+            try:
+                async with session.post(url, json={"query": query, "max_results": max_results}) as response:
+                    await response.read()
+                    ok = response.status == 200
+            except aiohttp.ClientError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            failures += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies), failures
+
+
+async def wait_ready(session, base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"server exited with status {process.returncode}")
+        try:
+            async with session.get(f"{base_url}/api/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.25)
+    raise SystemExit(f"server at {base_url} not ready after {timeout}s")
+
+
+def start_server(args, upstreams, workdir):
+    env = dict(os.environ)
+    env.update(upstreams.env())
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.update({
+        "DB_NAME": args.db,
+        "OPENAI_API_KEY": env.get("OPENAI_API_KEY") or "bench",
+        "GOOGLE_API_KEY": env.get("GOOGLE_API_KEY") or "bench",
+        "GOOGLE_CSE_ID": env.get("GOOGLE_CSE_ID") or "bench",
+        "LOCAL_INDEX_PATH": str(Path(workdir) / "local_index.sqlite3"),
+        "SEARCH_HISTORY_SPILL_PATH": str(Path(workdir) / "search_history.spill.jsonl"),
+    })
+    if not args.keep_rate_limits:
+        env.update(OPEN_RATE_LIMITS)
+
+    from pymongo import MongoClient
+    try:
+        MongoClient(env["MONGO_URL"], serverSelectionTimeoutMS=3000).drop_database(args.db)
+    except Exception as e:
+        raise SystemExit(f"MongoDB not reachable at {env['MONGO_URL']}: {e}")
+
+    return subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--port", str(args.port)],
+        cwd=str(BACKEND_DIR), env=env
+    )
+
+
+async def main(args):
+    profiles = {
+        upstream: UpstreamProfile(
+            latency=getattr(args, f"{upstream}_latency"),
+            jitter=args.jitter,
+            error_rate=getattr(args, f"{upstream}_error_rate"),
+            throttle_rate=getattr(args, f"{upstream}_throttle_rate"),
+        )
+        for upstream in UPSTREAMS
+    }
+    upstreams = FakeUpstreams(profiles, seed=args.seed)
+    await upstreams.start(port=args.upstream_port)
+    print(f"fake upstreams at {upstreams.base_url}")
+    for variable, value in upstreams.env().items():
+        print(f"  {variable}={value}")
+
+    workdir = tempfile.mkdtemp(prefix="pdfscope-load-")
+    process = None
+    base_url = args.server_url
+    if not base_url:
+        process = start_server(args, upstreams, workdir)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    rng = random.Random(args.seed)
+    report = []
+    try:
+        connector = aiohttp.TCPConnector(limit=0)
+        timeout = aiohttp.ClientTimeout(total=args.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await wait_ready(session, base_url, process)
+            url = f"{base_url}/api/search"
+            if args.warmup:
+                await run_level(session, url, make_queries(args.warmup, 0, rng), 4, args.max_results)
+
+            print(f"\n{'conc':>5} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fail':>5}  upstream calls/req")
+            for concurrency in args.concurrency:
+                upstreams.reset_counts()
+                queries = make_queries(args.requests, args.repeat_ratio, rng)
+                wall, latencies, failures = await run_level(session, url, queries, concurrency, args.max_results)
+                per_request = {name: round(upstreams.calls[name] / len(queries), 2) for name in UPSTREAMS}
+                row = {
+                    "concurrency": concurrency,
+                    "requests": len(queries),
+                    "req_per_sec": round(len(queries) / wall, 2),
+                    "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+                    "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+                    "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+                    "failures": failures,
+                    "upstream_calls_per_request": per_request,
+                    "upstream_failures": dict(upstreams.failures),
+                }
+                report.append(row)
+                calls = " ".join(f"{name}={count}" for name, count in per_request.items())
+                print(f"{concurrency:>5} {len(queries):>6} {row['req_per_sec']:>8.2f} {row['p50_ms']:>8.1f} "
+                      f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {failures:>5}  {calls}")
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        await upstreams.stop()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "profiles": {name: vars(profile) for name, profile in profiles.items()},
+            "max_results": args.max_results,
+            "levels": report
+        }, indent=2))
+        print(f"\nwrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--max-results", type=int, default=20)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="share of requests repeating an earlier query")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--jitter", type=float, default=0.3, help="log-normal sigma of upstream latency")
+    for upstream, latency in (("google", 0.15), ("arxiv", 0.3), ("semantic_scholar", 0.25), ("llm", 0.4)):
+        parser.add_argument(f"--{upstream.replace('_', '-')}-latency", type=float, default=latency)
+        parser.add_argument(f"--{upstream.replace('_', '-')}-error-rate", type=float, default=0.0)
+        parser.add_argument(f"--{upstream.replace('_', '-')}-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765, help="port for the spawned server")
+    parser.add_argument("--upstream-port", type=int, default=0, help="port for the fake upstreams (0 = any)")
+    parser.add_argument("--server-url", help="use an already running server instead of spawning one")
+    parser.add_argument("--db", default="pdfscope_load_bench", help="scratch database for the spawned server")
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve("127.0.0.1", args.port)
+    else:
+        asyncio.run(main(args))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark: event-loop lag while search results are enriched, inline vs offloaded.
+
+Each simulated request runs the CPU-side search steps on a batch of
+--batch-sizes CSE items, the same calls the search path makes through
+CPUOffloader:
+  GooglePDFSearch._format_google_page -> _filter_and_rank_by_date ->
+  MultiSourceSearchManager._deduplicate_results
+--concurrency of these run at once. Meanwhile a probe sleeps --interval in
+a loop and records how late it wakes up. Lateness is what every other
+in-flight request waits on before its I/O callbacks run.
+
+Each mode reports probe lag p50/p99/max and batches/s.
+
+Usage (from backend/):  python benchmarks/bench_loop_lag.py [--batch-sizes 50 200 1000] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# server.py reads these at import time; nothing here touches Mongo or the network
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "pdfscope_bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("GOOGLE_API_KEY", "bench")
+os.environ.setdefault("GOOGLE_CSE_ID", "bench")
+os.environ.setdefault("LOCAL_INDEX_PATH", str(Path(tempfile.gettempdir()) / "pdfscope-bench-index.sqlite3"))
+
+import server  # noqa: E402
+from cpu_offload import CPUOffloader  # noqa: E402
+from fake_upstreams import google_items  # noqa: E402
+
+google = server.search_manager.google_search
+manager = server.search_manager
+
+
+def cse_items(count):
+    items = []
+    page = 0
+    while len(items) < count:
+        items.extend(google_items(f"lag benchmark {page}", 1, 100))
+        page += 1
+    return items[:count]
+
+
+async def enrich(offloader, items):
+    """The CPU-side steps of one search over `items`"""
+    results = await offloader.run(len(items), google._format_google_page, items, 0, 1975, 2025)
+    results = await offloader.run(len(results), google._filter_and_rank_by_date, results, 2000, 2025)
+    return await offloader.run(len(results), manager._deduplicate_results, results)
+
+
+async def probe(interval, lags, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_mode(mode, items, args):
+    offloader = CPUOffloader(mode=mode, min_batch=args.min_batch, max_workers=args.workers)
+    await enrich(offloader, items[:10])  # warm caches and the pool
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(args.interval, lags, stop))
+    remaining = args.batches
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await enrich(offloader, items)
+            # Stand-in for the I/O between one request's CPU work and the next
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    offloader.close()
+    lags.sort()
+    return {
+        "lag_p50_ms": percentile(lags, 0.5) * 1000,
+        "lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+        "batches_per_sec": args.batches / elapsed,
+    }
+
+
+async def main(args):
+    print(f"switch interval {sys.getswitchinterval() * 1000:.1f}ms, probe every {args.interval * 1000:.1f}ms, "
+          f"{args.concurrency} concurrent batches, {args.workers} worker thread(s)")
+    print(f"{'batch':>6} {'mode':>7} {'lag p50':>9} {'lag p99':>9} {'lag max':>9} {'batches/s':>10}")
+    for size in args.batch_sizes:
+        items = cse_items(size)
+        for mode in args.modes:
+            row = await run_mode(mode, items, args)
+            print(f"{size:>6} {mode:>7} {row['lag_p50_ms']:>7.2f}ms {row['lag_p99_ms']:>7.2f}ms "
+                  f"{row['lag_max_ms']:>7.2f}ms {row['batches_per_sec']:>10.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--modes", nargs="+", choices=["inline", "thread"], default=["inline", "thread"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batches", type=int, default=40, help="batches per mode and size")
+    parser.add_argument("--interval", type=float, default=0.001, help="probe sleep in seconds")
+    parser.add_argument("--min-batch", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
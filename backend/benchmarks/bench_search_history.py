@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark: /api/search/history queries against a seeded search_history collection.
+
+Seeds --docs synthetic search records (default 1,000,000) into a scratch
+database and times the old query (find().sort('timestamp', -1), no index,
+no projection) against SearchHistoryStore's indexed keyset pages, including
+deep pages reached by following next_before versus skip().
+
+Needs a reachable MongoDB: MONGO_URL (default mongodb://localhost:27017).
+
+Usage (from backend/):  python benchmarks/bench_search_history.py [--docs 1000000] [--reuse]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from history import SearchHistoryStore  # noqa: E402
+
+QUERIES = [f"topic {i} research" for i in range(5000)]
+
+
+async def seed(collection, docs, batch_size=10000):
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for offset in range(0, docs, batch_size):
+        batch = []
+        for _ in range(min(batch_size, docs - offset)):
+            query = rng.choice(QUERIES)
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "original_query": query,
+                "reformulated_query": f"{query} filetype:pdf",
+                "results_count": rng.randint(0, 50),
+                "google_results": rng.randint(0, 40),
+                "sources_used": ["Google PDF Search"],
+                "date_range": "2015-2025",
+                "timestamp": now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+                "search_time": round(rng.uniform(0.5, 8), 2)
+            })
+        await collection.insert_many(batch, ordered=False)
+    print(f"seeded {docs} documents in {time.perf_counter() - started:.1f}s")
+
+
+async def timed(label, coro_factory, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(f"{label:<42} p50 {timings[len(timings) // 2] * 1000:9.2f} ms   max {timings[-1] * 1000:9.2f} ms")
+
+
+async def winning_stage(cursor):
+    plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+    stages = []
+    while plan:
+        stages.append(plan.get("stage"))
+        plan = plan.get("inputStage")
+    return " <- ".join(filter(None, stages))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--db", default=os.environ.get("BENCH_DB_NAME", "pdfscope_bench"))
+    parser.add_argument("--reuse", action="store_true", help="keep an already seeded collection")
+    parser.add_argument("--pages", type=int, default=50, help="depth for the deep-page comparison")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    collection = client[args.db].search_history
+    store = SearchHistoryStore(collection)
+
+    if not args.reuse or await collection.estimated_document_count() < args.docs:
+        await collection.drop()
+        await seed(collection, args.docs)
+
+    await collection.drop_indexes()
+    print("\nwithout indexes:", await winning_stage(collection.find().sort("timestamp", -1).limit(10)))
+    await timed("legacy find().sort(timestamp).limit(10)",
+                lambda: collection.find().sort("timestamp", -1).limit(10).to_list(10), repeat=3)
+
+    started = time.perf_counter()
+    await store.ensure_indexes()
+    print(f"\nindexes built in {time.perf_counter() - started:.1f}s")
+    print("with indexes:", await winning_stage(
+        collection.find({}, store.projection()).sort([("timestamp", -1), ("id", -1)]).limit(11)))
+
+    await timed("legacy query, now indexed", lambda: collection.find().sort("timestamp", -1).limit(10).to_list(10))
+    await timed("keyset page 1 (projected)", lambda: store.page(10))
+    await timed("keyset page 1, filtered by query", lambda: store.page(10, query=QUERIES[7]))
+
+    cursor_token = None
+    for _ in range(args.pages):
+        cursor_token = (await store.page(10, before=cursor_token))["next_before"]
+    await timed(f"keyset page {args.pages + 1} via next_before", lambda: store.page(10, before=cursor_token))
+    await timed(f"skip() to page {args.pages + 1}",
+                lambda: collection.find({}, {"_id": 0}).sort("timestamp", -1).skip(args.pages * 10).limit(10).to_list(10))
+    deep = args.docs // 20
+    await timed(f"skip({deep})",
+                lambda: collection.find({}, {"_id": 0}).sort("timestamp", -1).skip(deep).limit(10).to_list(10), repeat=3)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
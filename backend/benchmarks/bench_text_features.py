@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Microbenchmark: single-pass TextFeatureExtractor vs the old per-method scans.
+
+Usage (from backend/):  python benchmarks/bench_text_features.py [--sizes 100 1000 10000]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from text_features import CATEGORY_KEYWORDS, TextFeatureExtractor  # noqa: E402
+
+# Mostly ordinary words with a sprinkling of category keywords, roughly like CSE snippets
+FILLER = (
+    "the of and for with on in a to from by this that we our results data using based new approach "
+    "method model models effect effects between among during over under maintain domain contain "
+    "evaluation framework performance large small national international annual overview guide"
+).split()
+KEYWORDS = (
+    "machine learning deep neural network quantum energy climate policy market clinical patient "
+    "software algorithm survey review analysis biology cell genetic design system report thesis"
+).split()
+WORDS = FILLER * 3 + KEYWORDS
+
+
+def legacy_features(title, snippet, url):
+    """The per-result extraction GooglePDFSearch used before the shared extractor"""
+    text = f"{title} {snippet} {url}".lower()
+    years = []
+    for pattern in [r'\b(20[0-2][0-9])\b', r'\b(19[7-9][0-9])\b']:
+        for match in re.findall(pattern, text):
+            year = int(match)
+            if 1975 <= year <= 2025:
+                years.append(year)
+    year = max(years) if years else None
+
+    academic_indicators = [
+        'research', 'study', 'analysis', 'survey', 'review', 'paper',
+        'journal', 'conference', 'proceedings', 'thesis', 'dissertation',
+        'report', 'white paper', 'technical', 'scientific'
+    ]
+    text = f"{title} {snippet}".lower()
+    is_academic = any(indicator in text for indicator in academic_indicators)
+
+    file_size = None
+    for pattern in [r'(\d+(?:\.\d+)?)\s*(mb|kb|gb)', r'(\d+(?:\.\d+)?)\s*(megabytes|kilobytes|gigabytes)']:
+        match = re.search(pattern, snippet.lower())
+        if match:
+            size, unit = match.groups()
+            file_size = f"{size} {unit.upper()}"
+            break
+
+    categories = []
+    for category, keywords in dict(CATEGORY_KEYWORDS).items():
+        if any(keyword in text for keyword in keywords):
+            categories.append(category)
+    return year, file_size, is_academic, categories[:3]
+
+
+def make_items(count, seed=7):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))).title()
+        snippet = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 40)))
+        if rng.random() < 0.5:
+            snippet += f" published {rng.randint(1970, 2030)}"
+        if rng.random() < 0.3:
+            snippet += f" {rng.randint(1, 40)}.{rng.randint(0, 9)} MB"
+        url = f"https://example{rng.randint(1, 500)}.edu/papers/{rng.randint(1990, 2025)}/doc{i}.pdf"
+        items.append((title, snippet, url))
+    return items
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = TextFeatureExtractor()
+    print(f"{'results':>8} {'legacy ms':>10} {'batch ms':>10} {'speedup':>8} {'differs':>8}")
+    for size in args.sizes:
+        items = make_items(size)
+        legacy = best_of(lambda: [legacy_features(*item) for item in items], args.repeat)
+        batch = best_of(lambda: extractor.extract_batch(items), args.repeat)
+
+        # Differences are expected: keywords now need word boundaries
+        new = extractor.extract_batch(items)
+        differs = sum(
+            1 for item, feature in zip(items, new)
+            if legacy_features(*item) != (feature.year, feature.file_size, feature.is_academic, feature.categories)
+        )
+        print(f"{size:>8} {legacy * 1000:>10.2f} {batch * 1000:>10.2f} {legacy / batch:>7.1f}x {differs:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Local stand-ins for the upstream APIs, for load and micro benchmarks.
+
+FakeUpstreams serves the Google CSE JSON API, the arXiv Atom feed, the
+Semantic Scholar search API and an LLM chat endpoint from one aiohttp app.
+Each upstream has its own latency (log-normal around a median), error rate
+and 429 rate, and every call is counted. Payloads are synthetic but shaped
+like the real responses, and deterministic per query so repeated queries
+return the same documents.
+
+The payload generators (google_items, arxiv_feed, s2_papers) are also used
+directly by the microbenchmarks to build large corpora.
+"""
+import asyncio
+import hashlib
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+UPSTREAMS = ("google", "arxiv", "semantic_scholar", "llm")
+
+# Matches the fake arXiv API reports for every query
+ARXIV_TOTAL_RESULTS = 2000
+
+# Environment variables that point the server at a FakeUpstreams instance
+UPSTREAM_ENV = {
+    "google": ("GOOGLE_CSE_URL", "/google/customsearch/v1"),
+    "arxiv": ("ARXIV_API_URL", "/arxiv/api/query"),
+    "semantic_scholar": ("SEMANTIC_SCHOLAR_API_URL", "/s2/graph/v1/paper/search"),
+    "llm": ("FAKE_LLM_URL", "/llm/chat"),
+}
+
+WORDS = (
+    "learning neural deep graph quantum model network efficient scalable robust analysis survey "
+    "transformer attention language vision policy climate energy market data optimization sparse "
+    "bayesian inference estimation control adaptive distributed federated protein genome imaging"
+).split()
+
+DOMAINS = (
+    "mit.edu", "stanford.edu", "arxiv.org", "nature.com", "ieee.org", "nih.gov", "who.int",
+    "springer.com", "researchgate.net", "example.com", "blog.example.org", "cs.cmu.edu"
+)
+
+
+@dataclass
+class UpstreamProfile:
+    latency: float = 0.1       # median seconds
+    jitter: float = 0.3        # log-normal sigma; 0 for a fixed latency
+    error_rate: float = 0.0    # share of calls answered with 503
+    throttle_rate: float = 0.0  # share of calls answered with 429
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.latency <= 0:
+            return 0.0
+        if self.jitter <= 0:
+            return self.latency
+        return rng.lognormvariate(math.log(self.latency), self.jitter)
+
+
+def _rng(*parts: Any) -> random.Random:
+    digest = hashlib.blake2b(":".join(str(part) for part in parts).encode("utf-8"), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+def _title(rng: random.Random, query: str) -> str:
+    words = query.split()[:3] + [rng.choice(WORDS) for _ in range(rng.randint(3, 8))]
+    rng.shuffle(words)
+    return " ".join(words).capitalize()
+
+
+def google_items(query: str, start: int = 1, num: int = 10) -> List[Dict[str, Any]]:
+    """One CSE result page; Google stops after 100 results"""
+    items = []
+    for rank in range(start, min(start + num, 101)):
+        rng = _rng("google", query, rank)
+        domain = rng.choice(DOMAINS)
+        year = rng.randint(1990, 2025)
+        title = _title(rng, query)
+        slug = "-".join(title.lower().split()[:4])
+        items.append({
+            "title": f"{title} ({year})",
+            "link": f"https://{domain}/papers/{slug}-{rank}.pdf",
+            "displayLink": domain,
+            "snippet": f"{year} — We study {title.lower()}. {rng.randint(1, 40)} pages, "
+                       f"{rng.uniform(0.2, 9):.1f} MB. Results on {rng.choice(WORDS)} and {rng.choice(WORDS)}.",
+        })
+    return items
+
+
+def arxiv_entries(query: str, start: int = 0, count: int = 5) -> List[str]:
+    entries = []
+    for i in range(start, start + count):
+        rng = _rng("arxiv", query, i)
+        paper = f"{rng.randint(1501, 2412)}.{rng.randint(10000, 99999)}"
+        doi = f"<arxiv:doi>10.{rng.randint(1000, 9999)}/j.{rng.randint(100, 999)}</arxiv:doi>" if rng.random() < 0.3 else ""
+        authors = "".join(f"<author><name>Author {rng.randint(1, 999)}</name></author>" for _ in range(rng.randint(1, 5)))
+        entries.append(
+            f"<entry><id>http://arxiv.org/abs/{paper}v1</id>"
+            f"<published>20{paper[:2]}-{paper[2:4]}-01T00:00:00Z</published>"
+            f"<title>{_title(rng, query)}</title>"
+            f"<summary>{' '.join(rng.choice(WORDS) for _ in range(60))}</summary>{authors}{doi}"
+            f'<link href="http://arxiv.org/abs/{paper}v1" rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href="http://arxiv.org/pdf/{paper}v1" rel="related" type="application/pdf"/>'
+            f"</entry>"
+        )
+    return entries
+
+
+def arxiv_feed(query: str, start: int = 0, count: int = 5, total: Optional[int] = None) -> str:
+    """Atom feed with `count` entries starting at offset `start`, out of `total` matches"""
+    total = start + count if total is None else total
+    count = max(min(count, total - start), 0)
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        f"<title>arXiv Query: {query}</title>"
+        f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+        f"<opensearch:startIndex>{start}</opensearch:startIndex>"
+        f"<opensearch:itemsPerPage>{count}</opensearch:itemsPerPage>"
+        + "".join(arxiv_entries(query, start, count))
+        + "</feed>"
+    )
+
+
+def s2_papers(query: str, count: int = 5) -> List[Dict[str, Any]]:
+    papers = []
+    for i in range(count):
+        rng = _rng("s2", query, i)
+        external_ids = {"CorpusId": rng.randint(1, 10 ** 8)}
+        if rng.random() < 0.4:
+            external_ids["DOI"] = f"10.{rng.randint(1000, 9999)}/{rng.randint(10 ** 5, 10 ** 6)}"
+        if rng.random() < 0.3:
+            external_ids["ArXiv"] = f"{rng.randint(1501, 2412)}.{rng.randint(10000, 99999)}"
+        papers.append({
+            "paperId": f"{rng.getrandbits(64):016x}",
+            "title": _title(rng, query),
+            "abstract": " ".join(rng.choice(WORDS) for _ in range(80)),
+            "url": f"https://www.semanticscholar.org/paper/{rng.getrandbits(64):016x}",
+            "year": rng.randint(1990, 2025),
+            "citationCount": rng.randint(0, 5000),
+            "authors": [{"name": f"Author {rng.randint(1, 999)}"} for _ in range(rng.randint(1, 4))],
+            "externalIds": external_ids,
+            "openAccessPdf": {"url": f"https://pdfs.example.org/{i}-{rng.getrandbits(32):08x}.pdf"} if rng.random() < 0.7 else None,
+        })
+    return papers
+
+
+def llm_reply(text: str) -> str:
+    if "Reformulate this query" in text:
+        query = text.split('Original query: "', 1)[-1].split('"', 1)[0]
+        return f"{query} research paper filetype:pdf"
+    if "search suggestions" in text:
+        return "\n".join(f"{word} recent advances" for word in WORDS[:3])
+    return "This document presents a study of the topic, describes the methodology and reports results useful to researchers."
+
+
+class FakeUpstreams:
+    def __init__(self, profiles: Optional[Dict[str, UpstreamProfile]] = None, seed: int = 1):
+        self.profiles = {name: UpstreamProfile() for name in UPSTREAMS}
+        self.profiles.update(profiles or {})
+        self.rng = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.base_url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def reset_counts(self):
+        self.calls.clear()
+        self.failures.clear()
+
+    async def _respond(self, upstream: str) -> Optional[web.Response]:
+        """Count the call, wait out the latency and return an injected failure, if any"""
+        profile = self.profiles[upstream]
+        self.calls[upstream] += 1
+        await asyncio.sleep(profile.sample_latency(self.rng))
+        roll = self.rng.random()
+        if roll < profile.throttle_rate:
+            self.failures[upstream] += 1
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "1"})
+        if roll < profile.throttle_rate + profile.error_rate:
+            self.failures[upstream] += 1
+            return web.json_response({"error": "injected failure"}, status=503)
+        return None
+
+    async def google(self, request: web.Request) -> web.Response:
+        failure = await self._respond("google")
+        if failure:
+            return failure
+        start = int(request.query.get("start", 1))
+        items = google_items(request.query.get("q", ""), start, int(request.query.get("num", 10)))
+        return web.json_response({"items": items} if items else {})
+
+    async def arxiv(self, request: web.Request) -> web.Response:
+        failure = await self._respond("arxiv")
+        if failure:
+            return failure
+        query = request.query.get("search_query", "").removeprefix("all:")
+        feed = arxiv_feed(query, int(request.query.get("start", 0)), int(request.query.get("max_results", 5)),
+                          ARXIV_TOTAL_RESULTS)
+        return web.Response(text=feed, content_type="application/atom+xml")
+
+    async def semantic_scholar(self, request: web.Request) -> web.Response:
+        failure = await self._respond("semantic_scholar")
+        if failure:
+            return failure
+        papers = s2_papers(request.query.get("query", ""), int(request.query.get("limit", 5)))
+        return web.json_response({"total": len(papers), "data": papers})
+
+    async def llm(self, request: web.Request) -> web.Response:
+        failure = await self._respond("llm")
+        if failure:
+            return failure
+        body = await request.json()
+        return web.json_response({"reply": llm_reply(body.get("text", ""))})
+
+    def env(self) -> Dict[str, str]:
+        """Environment pointing the server's upstream clients here"""
+        return {variable: self.base_url + path for variable, path in UPSTREAM_ENV.values()}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        for upstream, (_, path) in UPSTREAM_ENV.items():
+            handler = getattr(self, upstream)
+            app.router.add_route("POST" if upstream == "llm" else "GET", path, handler)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
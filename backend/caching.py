@@ -0,0 +1,304 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How get_or_fetch answered: fresh entry, stale entry (refresh scheduled) or fetch()
+CACHE_HIT = "hit"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+
+class LRUCache:
+    """Size-bounded in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a key"""
+    return re.sub(r'\s+', ' ', (query or '').strip().lower())
+
+
+class SearchResultCache:
+    """Two-tier cache for search results: in-process LRU in front of a Mongo collection.
+
+    Entries are fresh for `ttl` seconds and then stale for another `stale_ttl`
+    seconds. With stale-while-revalidate on, a stale entry is served straight
+    away while a background task refreshes it; otherwise it counts as a miss.
+    """
+
+    def __init__(self, collection, max_entries: int = None, ttl: float = None, stale_ttl: float = None,
+                 stale_while_revalidate: bool = None):
+        self.collection = collection
+        self.ttl = ttl or float(os.environ.get('SEARCH_CACHE_TTL', 3600))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.environ.get('SEARCH_CACHE_STALE_TTL', 86400))
+        if stale_while_revalidate is None:
+            stale_while_revalidate = os.environ.get('SEARCH_CACHE_SWR', 'true').lower() == 'true'
+        self.stale_while_revalidate = stale_while_revalidate
+        self.memory = LRUCache(max_entries or int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', 1000)))
+
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._background = set()
+
+        self.requests = 0
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def make_key(query: str, date_range: str, max_results: int) -> str:
+        raw = f"{normalize_query(query)}|{date_range}|{max_results}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    async def ensure_indexes(self):
+        """TTL index so Mongo drops entries once their stale window has passed"""
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get_or_fetch(self, query: str, date_range: str, max_results: int,
+                           fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                           should_cache: Callable[[Dict[str, Any]], bool] = None,
+                           refresh: Callable[[], Awaitable[Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], str]:
+        """Return (payload, status) for the search, calling fetch() on a miss
+
+        status is CACHE_HIT, CACHE_STALE or CACHE_MISS; fetch() only ran for
+        this call on a miss. A stale entry is revalidated in the background
+        with refresh() (fetch() if not given), which outlives the caller and
+        so must not report results to it.
+        """
+        key = self.make_key(query, date_range, max_results)
+        self.requests += 1
+
+        entry = self.memory.get(key)
+        if entry is not None:
+            tier = "memory"
+        else:
+            entry = await self._load_shared(key)
+            tier = "shared"
+
+        if entry is not None:
+            if time.time() < entry["fresh_until"]:
+                self._count_hit(tier)
+                return entry["payload"], CACHE_HIT
+            if self.stale_while_revalidate:
+                self.stale_hits += 1
+                self._count_hit(tier)
+                self._schedule_refresh(key, refresh or fetch, should_cache)
+                return entry["payload"], CACHE_STALE
+
+        self.misses += 1
+        payload = await fetch()
+        if should_cache is None or should_cache(payload):
+            self._store(key, payload)
+        return payload, CACHE_MISS
+
+    def _count_hit(self, tier: str):
+        if tier == "memory":
+            self.memory_hits += 1
+        else:
+            self.shared_hits += 1
+
+    async def _load_shared(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            doc = await self.collection.find_one({"_id": key})
+        except Exception as e:
+            logger.error(f"Error reading search cache: {e}")
+            return None
+        if not doc or doc["expires_at"] <= datetime.utcnow():
+            return None
+
+        entry = {"payload": doc["payload"], "fresh_until": doc["fresh_until"]}
+        remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+        self.memory.set(key, entry, remaining)
+        return entry
+
+    def _store(self, key: str, payload: Dict[str, Any]):
+        now = time.time()
+        entry = {"payload": payload, "fresh_until": now + self.ttl}
+        self.memory.set(key, entry, self.ttl + self.stale_ttl)
+
+        doc = {
+            "payload": payload,
+            "fresh_until": entry["fresh_until"],
+            "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl + self.stale_ttl)
+        }
+        self._spawn(self._write_shared(key, doc))
+
+    async def _write_shared(self, key: str, doc: Dict[str, Any]):
+        try:
+            await self.collection.replace_one({"_id": key}, doc, upsert=True)
+        except Exception as e:
+            logger.error(f"Error writing search cache: {e}")
+
+    def _schedule_refresh(self, key: str, fetch, should_cache):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                payload = await fetch()
+                if should_cache is None or should_cache(payload):
+                    self._store(key, payload)
+                self.refreshes += 1
+            except Exception as e:
+                logger.error(f"Error refreshing cached search: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = self._spawn(refresh())
+
+    def _spawn(self, coro) -> asyncio.Task:
+        # Keep a reference so background tasks are not garbage collected mid-flight
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def close(self):
+        """Cancel in-flight refreshes; called on shutdown before the HTTP pool closes"""
+        refreshes = list(self._refreshing.values())
+        for task in refreshes:
+            task.cancel()
+        await asyncio.gather(*refreshes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.shared_hits
+        return {
+            "requests": self.requests,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "hit_ratio": round(hits / self.requests, 3) if self.requests else None,
+            "miss_ratio": round(self.misses / self.requests, 3) if self.requests else None,
+            "memory_entries": len(self.memory),
+            "stale_while_revalidate": self.stale_while_revalidate
+        }
+
+
+class LLMResponseCache:
+    """Content-addressed memo of LLM responses keyed by model and prompt hash.
+
+    A bounded in-process hot tier sits in front of a Mongo collection; each
+    call type (reformulate, suggestions, summary, ...) has its own TTL.
+    """
+
+    DEFAULT_TTLS = {
+        "reformulate": 7 * 86400,
+        "suggestions": 86400,
+        "summary": 30 * 86400
+    }
+
+    def __init__(self, collection, max_entries: int = None, ttls: Dict[str, float] = None):
+        self.collection = collection
+        self.memory = LRUCache(max_entries or int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 5000)))
+        self.default_ttl = float(os.environ.get('LLM_CACHE_TTL', 86400))
+        self.ttls = dict(self.DEFAULT_TTLS)
+        for call_type in self.ttls:
+            env_ttl = os.environ.get(f'LLM_CACHE_TTL_{call_type.upper()}')
+            if env_ttl:
+                self.ttls[call_type] = float(env_ttl)
+        self.ttls.update(ttls or {})
+
+        self._background = set()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()
+
+    def ttl_for(self, call_type: str) -> float:
+        return self.ttls.get(call_type, self.default_ttl)
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, call_type: str, model: str, prompt: str) -> Optional[str]:
+        """Cached response for this model and prompt, or None"""
+        key = self.make_key(model, prompt)
+        response = self.memory.get(key)
+        if response is None:
+            try:
+                doc = await self.collection.find_one({"_id": key}, {"response": 1, "expires_at": 1})
+            except Exception as e:
+                logger.error(f"Error reading LLM cache: {e}")
+                doc = None
+            if doc and doc["expires_at"] > datetime.utcnow():
+                response = doc["response"]
+                remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+                self.memory.set(key, response, remaining)
+
+        counter = self.hits if response is not None else self.misses
+        counter[call_type] = counter.get(call_type, 0) + 1
+        return response
+
+    def set(self, call_type: str, model: str, prompt: str, response: str):
+        """Store a response in both tiers; the Mongo write happens in the background"""
+        key = self.make_key(model, prompt)
+        ttl = self.ttl_for(call_type)
+        self.memory.set(key, response, ttl)
+
+        doc = {
+            "call_type": call_type,
+            "model": model,
+            "response": response,
+            "created_at": datetime.utcnow(),
+            "expires_at": datetime.utcnow() + timedelta(seconds=ttl)
+        }
+        task = asyncio.create_task(self._write_shared(key, doc))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _write_shared(self, key: str, doc: Dict[str, Any]):
+        try:
+            await self.collection.replace_one({"_id": key}, doc, upsert=True)
+        except Exception as e:
+            logger.error(f"Error writing LLM cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        call_types = sorted(set(self.hits) | set(self.misses))
+        by_type = {}
+        for call_type in call_types:
+            hits, misses = self.hits.get(call_type, 0), self.misses.get(call_type, 0)
+            by_type[call_type] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None
+            }
+        return {"memory_entries": len(self.memory), "call_types": by_type}
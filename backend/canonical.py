@@ -0,0 +1,81 @@
+import re
+from typing import Optional, Set
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so the same document maps to one key
+
+    Scheme is folded to https, the host is lowercased without a leading
+    'www.', and fragments, default ports and trailing slashes are dropped.
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    if not parts.netloc:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit(("https", host, path, parts.query, ""))
+
+
+# New-style (2101.01234) and old-style (hep-th/9901001) arXiv ids, optional version
+_ARXIV_ID = re.compile(r'(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?', re.IGNORECASE)
+_ARXIV_PATH = re.compile(r'^/(?:abs|pdf|html|format)/(.+?)(?:\.pdf)?/?$', re.IGNORECASE)
+_DOI = re.compile(r'\b(10\.\d{4,9}/[^\s?#"<>]+)', re.IGNORECASE)
+# arXiv's own DataCite DOIs (10.48550/arXiv.2101.01234) name the same paper
+_ARXIV_DOI = re.compile(r'^10\.48550/arxiv\.(.+)$', re.IGNORECASE)
+
+
+def arxiv_id(url: str) -> Optional[str]:
+    """Versionless arXiv id for an arxiv.org abs/pdf URL, else None"""
+    try:
+        parts = urlsplit((url or "").strip())
+    except ValueError:
+        return None
+    host = (parts.hostname or "").lower()
+    if not (host == "arxiv.org" or host.endswith(".arxiv.org")):
+        return None
+    path = _ARXIV_PATH.match(parts.path)
+    if not path:
+        return None
+    match = _ARXIV_ID.fullmatch(path.group(1))
+    return match.group(1).lower() if match else None
+
+
+def normalize_doi(doi: str) -> Optional[str]:
+    """Bare lowercase DOI from a DOI, 'doi:' string or URL containing one"""
+    match = _DOI.search(unquote(doi or ""))
+    if not match:
+        return None
+    return match.group(1).rstrip("/.").lower()
+
+
+def document_ids(url: str = None, doi: str = None) -> Set[str]:
+    """Keys under which two records describe the same document
+
+    arXiv ids (from URLs or arXiv DOIs) and DOIs are version and host
+    independent; anything else falls back to the canonical URL.
+    """
+    ids = set()
+    for candidate in (doi, url):
+        normalized = normalize_doi(candidate) if candidate else None
+        if normalized:
+            arxiv_doi = _ARXIV_DOI.match(normalized)
+            if arxiv_doi and _ARXIV_ID.fullmatch(arxiv_doi.group(1)):
+                ids.add(f"arxiv:{_ARXIV_ID.fullmatch(arxiv_doi.group(1)).group(1)}")
+            else:
+                ids.add(f"doi:{normalized}")
+    if url:
+        paper = arxiv_id(url)
+        ids.add(f"arxiv:{paper}" if paper else f"url:{canonical_url(url)}")
+    return ids
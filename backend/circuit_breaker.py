@@ -0,0 +1,205 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Tuple, Type
+
+from metrics import latency_summary, timed_upstream
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    def __init__(self, name: str):
+        super().__init__(f"circuit '{name}' is open")
+        self.name = name
+
+
+class UpstreamError(Exception):
+    """Upstream answered with an unusable status"""
+
+    def __init__(self, upstream: str, status: int):
+        super().__init__(f"{upstream} returned status {status}")
+        self.status = status
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker for one upstream source.
+
+    Outcomes from the last `window_seconds` are kept; once at least
+    `min_calls` were seen and the error rate (or the share of calls slower
+    than `slow_call_seconds`) passes its threshold, the circuit opens and
+    calls fail fast for `open_seconds`. After that a limited number of
+    half-open trial calls decide whether it closes again or re-opens.
+    """
+
+    def __init__(self, name: str, window_seconds: float = 60, min_calls: int = 5,
+                 error_threshold: float = 0.5, slow_call_seconds: float = 5.0,
+                 slow_call_threshold: float = 0.8, open_seconds: float = 30,
+                 half_open_max_calls: int = 1, call_timeout: float = 10.0):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_threshold = slow_call_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.call_timeout = call_timeout
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.half_open_in_flight = 0
+        self._outcomes = deque()  # (timestamp, ok, latency)
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """Whether a call may go ahead; reserves a trial slot when half-open"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.short_circuited += 1
+                return False
+            self.state = HALF_OPEN
+            self.half_open_in_flight = 0
+            logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+
+        if self.state == HALF_OPEN:
+            if self.half_open_in_flight >= self.half_open_max_calls:
+                self.short_circuited += 1
+                return False
+            self.half_open_in_flight += 1
+        return True
+
+    def record_success(self, latency: float):
+        slow = latency > self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            self.half_open_in_flight = max(self.half_open_in_flight - 1, 0)
+            if slow:
+                self._open()
+            else:
+                self._close()
+            return
+        self._add(True, latency)
+
+    def record_failure(self, latency: float = None):
+        if self.state == HALF_OPEN:
+            self.half_open_in_flight = max(self.half_open_in_flight - 1, 0)
+            self._open()
+            return
+        self._add(False, latency)
+
+    def release(self):
+        """Give back a half-open slot for a call whose outcome says nothing about health"""
+        if self.state == HALF_OPEN:
+            self.half_open_in_flight = max(self.half_open_in_flight - 1, 0)
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args,
+                   ignore: Tuple[Type[BaseException], ...] = ()) -> Any:
+        """Run func(*args) through the breaker with the call timeout
+
+        Exceptions listed in `ignore` (e.g. rate limiting) propagate without
+        counting as failures.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self.name)
+
+        started = time.monotonic()
+        with timed_upstream(self.name) as timing:
+            try:
+                result = await asyncio.wait_for(func(*args), timeout=self.call_timeout)
+            except ignore:
+                timing["outcome"] = "throttled"
+                self.release()
+                raise
+            except asyncio.CancelledError:
+                self.release()
+                raise
+            except Exception:
+                self.record_failure(time.monotonic() - started)
+                raise
+            if isinstance(result, list):
+                timing["results"] = len(result)
+        self.record_success(time.monotonic() - started)
+        return result
+
+    def _add(self, ok: bool, latency: float):
+        now = time.monotonic()
+        self._outcomes.append((now, ok, latency))
+        self._prune(now)
+        if self.state == CLOSED and self._should_open():
+            self._open()
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _rates(self) -> Tuple[int, float, float]:
+        calls = len(self._outcomes)
+        if not calls:
+            return 0, 0.0, 0.0
+        errors = sum(1 for _, ok, _ in self._outcomes if not ok)
+        slow = sum(1 for _, _, latency in self._outcomes if latency is not None and latency > self.slow_call_seconds)
+        return calls, errors / calls, slow / calls
+
+    def _should_open(self) -> bool:
+        calls, error_rate, slow_rate = self._rates()
+        return calls >= self.min_calls and (error_rate >= self.error_threshold or slow_rate >= self.slow_call_threshold)
+
+    def _open(self):
+        if self.state != OPEN:
+            self.times_opened += 1
+            logger.warning(f"Circuit '{self.name}' opened for {self.open_seconds}s")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def _close(self):
+        logger.info(f"Circuit '{self.name}' closed")
+        self.state = CLOSED
+        self._outcomes.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        # An open circuit past its cool-down admits a probe on the next call
+        state = self.state
+        if state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            state = HALF_OPEN
+        calls, error_rate, slow_rate = self._rates()
+        latency = latency_summary((latency for _, _, latency in self._outcomes if latency is not None), digits=3)
+        return {
+            "state": state,
+            "calls_in_window": calls,
+            "error_rate": round(error_rate, 3),
+            "slow_call_rate": round(slow_rate, 3),
+            "latency_p50": latency["p50"],
+            "latency_p95": latency["p95"],
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+            "retry_in": round(max(self.opened_at + self.open_seconds - time.monotonic(), 0.0), 1) if self.state == OPEN else 0.0
+        }
+
+    def health(self) -> str:
+        """Coarse health label for /api/health"""
+        return {CLOSED: "healthy", HALF_OPEN: "degraded", OPEN: "unavailable"}[self.snapshot()["state"]]
+
+
+def breaker_from_env(name: str, call_timeout: float) -> CircuitBreaker:
+    """Circuit breaker with shared BREAKER_* settings and a per-source <NAME>_TIMEOUT"""
+    return CircuitBreaker(
+        name,
+        window_seconds=float(os.environ.get('BREAKER_WINDOW_SECONDS', 60)),
+        min_calls=int(os.environ.get('BREAKER_MIN_CALLS', 5)),
+        error_threshold=float(os.environ.get('BREAKER_ERROR_THRESHOLD', 0.5)),
+        slow_call_seconds=float(os.environ.get('BREAKER_SLOW_CALL_SECONDS', 5)),
+        slow_call_threshold=float(os.environ.get('BREAKER_SLOW_CALL_THRESHOLD', 0.8)),
+        open_seconds=float(os.environ.get('BREAKER_OPEN_SECONDS', 30)),
+        half_open_max_calls=int(os.environ.get('BREAKER_HALF_OPEN_CALLS', 1)),
+        call_timeout=float(os.environ.get(f'{name.upper()}_TIMEOUT', call_timeout))
+    )
@@ -0,0 +1,259 @@
+import re
+import struct
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from canonical import document_ids
+
+_WORD = re.compile(r'\w+')
+# One 64-byte blake2b digest yields sixteen 32-bit hash values
+_HASHES_PER_DIGEST = 16
+_DIGEST = struct.Struct(f'<{_HASHES_PER_DIGEST}I')
+# Signatures pack each 32-bit hash into a field with one spare guard bit on top
+_HASH_BITS = 32
+_FIELD_BITS = _HASH_BITS + 1
+
+# Fields copied onto the surviving result when it has no value of its own
+_FILL_FIELDS = (
+    'description', 'authors', 'publication_date', 'file_size', 'page_count', 'language',
+    'thumbnail_url', 'ai_summary', 'doi', 'domain', 'google_rank'
+)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> bool:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        # The earlier result stays the root so it survives the merge
+        if b < a:
+            a, b = b, a
+        self.parent[b] = a
+        return True
+
+
+def title_tokens(title: str) -> List[str]:
+    return _WORD.findall((title or '').lower())
+
+
+def _word_hashes(word: str, count: int) -> Tuple[int, ...]:
+    """`count` independent 32-bit hashes of a word, the same in every process"""
+    data = word.encode('utf-8')
+    values = ()
+    for seed in range(-(-count // _HASHES_PER_DIGEST)):
+        digest = hashlib.blake2b(data, digest_size=64, salt=seed.to_bytes(16, 'little')).digest()
+        values += _DIGEST.unpack(digest)
+    return values[:count]
+
+
+@lru_cache(maxsize=1 << 16)
+def _packed_word_hashes(word: str, count: int) -> int:
+    """The word's hashes packed into one int, one _FIELD_BITS field per hash"""
+    return sum(value << (i * _FIELD_BITS) for i, value in enumerate(_word_hashes(word, count)))
+
+
+@lru_cache(maxsize=None)
+def _field_masks(count: int) -> Tuple[int, int]:
+    """(guard bit of every field, hash bits of every field) for `count` packed fields"""
+    guard = sum(1 << (i * _FIELD_BITS + _HASH_BITS) for i in range(count))
+    return guard, guard - (guard >> _HASH_BITS)
+
+
+def packed_minhash(words: Iterable[str], count: int) -> int:
+    """MinHash signature of a word set, packed like _packed_word_hashes (0 if empty)
+
+    The field-wise minimum over all words is taken a whole signature at a
+    time: with the guard bits set, subtracting one packed value from another
+    leaves each guard bit set exactly where that field did not borrow, i.e.
+    where the first value is the larger or equal one.
+    """
+    guard, hash_bits = _field_masks(count)
+    signature = None
+    for word in set(words):
+        value = _packed_word_hashes(word, count)
+        if signature is None:
+            signature = value
+            continue
+        larger = ((signature | guard) - value) & guard
+        take = larger - (larger >> _HASH_BITS)
+        signature = (value & take) | (signature & (hash_bits ^ take))
+    return signature or 0
+
+
+def minhash(words: Iterable[str], count: int) -> Tuple[int, ...]:
+    """MinHash signature of a word set
+
+    Each position of two signatures agrees with probability equal to the
+    sets' Jaccard similarity.
+    """
+    words = set(words)
+    if not words:
+        return ()
+    signature = packed_minhash(words, count)
+    field = (1 << _HASH_BITS) - 1
+    return tuple((signature >> (i * _FIELD_BITS)) & field for i in range(count))
+
+
+class ResultDeduplicator:
+    """Collapses search results that describe the same document.
+
+    Results are linked when they share an identifier (arXiv id, DOI or
+    canonical URL) or when their titles are near-identical. Title candidates
+    come from MinHash LSH over title words: each signature is split into
+    `bands` bands of `rows` values and only results sharing a band are
+    compared, so the work stays close to linear in the number of results.
+    A pair with word Jaccard similarity s becomes a candidate with
+    probability 1 - (1 - s**rows)**bands; the defaults (10 x 4) give 99.5%
+    at 0.8, 94% at 0.7 and 48% at 0.5. Signatures are packed into one int
+    so the per-word minimum and each band key cost a few big-int operations
+    rather than one Python step per hash. Candidates are confirmed by exact
+    word Jaccard similarity with identical numbers (so 'Annual Report 2019'
+    and 'Annual Report 2020' stay apart); since numbers must match anyway,
+    only titles with the same numbers share buckets.
+
+    Linked results form clusters via union-find; each cluster is merged into
+    its earliest member, which keeps input order as the priority order.
+    """
+
+    def __init__(self, bands: int = 10, rows: int = 4, min_similarity: float = 0.8, min_title_tokens: int = 3):
+        self.bands = bands
+        self.rows = rows
+        self.min_similarity = min_similarity
+        self.min_title_tokens = min_title_tokens
+
+        self.runs = 0
+        self.results_in = 0
+        self.results_out = 0
+        self.merged_by_id = 0
+        self.merged_by_title = 0
+        self.candidate_pairs = 0
+
+    def deduplicate(self, results: List[Any]) -> List[Any]:
+        """Unique results in input order, with metadata merged from their duplicates"""
+        self.runs += 1
+        self.results_in += len(results)
+        clusters = _UnionFind(len(results))
+
+        tokens = [title_tokens(result.title) for result in results]
+        self._link_identifiers(results, tokens, clusters)
+        self._link_similar_titles(results, tokens, clusters)
+
+        members: Dict[int, List[int]] = {}
+        for i in range(len(results)):
+            members.setdefault(clusters.find(i), []).append(i)
+
+        unique = []
+        for root in sorted(members):
+            cluster = [results[i] for i in members[root]]
+            unique.append(self.merge(cluster) if len(cluster) > 1 else cluster[0])
+        self.results_out += len(unique)
+        return unique
+
+    def _link_identifiers(self, results: List[Any], tokens: List[List[str]], clusters: _UnionFind):
+        owners: Dict[str, int] = {}
+        for i, result in enumerate(results):
+            keys = document_ids(result.url, getattr(result, 'doi', None))
+            if getattr(result, 'download_url', None):
+                keys |= document_ids(result.download_url)
+            # Exact normalized titles always count as the same document
+            if tokens[i]:
+                keys.add("title:" + " ".join(tokens[i]))
+            for key in keys:
+                owner = owners.setdefault(key, i)
+                if owner != i and clusters.union(owner, i):
+                    self.merged_by_id += 1
+
+    def _link_similar_titles(self, results: List[Any], tokens: List[List[str]], clusters: _UnionFind):
+        # Word set and the numbers in it, per title long enough to compare
+        titles: Dict[int, Tuple[Set[str], Set[str]]] = {}
+        # Titles only match with identical numbers, so each number set gets
+        # its own buckets and titles with different numbers never meet
+        buckets_by_numbers: Dict[frozenset, Dict[tuple, List[int]]] = {}
+        band_bits = self.rows * _FIELD_BITS
+        band_mask = (1 << band_bits) - 1
+        for i, words in enumerate(tokens):
+            if len(words) < self.min_title_tokens:
+                continue
+            word_set = set(words)
+            numbers = frozenset(word for word in word_set if word.isdigit())
+            titles[i] = (word_set, numbers)
+            buckets = buckets_by_numbers.setdefault(numbers, {})
+            signature = packed_minhash(word_set, self.bands * self.rows)
+            candidates = set()
+            for band in range(self.bands):
+                bucket = buckets.setdefault((band, (signature >> (band * band_bits)) & band_mask), [])
+                candidates.update(bucket)
+                bucket.append(i)
+            # Ascending, so clusters grow in the same order as results arrive
+            for j in sorted(candidates):
+                if clusters.find(i) == clusters.find(j):
+                    continue
+                self.candidate_pairs += 1
+                if self._similar(titles[i], titles[j]) and clusters.union(i, j):
+                    self.merged_by_title += 1
+
+    def _similar(self, a: Tuple[Set[str], Set[str]], b: Tuple[Set[str], Set[str]]) -> bool:
+        (words_a, numbers_a), (words_b, numbers_b) = a, b
+        if numbers_a != numbers_b:
+            return False
+        shared = len(words_a & words_b)
+        return shared / (len(words_a) + len(words_b) - shared) >= self.min_similarity
+
+    @staticmethod
+    def merge(cluster: List[Any]) -> Any:
+        """Earliest result enriched with what its duplicates know"""
+        primary = cluster[0].model_copy()
+        others = cluster[1:]
+        for field in _FILL_FIELDS:
+            if not getattr(primary, field):
+                value = next((getattr(other, field) for other in others if getattr(other, field)), None)
+                if value:
+                    setattr(primary, field, value)
+
+        # Prefer a direct PDF link (e.g. arXiv's) over a landing page
+        if not _is_pdf_link(primary.download_url):
+            direct = next((other.download_url for other in others if _is_pdf_link(other.download_url)), None)
+            primary.download_url = direct or primary.download_url or next(
+                (other.download_url for other in others if other.download_url), None)
+
+        counts = [r.citation_count for r in cluster if r.citation_count is not None]
+        if counts:
+            primary.citation_count = max(counts)
+        scores = [r.relevance_score for r in cluster if r.relevance_score is not None]
+        if scores:
+            primary.relevance_score = max(scores)
+
+        categories = []
+        for result in cluster:
+            for category in result.categories or []:
+                if category not in categories:
+                    categories.append(category)
+        primary.categories = categories or primary.categories
+        return primary
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "results_in": self.results_in,
+            "results_out": self.results_out,
+            "merged_by_id": self.merged_by_id,
+            "merged_by_title": self.merged_by_title,
+            "candidate_pairs": self.candidate_pairs
+        }
+
+
+def _is_pdf_link(url: Optional[str]) -> bool:
+    if not url:
+        return False
+    path = url.split('?', 1)[0].lower()
+    return path.endswith('.pdf') or 'arxiv.org/pdf/' in path
@@ -0,0 +1,140 @@
+import os
+import json
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_FILE = Path(__file__).parent / 'data' / 'domain_authority.json'
+
+# Key under which a trie node stores the weight of the suffix ending there;
+# '#' cannot appear in a host label
+_WEIGHT = '#'
+
+
+def normalize_domain(domain: str) -> str:
+    """Lowercase host without port, trailing dot or credentials"""
+    domain = (domain or '').strip().lower()
+    domain = domain.rsplit('@', 1)[-1]
+    if domain.startswith('['):
+        return domain
+    return domain.split(':', 1)[0].rstrip('.')
+
+
+class DomainAuthorityIndex:
+    """Domain weights held in a trie keyed by reversed labels.
+
+    'ac.uk' is stored along the path uk -> ac, so a lookup walks the host's
+    labels from the right and costs one dict step per label no matter how
+    many domains are loaded. Suffixes only match whole labels ('org' does not
+    match 'bigorg'), and the deepest weighted node wins.
+
+    The weights come from a versioned JSON file. run_reload_loop() checks its
+    mtime every `reload_interval` seconds and, on change, parses the file and
+    builds the new trie in a worker thread before swapping it in, so scoring
+    never waits on a reload.
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = None):
+        self.path = Path(path or os.environ.get('DOMAIN_AUTHORITY_FILE') or DEFAULT_DATA_FILE)
+        self.reload_interval = reload_interval if reload_interval is not None else float(os.environ.get('DOMAIN_AUTHORITY_RELOAD_INTERVAL', 30))
+
+        self._root: Dict[str, dict] = {}
+        self.version = None
+        self.entries = 0
+        self.loaded_mtime = None
+        self.reloads = 0
+        self.reload_errors = 0
+        self.reload()
+
+    @staticmethod
+    def build_trie(domains: Dict[str, float]) -> Dict[str, dict]:
+        root: Dict[str, dict] = {}
+        for domain, weight in domains.items():
+            node = root
+            for label in reversed(normalize_domain(domain).split('.')):
+                node = node.setdefault(label, {})
+            node[_WEIGHT] = float(weight)
+        return root
+
+    def _load(self) -> Optional[Tuple[Dict[str, dict], Dict[str, Any], float]]:
+        """Parse the data file and build its trie; None (after logging) on any error"""
+        try:
+            mtime = self.path.stat().st_mtime
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            return self.build_trie(data.get('domains', {})), data, mtime
+        except FileNotFoundError:
+            if self.loaded_mtime is None:
+                logger.warning(f"Domain authority file {self.path} not found; no domain bonus will be applied")
+            else:
+                logger.error(f"Domain authority file {self.path} disappeared; keeping version {self.version}")
+        except Exception as e:
+            logger.error(f"Error loading domain authority file {self.path}: {e}")
+        self.reload_errors += 1
+        return None
+
+    def _swap(self, loaded: Tuple[Dict[str, dict], Dict[str, Any], float]):
+        root, data, mtime = loaded
+        self._root = root
+        self.version = data.get('version')
+        self.entries = len(data.get('domains', {}))
+        self.loaded_mtime = mtime
+        self.reloads += 1
+        logger.info(f"Loaded domain authority v{self.version} ({self.entries} domains)")
+
+    def reload(self) -> bool:
+        """(Re)load the data file in the calling thread; on any error the current trie is kept"""
+        loaded = self._load()
+        if loaded is None:
+            return False
+        self._swap(loaded)
+        return True
+
+    async def maybe_reload(self) -> bool:
+        """Reload if the file changed, parsing and building off the event loop"""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return False
+        if mtime == self.loaded_mtime:
+            return False
+        loaded = await asyncio.to_thread(self._load)
+        if loaded is None:
+            return False
+        # Lookups keep using the old trie until this single assignment
+        self._swap(loaded)
+        return True
+
+    async def run_reload_loop(self):
+        """Background job started on app startup"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.maybe_reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error reloading domain authority: {e}")
+
+    def weight(self, domain: str) -> float:
+        """Weight of the most specific listed suffix of domain, 0.0 if none"""
+        node = self._root
+        weight = 0.0
+        for label in reversed(normalize_domain(domain).split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            weight = node.get(_WEIGHT, weight)
+        return weight
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "file": str(self.path),
+            "version": self.version,
+            "entries": self.entries,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
@@ -0,0 +1,80 @@
+import json
+import base64
+import binascii
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fields a caller may ask for; id and timestamp are always read for the cursor
+HISTORY_FIELDS = (
+    "id", "original_query", "reformulated_query", "results_count", "google_results",
+    "sources_used", "date_range", "timestamp", "search_time"
+)
+
+
+class InvalidCursor(ValueError):
+    """The `before` token could not be decoded"""
+
+
+def encode_cursor(timestamp: datetime, record_id: str) -> str:
+    raw = json.dumps({"t": timestamp.isoformat(), "id": record_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), str(data["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"invalid history cursor: {token!r}") from e
+
+
+class SearchHistoryStore:
+    """Reads the search_history collection newest first with keyset pagination.
+
+    Pages are ordered by (timestamp, id) descending, both covered by an
+    index, and the next page starts strictly after the last row returned,
+    so page N costs the same as page 1. The cursor handed to clients is an
+    opaque base64 token of that last (timestamp, id).
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("timestamp", -1), ("id", -1)])
+        await self.collection.create_index([("original_query", 1), ("timestamp", -1), ("id", -1)])
+
+    @staticmethod
+    def projection(fields: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        wanted = set(fields or HISTORY_FIELDS) | {"id", "timestamp"}
+        unknown = wanted - set(HISTORY_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown history fields: {', '.join(sorted(unknown))}")
+        return {"_id": 0, **{field: 1 for field in sorted(wanted)}}
+
+    async def page(self, limit: int, before: Optional[str] = None, query: Optional[str] = None,
+                   fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """One page of history and the token for the next one (None on the last page)"""
+        conditions: List[Dict[str, Any]] = []
+        if query:
+            conditions.append({"original_query": query})
+        if before:
+            timestamp, record_id = decode_cursor(before)
+            conditions.append({"$or": [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "id": {"$lt": record_id}}
+            ]})
+        spec = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+
+        # One extra row tells us whether another page exists
+        cursor = self.collection.find(spec, self.projection(fields)).sort([("timestamp", -1), ("id", -1)]).limit(limit + 1)
+        rows = await cursor.to_list(limit + 1)
+        next_before = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_before = encode_cursor(rows[-1]["timestamp"], rows[-1].get("id", ""))
+        return {"history": rows, "next_before": next_before}
@@ -0,0 +1,84 @@
+import os
+import logging
+from typing import Optional, Dict, Any
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPSessionPool:
+    """Process-wide aiohttp session shared by every upstream search engine.
+
+    One connector per process keeps TCP/TLS connections alive between
+    requests and caches DNS lookups, so repeated calls to Google CSE, arXiv
+    and Semantic Scholar skip the handshakes.
+    """
+
+    def __init__(self):
+        self.limit = int(os.environ.get('HTTP_POOL_LIMIT', 100))
+        self.limit_per_host = int(os.environ.get('HTTP_POOL_LIMIT_PER_HOST', 20))
+        self.dns_cache_ttl = int(os.environ.get('HTTP_DNS_CACHE_TTL', 300))
+        self.keepalive_timeout = float(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', 30))
+        self.timeout = aiohttp.ClientTimeout(
+            total=float(os.environ.get('HTTP_TIMEOUT_TOTAL', 15)),
+            connect=float(os.environ.get('HTTP_TIMEOUT_CONNECT', 5)),
+            sock_read=float(os.environ.get('HTTP_TIMEOUT_READ', 10))
+        )
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _create_session(self):
+        self._connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self._session = aiohttp.ClientSession(connector=self._connector, timeout=self.timeout)
+
+    async def start(self):
+        """Create the shared connector and session (called on app startup)"""
+        if self._session is not None and not self._session.closed:
+            return
+        self._create_session()
+        logger.info(
+            f"HTTP pool started (limit={self.limit}, per_host={self.limit_per_host}, "
+            f"dns_ttl={self.dns_cache_ttl}s, keepalive={self.keepalive_timeout}s)"
+        )
+
+    async def close(self):
+        """Close the shared session and every pooled connection"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._connector = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared session; created lazily when used outside the app lifespan"""
+        if self._session is None or self._session.closed:
+            self._create_session()
+        return self._session
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection counts for monitoring (open = idle + in use)"""
+        connector = self._connector
+        if connector is None or connector.closed:
+            return {"status": "closed", "open": 0, "idle": 0, "in_use": 0,
+                    "limit": self.limit, "limit_per_host": self.limit_per_host}
+
+        # aiohttp keeps idle keep-alive connections per host key and the
+        # currently checked-out ones in a separate set.
+        idle = sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+        in_use = len(getattr(connector, '_acquired', ()))
+        return {
+            "status": "open",
+            "open": idle + in_use,
+            "idle": idle,
+            "in_use": in_use,
+            "hosts": len(getattr(connector, '_conns', {})),
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host
+        }
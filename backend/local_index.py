@@ -0,0 +1,212 @@
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from canonical import canonical_url
+from metrics import LatencyWindow
+from summary_executor import SUMMARY_NOT_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path(__file__).parent / 'data' / 'local_index.sqlite3'
+
+# Dropped from queries so they do not make every term mandatory for nothing
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is', 'of', 'on',
+    'or', 'the', 'to', 'with', 'pdf', 'pdfs', 'paper', 'papers'
+}
+_TOKEN = re.compile(r'\w+')
+
+# bm25() column weights: title, description, categories
+_BM25_WEIGHTS = (4.0, 1.0, 2.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL,
+    publication_year INTEGER,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, description, categories, tokenize = 'porter unicode61'
+);
+"""
+
+
+class LocalPDFIndex:
+    """On-disk catalog of every result we have served, searchable with BM25.
+
+    Documents are keyed by canonical URL and stored as JSON next to an SQLite
+    FTS5 inverted index (title, description, categories) that is updated
+    incrementally as searches complete. SQLite calls are blocking, so the
+    async methods run them in a worker thread behind one lock.
+    """
+
+    def __init__(self, path: Optional[str] = None, min_results: int = None):
+        self.path = Path(path or os.environ.get('LOCAL_INDEX_PATH') or DEFAULT_INDEX_PATH)
+        # Local answers are used only when at least this many documents match every query term
+        self.min_results = min_results or int(os.environ.get('LOCAL_FIRST_MIN_RESULTS', 10))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.queries = 0
+        self.local_hits = 0
+        self.fallbacks = 0
+        self.indexed = 0
+        self.errors = 0
+        self._latencies = LatencyWindow()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.info(f"Local PDF index opened at {self.path}")
+        return self._conn
+
+    @staticmethod
+    def match_expression(query: str) -> Optional[str]:
+        """FTS5 query requiring every meaningful query term (terms are quoted)"""
+        terms = [t for t in _TOKEN.findall((query or '').lower()) if t not in _STOPWORDS]
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"' for term in dict.fromkeys(terms))
+
+    def add_many(self, results: List[Dict[str, Any]]) -> int:
+        """Insert or refresh documents (result dicts); returns how many were written"""
+        now = datetime.utcnow().isoformat()
+        written = 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for result in results:
+                    if not result.get('url'):
+                        continue
+                    key = canonical_url(result['url'])
+                    row = conn.execute("SELECT id, data FROM documents WHERE key = ?", (key,)).fetchone()
+                    data = dict(result)
+                    if row:
+                        # Keep what earlier searches learned (e.g. summaries) when this copy lacks it
+                        previous = json.loads(row[1])
+                        for field, value in previous.items():
+                            if data.get(field) in (None, '', []):
+                                data[field] = value
+                    year = _year(data.get('publication_date'))
+                    if row:
+                        doc_id = row[0]
+                        conn.execute(
+                            "UPDATE documents SET data = ?, publication_year = ?, last_seen = ?, "
+                            "seen_count = seen_count + 1 WHERE id = ?",
+                            (json.dumps(data, default=str), year, now, doc_id)
+                        )
+                        conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+                    else:
+                        doc_id = conn.execute(
+                            "INSERT INTO documents (key, data, publication_year, first_seen, last_seen) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (key, json.dumps(data, default=str), year, now, now)
+                        ).lastrowid
+                    conn.execute(
+                        "INSERT INTO documents_fts (rowid, title, description, categories) VALUES (?, ?, ?, ?)",
+                        (doc_id, data.get('title') or '', data.get('description') or '',
+                         ' '.join(data.get('categories') or []))
+                    )
+                    written += 1
+        self.indexed += written
+        return written
+
+    def search(self, query: str, limit: int, start_year: int = None, end_year: int = None) -> List[Dict[str, Any]]:
+        """Best BM25 matches as result dicts; undated documents pass the year filter"""
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        sql = (
+            "SELECT d.data, bm25(documents_fts, ?, ?, ?) AS score FROM documents_fts "
+            "JOIN documents d ON d.id = documents_fts.rowid WHERE documents_fts MATCH ?"
+        )
+        params: List[Any] = [*_BM25_WEIGHTS, expression]
+        if start_year is not None and end_year is not None:
+            sql += " AND (d.publication_year IS NULL OR d.publication_year BETWEEN ? AND ?)"
+            params += [start_year, end_year]
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        return [json.loads(data) for data, _ in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    async def index_results(self, results: List[Any]):
+        """Add served results (PDFResult objects) to the index in a worker thread"""
+        docs = [result.model_dump() for result in results]
+        for doc in docs:
+            # A placeholder must not replace a summary stored by an earlier search
+            if doc.get('ai_summary') == SUMMARY_NOT_AVAILABLE:
+                doc['ai_summary'] = None
+        try:
+            await asyncio.to_thread(self.add_many, docs)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error indexing results locally: {e}")
+
+    async def lookup(self, query: str, limit: int, start_year: int = None,
+                     end_year: int = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Local matches and whether there are enough of them to skip the remote search"""
+        self.queries += 1
+        started = time.monotonic()
+        try:
+            docs = await asyncio.to_thread(self.search, query, limit, start_year, end_year)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error searching local index: {e}")
+            docs = []
+        self._latencies.observe(time.monotonic() - started)
+
+        sufficient = len(docs) >= min(self.min_results, limit)
+        if sufficient:
+            self.local_hits += 1
+        else:
+            self.fallbacks += 1
+        return docs, sufficient
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        latency = self._latencies.summary()
+        return {
+            "path": str(self.path),
+            "queries": self.queries,
+            "local_hits": self.local_hits,
+            "fallbacks": self.fallbacks,
+            "indexed": self.indexed,
+            "errors": self.errors,
+            "min_results": self.min_results,
+            "latency_p50": latency["p50"],
+            "latency_p95": latency["p95"]
+        }
+
+
+def _year(publication_date: Optional[str]) -> Optional[int]:
+    match = re.match(r'\d{4}', publication_date or '')
+    return int(match.group(0)) if match else None
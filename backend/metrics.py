@@ -0,0 +1,225 @@
+import time
+import bisect
+import asyncio
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 5, 10, 20, 30, 40, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.bucket_labels = [f'le="{bound:g}"' for bound in self.buckets] + ['le="+Inf"']
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.bucket_labels, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, bound)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def latency_summary(latencies: Iterable[float], digits: int = 4) -> Dict[str, Optional[float]]:
+    """p50, p95, mean and max of some latencies in seconds (all None if there are none)"""
+    values = sorted(latencies)
+    if not values:
+        return {"p50": None, "p95": None, "avg": None, "max": None}
+    return {
+        "p50": round(values[len(values) // 2], digits),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], digits),
+        "avg": round(sum(values) / len(values), digits),
+        "max": round(values[-1], digits)
+    }
+
+
+class LatencyWindow:
+    """The last `size` latencies of one operation, summarized for stats() output"""
+
+    def __init__(self, size: int = 500):
+        self._latencies = deque(maxlen=size)
+
+    def observe(self, seconds: float):
+        self._latencies.append(seconds)
+
+    def summary(self, digits: int = 4) -> Dict[str, Optional[float]]:
+        return latency_summary(self._latencies, digits)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List[Any] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "pdfscope_http_request_seconds", "Time to the response start per endpoint", ("endpoint", "status"))
+STAGE_SECONDS = registry.histogram(
+    "pdfscope_stage_seconds", "Duration of each search pipeline stage", ("pipeline", "stage"))
+STAGE_ERRORS = registry.counter(
+    "pdfscope_stage_errors_total", "Pipeline stages that raised", ("pipeline", "stage"))
+UPSTREAM_SECONDS = registry.histogram(
+    "pdfscope_upstream_seconds", "Latency of each upstream call", ("upstream", "outcome"))
+UPSTREAM_ERRORS = registry.counter(
+    "pdfscope_upstream_errors_total", "Failed upstream calls by error type", ("upstream", "error"))
+UPSTREAM_RESULTS = registry.histogram(
+    "pdfscope_upstream_results", "Results returned per upstream call", ("upstream",), buckets=COUNT_BUCKETS)
+SEARCH_RESULTS = registry.histogram(
+    "pdfscope_search_results", "Results returned per search", ("served_from",), buckets=COUNT_BUCKETS)
+MONGO_WRITE_SECONDS = registry.histogram(
+    "pdfscope_mongo_write_seconds", "Latency of buffered Mongo batch writes", ("collection", "outcome"))
+
+
+# Per-request list of (name, seconds) for the Server-Timing header. Tasks
+# spawned while handling a request inherit the same list.
+_request_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_timings", default=None)
+
+
+def record_timing(name: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def timed_upstream(upstream: str) -> Iterator[Dict[str, Any]]:
+    """Time an upstream call; set ctx['outcome'] / ctx['results'] inside the block"""
+    ctx: Dict[str, Any] = {"outcome": "ok", "results": None}
+    started = time.monotonic()
+    try:
+        yield ctx
+    except BaseException as e:
+        # An outcome set by the caller (e.g. throttled) wins over the exception
+        if isinstance(e, asyncio.CancelledError):
+            ctx["outcome"] = "cancelled"
+        elif ctx["outcome"] == "ok":
+            ctx["outcome"] = "error"
+            UPSTREAM_ERRORS.inc(upstream, type(e).__name__)
+        raise
+    finally:
+        elapsed = time.monotonic() - started
+        UPSTREAM_SECONDS.observe(elapsed, upstream, ctx["outcome"])
+        if ctx["results"] is not None:
+            UPSTREAM_RESULTS.observe(ctx["results"], upstream)
+        record_timing(upstream, elapsed)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding a Server-Timing header and per-endpoint latency.
+
+    Whatever was recorded with record_timing() before the response starts
+    goes into the header (repeated names are summed, e.g. several Google
+    pages), plus a 'total' entry. Streaming responses start early and so
+    carry only what was known at that point.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        started = time.monotonic()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.monotonic() - started
+                endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+                HTTP_REQUEST_SECONDS.observe(elapsed, endpoint, str(message["status"]))
+                header = self.header_value(timings, elapsed)
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+
+    @staticmethod
+    def header_value(timings: List[Tuple[str, float]], total: float) -> str:
+        durations: Dict[str, float] = {}
+        for name, seconds in timings:
+            durations[name] = durations.get(name, 0.0) + seconds
+        entries = [f"{_token(name)};dur={seconds * 1000:.1f}" for name, seconds in durations.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def _token(name: str) -> str:
+    # Server-Timing metric names must be HTTP tokens
+    return "".join(char if char.isalnum() or char in "-_.!#$%&'*+^`|~" else "_" for char in name)
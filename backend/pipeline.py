@@ -0,0 +1,92 @@
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+from metrics import STAGE_ERRORS, STAGE_SECONDS, record_timing
+
+logger = logging.getLogger(__name__)
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class Stage:
+    def __init__(self, name: str, func: StageFunc, depends_on: Sequence[str] = (), background: bool = False):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.background = background
+
+
+class StagePipeline:
+    """Small dependency graph of async stages.
+
+    Each stage receives the results of the stages finished so far and starts
+    as soon as everything it depends on is done, so independent stages run
+    concurrently. Background stages are left out of run() and executed by
+    run_background(), typically after the response has been sent.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add_stage(self, name: str, func: StageFunc, depends_on: Sequence[str] = (), background: bool = False):
+        """Register a stage; dependencies must already be registered, which keeps the graph acyclic"""
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' already registered")
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+            if self.stages[dependency].background and not background:
+                raise ValueError(f"Stage '{name}' cannot depend on background stage '{dependency}'")
+        self.stages[name] = Stage(name, func, depends_on, background)
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every foreground stage, returning results keyed by stage name"""
+        await self._run_stages([stage for stage in self.stages.values() if not stage.background])
+        return self.results
+
+    async def run_background(self):
+        """Run background stages; failures are logged rather than raised"""
+        try:
+            await self._run_stages([stage for stage in self.stages.values() if stage.background])
+        except Exception as e:
+            logger.error(f"Background stage failed in {self.name}: {e}")
+
+    async def _run_stages(self, stages: List[Stage]):
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage):
+            for dependency in stage.depends_on:
+                if dependency in tasks:
+                    await tasks[dependency]
+            started = time.monotonic()
+            try:
+                self.results[stage.name] = await stage.func(self.results)
+            except Exception:
+                STAGE_ERRORS.inc(self.name, stage.name)
+                raise
+            finally:
+                elapsed = time.monotonic() - started
+                self.timings[stage.name] = round(elapsed, 4)
+                STAGE_SECONDS.observe(elapsed, self.name, stage.name)
+                record_timing(stage.name, elapsed)
+
+        # Stages are registered in dependency order, so every dependency task
+        # exists before its dependents start awaiting it.
+        for stage in stages:
+            tasks[stage.name] = asyncio.create_task(run_stage(stage), name=f"{self.name}:{stage.name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            logger.info(f"{self.name} stage timings: {self.timings}")
@@ -0,0 +1,243 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Primary search calls are paced but never shed; low-priority work
+# (suggestions, summaries) is dropped first when budget runs short.
+PRIORITY_PRIMARY = 0
+PRIORITY_LOW = 1
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call is shed or the upstream budget is exhausted"""
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(f"{upstream}: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class UpstreamThrottled(Exception):
+    """Raised by a request function when the upstream answered 429/503"""
+
+    def __init__(self, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(f"upstream throttled (status={status}, retry_after={retry_after})")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header as seconds (delta-seconds or HTTP-date form)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(retry_at.tzinfo)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def try_acquire(self, reserve: float = 0.0) -> bool:
+        """Take one token if more than `reserve` tokens would remain"""
+        self._refill()
+        if time.monotonic() < self.paused_until:
+            return False
+        if self.tokens - 1 >= reserve:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        """Seconds until a token is expected to be available"""
+        self._refill()
+        pause = max(self.paused_until - time.monotonic(), 0.0)
+        deficit = max(1 - self.tokens, 0.0)
+        return max(pause, deficit / self.rate if self.rate > 0 else float('inf'))
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for a while (used to honor Retry-After)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class DailyQuota:
+    """Calls allowed per quota day; the day rolls over at reset_hour UTC"""
+
+    def __init__(self, limit: int, reset_hour: int = 0):
+        self.limit = limit
+        self.reset_hour = reset_hour
+        self.used = 0
+        self.day = self._current_day()
+
+    def _current_day(self):
+        return (datetime.utcnow() - timedelta(hours=self.reset_hour)).date()
+
+    def _roll(self):
+        day = self._current_day()
+        if day != self.day:
+            self.day = day
+            self.used = 0
+
+    def remaining(self) -> int:
+        self._roll()
+        return max(self.limit - self.used, 0)
+
+    def consume(self):
+        self._roll()
+        self.used += 1
+
+
+class UpstreamLimiter:
+    """Token bucket plus optional daily quota for one upstream API"""
+
+    def __init__(self, name: str, rate: float, burst: float, daily_limit: Optional[int] = None,
+                 quota_reset_hour: int = 0, low_priority_reserve: float = 0.2, max_wait: float = 5.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.quota = DailyQuota(daily_limit, quota_reset_hour) if daily_limit else None
+        self.low_priority_reserve = low_priority_reserve
+        self.max_wait = max_wait
+
+        self.granted = 0
+        self.shed = 0
+        self.rejected = 0
+        self.throttled = 0
+
+    async def acquire(self, priority: int = PRIORITY_PRIMARY):
+        """Wait for permission to make one call, or raise RateLimitExceeded"""
+        if self.quota:
+            remaining = self.quota.remaining()
+            if remaining <= 0:
+                self.rejected += 1
+                raise RateLimitExceeded(self.name, "daily quota exhausted")
+            if priority != PRIORITY_PRIMARY and remaining <= self.quota.limit * self.low_priority_reserve:
+                self.shed += 1
+                raise RateLimitExceeded(self.name, "daily quota reserved for primary calls")
+
+        if priority != PRIORITY_PRIMARY:
+            # Low-priority work only runs on spare capacity and never waits
+            if not self.bucket.try_acquire(reserve=self.bucket.capacity * self.low_priority_reserve):
+                self.shed += 1
+                raise RateLimitExceeded(self.name, "shed low-priority call")
+        else:
+            deadline = time.monotonic() + self.max_wait
+            while not self.bucket.try_acquire():
+                wait = self.bucket.wait_time()
+                if time.monotonic() + wait > deadline:
+                    self.rejected += 1
+                    raise RateLimitExceeded(self.name, f"no capacity within {self.max_wait}s")
+                await asyncio.sleep(wait)
+
+        if self.quota:
+            self.quota.consume()
+        self.granted += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = {
+            "rate_per_second": self.bucket.rate,
+            "burst": self.bucket.capacity,
+            "tokens_available": round(self.bucket.available(), 2),
+            "paused_for": round(max(self.bucket.paused_until - time.monotonic(), 0.0), 2),
+            "granted": self.granted,
+            "shed": self.shed,
+            "rejected": self.rejected,
+            "throttled": self.throttled
+        }
+        if self.quota:
+            snapshot["daily_limit"] = self.quota.limit
+            snapshot["daily_remaining"] = self.quota.remaining()
+        return snapshot
+
+
+async def call_with_retries(limiter: UpstreamLimiter, func: Callable[[], Awaitable[Any]],
+                            priority: int = PRIORITY_PRIMARY, attempts: int = 3,
+                            base_delay: float = 0.5, max_delay: float = 10.0) -> Any:
+    """Call func() under the limiter, retrying throttled calls with jittered backoff
+
+    A Retry-After from the upstream pauses the whole limiter, so concurrent
+    callers back off too, even when the delay is too long to retry or the
+    attempts are used up. Low-priority calls are not retried.
+    """
+    for attempt in range(attempts):
+        await limiter.acquire(priority)
+        try:
+            return await func()
+        except UpstreamThrottled as e:
+            limiter.throttled += 1
+            if e.retry_after is not None:
+                # Honor the upstream's pause even when this call gives up
+                limiter.bucket.pause(e.retry_after)
+                delay = e.retry_after
+            else:
+                delay = base_delay * (2 ** attempt)
+            if priority != PRIORITY_PRIMARY or attempt == attempts - 1 or delay > max_delay:
+                raise
+            delay += random.uniform(0, min(delay, 1.0) * 0.5)
+            limiter.bucket.pause(delay)
+            logger.warning(f"{limiter.name} throttled (status {e.status}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+class RateLimiterRegistry:
+    def __init__(self):
+        self.limiters: Dict[str, UpstreamLimiter] = {}
+
+    def add(self, limiter: UpstreamLimiter) -> UpstreamLimiter:
+        self.limiters[limiter.name] = limiter
+        return limiter
+
+    def get(self, name: str) -> Optional[UpstreamLimiter]:
+        return self.limiters.get(name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+
+
+def build_default_limiters() -> RateLimiterRegistry:
+    """Limiters for Google CSE and OpenAI, configured from the environment"""
+    registry = RateLimiterRegistry()
+    registry.add(UpstreamLimiter(
+        "google_cse",
+        rate=float(os.environ.get('GOOGLE_CSE_RATE_PER_SEC', 1.5)),
+        burst=float(os.environ.get('GOOGLE_CSE_BURST', 10)),
+        daily_limit=int(os.environ.get('GOOGLE_CSE_DAILY_QUOTA', 10000)),
+        # Google resets the CSE quota at midnight Pacific time
+        quota_reset_hour=int(os.environ.get('GOOGLE_CSE_QUOTA_RESET_UTC_HOUR', 8)),
+        max_wait=float(os.environ.get('GOOGLE_CSE_MAX_WAIT', 5))
+    ))
+    registry.add(UpstreamLimiter(
+        "openai",
+        rate=float(os.environ.get('OPENAI_RATE_PER_SEC', 8)),
+        burst=float(os.environ.get('OPENAI_BURST', 20)),
+        daily_limit=int(os.environ['OPENAI_DAILY_QUOTA']) if os.environ.get('OPENAI_DAILY_QUOTA') else None,
+        max_wait=float(os.environ.get('OPENAI_MAX_WAIT', 5))
+    ))
+    return registry
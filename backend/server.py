@@ -1,26 +1,50 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Query
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable
 import uuid
+import time
 from datetime import datetime, timedelta
-import aiohttp
 import asyncio
 from urllib.parse import quote, urlencode
 import json
 import xml.etree.ElementTree as ET
 from html.parser import HTMLParser
-import re
 from dateutil import parser as date_parser
 
 # Load the emergentintegrations library for OpenAI
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 
+from http_pool import HTTPSessionPool
+from summary_executor import SUMMARY_NOT_AVAILABLE, SummaryExecutor
+from pipeline import StagePipeline
+from caching import SearchResultCache, LLMResponseCache, CACHE_MISS, normalize_query
+from summary_store import PDFSummaryStore
+from singleflight import SingleFlight
+from text_features import TextFeatures, default_extractor
+from arxiv_feed import ArxivFeedParser, parse_feed
+from cpu_offload import CPUOffloader
+from domain_authority import DomainAuthorityIndex
+from dedup import ResultDeduplicator
+from local_index import LocalPDFIndex
+from autocomplete import AutocompleteIndex
+from write_buffer import WriteBehindBuffer
+from history import SearchHistoryStore
+from analytics import GRANULARITIES, SearchAnalytics
+from metrics import SEARCH_RESULTS, ServerTimingMiddleware, registry as metrics_registry, timed_upstream
+from circuit_breaker import CircuitBreaker, CircuitOpenError, UpstreamError, breaker_from_env
+from rate_limit import (
+    RateLimiterRegistry, RateLimitExceeded, UpstreamLimiter, UpstreamThrottled, build_default_limiters,
+    call_with_retries, parse_retry_after, PRIORITY_PRIMARY, PRIORITY_LOW
+)
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -29,6 +53,18 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Shared HTTP connection pool for all upstream search APIs
+http_pool = HTTPSessionPool()
+
+# Token buckets and daily budgets for the paid upstreams (Google CSE, OpenAI)
+rate_limiters = build_default_limiters()
+
+# Per-domain relevance weights, hot-reloaded from backend/data/domain_authority.json
+domain_authority = DomainAuthorityIndex()
+
+# Large formatting/ranking/dedup batches run on a worker thread
+cpu_offloader = CPUOffloader()
+
 # Create the main app without a prefix
 app = FastAPI(
     title="PDFScope - AI-Powered PDF Search Engine",
@@ -46,6 +82,7 @@ class SearchRequest(BaseModel):
     sources: Optional[List[str]] = None
     date_range: Optional[str] = "2015-2025"  # Focus on recent PDFs with expanded range
     priority_google: Optional[bool] = True  # Prioritize Google results
+    local_first: Optional[bool] = None  # Answer from the local index when it has enough matches
 
 class PDFResult(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -77,6 +114,10 @@ class SearchResponse(BaseModel):
     suggestions: List[str] = []
     sources_used: List[str] = []
     google_results_count: Optional[int] = None
+    stage_timings: Dict[str, float] = {}
+
+# Receives (source name, batch of results) as results become available
+ResultsCallback = Callable[[str, List[PDFResult]], None]
 
 class SummarizeRequest(BaseModel):
     pdf_url: str
@@ -84,26 +125,87 @@ class SummarizeRequest(BaseModel):
 
 # OpenAI Integration Helper
 class AISearchEngine:
-    def __init__(self):
+    def __init__(self, cache: Optional[LLMResponseCache] = None, limiter: Optional[UpstreamLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None):
         self.openai_key = os.environ.get('OPENAI_API_KEY')
         if not self.openai_key:
             raise ValueError("OpenAI API key not found in environment variables")
+        self.provider = "openai"
+        self.model = "gpt-4o"
+        self.system_message = "You are an intelligent PDF search assistant specializing in finding recent academic papers, research documents, and technical reports from 1975-2025. Help users discover the most relevant and up-to-date documents."
+        self.cache = cache
+        # Identical prompts in flight at the same time share one LLM call
+        self.flight = SingleFlight("llm")
+        self.limiter = limiter
+        self.breaker = breaker or breaker_from_env("openai", 30)
     
     async def create_chat_instance(self):
         """Create a new LlmChat instance for each request"""
         return LlmChat(
             api_key=self.openai_key,
             session_id=f"search_session_{uuid.uuid4()}",
-            system_message="You are an intelligent PDF search assistant specializing in finding recent academic papers, research documents, and technical reports from 1975-2025. Help users discover the most relevant and up-to-date documents."
-        ).with_model("openai", "gpt-4o").with_max_tokens(2048)
+            system_message=self.system_message
+        ).with_model(self.provider, self.model).with_max_tokens(2048)
+    
+    async def _complete(self, call_type: str, text: str, priority: int = PRIORITY_PRIMARY) -> str:
+        """Send a prompt to the LLM, memoized by model and prompt hash
+        
+        Low-priority calls are shed (RateLimitExceeded) before primary ones
+        when the OpenAI budget runs short.
+        """
+        prompt = f"{self.system_message}\n{text}"
+        if self.cache:
+            cached = await self.cache.get(call_type, self.model, prompt)
+            if cached is not None:
+                return cached
+        
+        async def send():
+            chat = await self.create_chat_instance()
+            try:
+                return await chat.send_message(UserMessage(text=text))
+            except Exception as e:
+                if self._is_rate_limit_error(e):
+                    headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+                    raise UpstreamThrottled(429, parse_retry_after(headers.get('retry-after')))
+                raise
+        
+        async def attempt():
+            # Rate limiting is handled by the limiter, not counted as an outage
+            return await self.breaker.call(send, ignore=(UpstreamThrottled,))
+        
+        async def call_llm():
+            if self.limiter:
+                response = await call_with_retries(self.limiter, attempt, priority)
+            else:
+                response = await attempt()
+            if self.cache:
+                self.cache.set(call_type, self.model, prompt, response)
+            return response
+        
+        return await self.flight.do(LLMResponseCache.make_key(self.model, prompt), call_llm)
+    
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        """Detect an OpenAI 429 raised through the chat client, by status or exception type"""
+        seen = set()
+        while error is not None and id(error) not in seen:
+            seen.add(id(error))
+            status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+            if status is None:
+                status = getattr(getattr(error, 'response', None), 'status_code', None)
+            if status == 429 or type(error).__name__ == 'RateLimitError':
+                return True
+            error = error.__cause__ or error.__context__
+        return False
     
     async def reformulate_query_for_google(self, original_query: str) -> str:
         """Use AI to optimize queries specifically for Google PDF search"""
         try:
-            chat = await self.create_chat_instance()
-            message = UserMessage(
-                text=f"""
-                Original query: "{original_query}"
+            # Normalized so queries differing only in case or spacing share a cache entry
+            response = await self._complete(
+                "reformulate",
+                f"""
+                Original query: "{normalize_query(original_query)}"
                 
                 Reformulate this query to be highly effective for Google PDF search, focusing on finding recent academic papers, research reports, and technical documents from 1975-2025.
                 
@@ -117,7 +219,6 @@ class AISearchEngine:
                 Return only the optimized query, nothing else.
                 """
             )
-            response = await chat.send_message(message)
             return response.strip()
         except Exception as e:
             logger.error(f"Error reformulating query: {e}")
@@ -126,10 +227,10 @@ class AISearchEngine:
     async def generate_suggestions(self, query: str) -> List[str]:
         """Generate related search suggestions for recent academic content"""
         try:
-            chat = await self.create_chat_instance()
-            message = UserMessage(
-                text=f"""
-                Based on this search query: "{query}"
+            response = await self._complete(
+                "suggestions",
+                f"""
+                Based on this search query: "{normalize_query(query)}"
                 
                 Generate 3 related search suggestions that would help find recent academic papers, research reports, and technical documents (1975-2025).
                 Focus on:
@@ -139,9 +240,9 @@ class AISearchEngine:
                 - Complementary research areas
                 
                 Return only the suggestions, one per line.
-                """
+                """,
+                priority=PRIORITY_LOW
             )
-            response = await chat.send_message(message)
             suggestions = [s.strip() for s in response.split('\n') if s.strip()]
             return suggestions[:3]
         except Exception as e:
@@ -149,12 +250,16 @@ class AISearchEngine:
             return []
     
     async def summarize_pdf_content(self, title: str, description: str = "", domain: str = None) -> str:
-        """Generate AI summary for PDF based on metadata"""
+        """Generate AI summary for PDF based on metadata
+        
+        Callers look up and store summaries per URL themselves (SummaryExecutor
+        in bulk, the summary backfill by canonical URL).
+        """
         try:
-            chat = await self.create_chat_instance()
             domain_context = f" from {domain}" if domain else ""
-            message = UserMessage(
-                text=f"""
+            response = await self._complete(
+                "summary",
+                f"""
                 PDF Title: {title}
                 Description: {description}
                 Source domain{domain_context}
@@ -162,34 +267,56 @@ class AISearchEngine:
                 Based on the title, description, and source, provide a brief 2-3 sentence summary of what this PDF likely contains.
                 Focus on the main research topic, potential methodology, and value for researchers or professionals.
                 Consider that this is a document from 1975-2025 in your summary.
-                """
+                """,
+                priority=PRIORITY_LOW
             )
-            response = await chat.send_message(message)
             return response.strip()
         except Exception as e:
             logger.error(f"Error generating PDF summary: {e}")
-            return "AI summary not available"
+            return SUMMARY_NOT_AVAILABLE
 
-# Initialize AI engine
-ai_engine = AISearchEngine()
+# Initialize AI engine with memoized LLM responses
+llm_cache = LLMResponseCache(db.llm_cache)
+summary_store = PDFSummaryStore(db.pdf_summaries)
+ai_engine = AISearchEngine(llm_cache, rate_limiters.get("openai"))
+summary_executor = SummaryExecutor(ai_engine, summary_store=summary_store)
 
 # Google Custom Search Engine
 class GooglePDFSearch:
-    def __init__(self):
+    def __init__(self, http_pool: HTTPSessionPool, limiter: Optional[UpstreamLimiter] = None, breaker: Optional[CircuitBreaker] = None,
+                 domain_authority: Optional[DomainAuthorityIndex] = None, offloader: Optional[CPUOffloader] = None):
         self.name = "Google PDF Search"
+        self.http_pool = http_pool
+        self.limiter = limiter
+        self.breaker = breaker or breaker_from_env("google", 15)
         self.api_key = os.environ.get('GOOGLE_API_KEY')
         self.cse_id = os.environ.get('GOOGLE_CSE_ID')
-        self.base_url = "https://www.googleapis.com/customsearch/v1"
+        self.base_url = os.environ.get('GOOGLE_CSE_URL', "https://www.googleapis.com/customsearch/v1")
+        self.page_concurrency = int(os.environ.get('GOOGLE_PAGE_CONCURRENCY', 5))
+        self.feature_extractor = default_extractor
+        self.domain_authority = domain_authority or DomainAuthorityIndex()
+        # Formatting and ranking of large batches runs off the event loop
+        self.offloader = offloader or CPUOffloader()
         
         if not self.api_key or not self.cse_id:
             logger.warning("Google API credentials not found. Google search will be disabled.")
     
-    async def search_pdfs(self, query: str, max_results: int = 50, date_range: str = "2015-2025") -> List[PDFResult]:
-        """Search Google for recent PDFs using Custom Search API with up to 50 results"""
+    async def search_pdfs(self, query: str, max_results: int = 50, date_range: str = "2015-2025", on_results: Optional[ResultsCallback] = None) -> List[PDFResult]:
+        """Search Google for recent PDFs using Custom Search API with up to 50 results
+        
+        on_results, if given, is called with each page of formatted results as
+        soon as that page and every page ranked before it have landed.
+        """
         if not self.api_key or not self.cse_id:
             logger.warning("Google API not configured")
             return []
         
+        if not self.breaker.allow_request():
+            logger.warning(f"Skipping {self.name}: circuit open")
+            return []
+        
+        started = time.monotonic()
+        page_statuses = []
         try:
             # Parse date range
             start_year, end_year = self._parse_date_range(date_range)
@@ -201,18 +328,19 @@ class GooglePDFSearch:
             if end_year >= 2020:
                 pdf_query += ' after:2015'  # Focus on more recent content
             
-            all_results = []
-            
             # Search in batches (Google API returns max 10 per request)
-            # To get 50 results, we need 5 API calls
+            # To get 50 results, we need 5 API calls, fired concurrently
             searches_needed = min((max_results + 9) // 10, 5)  # Max 5 API calls for 50 results
+            semaphore = asyncio.Semaphore(self.page_concurrency)
             
-            for start_index in range(0, searches_needed * 10, 10):
+            page_tasks = {}
+            for page in range(searches_needed):
+                start_index = page * 10
                 params = {
                     'key': self.api_key,
                     'cx': self.cse_id,
                     'q': pdf_query,
-                    'num': min(10, max_results - len(all_results)),
+                    'num': min(10, max_results - start_index),
                     'start': start_index + 1,
                     'safe': 'off',
                     'fileType': 'pdf',
@@ -224,34 +352,128 @@ class GooglePDFSearch:
                     if start_year >= 2010:  # More recent searches
                         params['dateRestrict'] = f'y{min(15, 2025 - start_year)}'  # Last N years
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(self.base_url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            items = data.get('items', [])
-                            
-                            for i, item in enumerate(items):
-                                result = self._format_google_result(item, start_index + i + 1, start_year, end_year)
-                                if result:
-                                    all_results.append(result)
-                        else:
-                            logger.error(f"Google API returned status {response.status}")
-                            if response.status == 429:  # Rate limit
-                                break
-                
-                # If we got fewer than expected results, stop searching
-                if len(data.get('items', [])) < 10:
-                    break
+                task = asyncio.create_task(self._fetch_page(params, semaphore))
+                page_tasks[task] = page
+            
+            # Collect pages as they land; a short page or a 429 means later
+            # pages are pointless, so they are cancelled instead of awaited
+            page_results = {}
+            last_page = searches_needed - 1
+            next_page = 0
+            pending = set(page_tasks)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        page = page_tasks[task]
+                        try:
+                            status, items = task.result()
+                        except Exception as e:
+                            logger.error(f"Error fetching Google page {page + 1}: {e}")
+                            status, items = None, []
+                        page_statuses.append(status)
+                        
+                        if status == 200:
+                            page_results[page] = await self.offloader.run(
+                                len(items), self._format_google_page, items, page * 10, start_year, end_year
+                            )
+                            if len(items) < min(10, max_results - page * 10):
+                                last_page = min(last_page, page)
+                        else:  # Rate limit (429) or failed page
+                            last_page = min(last_page, page - 1)
+                    
+                    for task in [t for t in pending if page_tasks[t] > last_page]:
+                        task.cancel()
+                        pending.discard(task)
+                    
+                    # Emit pages in rank order once everything ranked before them is known
+                    while next_page <= last_page and next_page in page_results:
+                        if on_results and page_results[next_page]:
+                            on_results(self.name, self._filter_and_rank_by_date(page_results[next_page], start_year, end_year))
+                        next_page += 1
+            finally:
+                for task in pending:
+                    task.cancel()
+            
+            # Reassemble in Google rank order
+            all_results = []
+            for page in range(last_page + 1):
+                all_results.extend(page_results.get(page, []))
             
             # Filter by date and sort by relevance and recency
-            filtered_results = self._filter_and_rank_by_date(all_results, start_year, end_year)
+            filtered_results = await self.offloader.run(
+                len(all_results), self._filter_and_rank_by_date, all_results, start_year, end_year
+            )
             
+            self._record_outcome(page_statuses, time.monotonic() - started)
             return filtered_results[:max_results]
             
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
         except Exception as e:
+            self.breaker.record_failure(time.monotonic() - started)
             logger.error(f"Error searching Google: {e}")
             return []
     
+    def _record_outcome(self, page_statuses: List[Optional[int]], latency: float):
+        """Feed the circuit breaker: any good page means Google is up, 429s say nothing"""
+        if 200 in page_statuses:
+            self.breaker.record_success(latency)
+        elif any(status != 429 for status in page_statuses):
+            self.breaker.record_failure(latency)
+        else:
+            self.breaker.release()
+    
+    def _format_google_page(self, items: List[Dict[str, Any]], rank_offset: int, start_year: int, end_year: int) -> List[PDFResult]:
+        """Format one page of Google items, ranking them from rank_offset + 1"""
+        features = self.feature_extractor.extract_batch(
+            (item.get('title', 'Untitled'), item.get('snippet', ''), item.get('link', '')) for item in items
+        )
+        results = []
+        for i, item in enumerate(items):
+            result = self._format_google_result(item, rank_offset + i + 1, start_year, end_year, features[i])
+            if result:
+                results.append(result)
+        return results
+    
+    async def _fetch_page(self, params: Dict[str, Any], semaphore: asyncio.Semaphore) -> tuple:
+        """Fetch one page of Google CSE results, returning (status, items)
+        
+        Calls are paced by the CSE limiter and 429s are retried honoring
+        Retry-After; a page that stays throttled is reported as 429, and so
+        is a page skipped because our own daily quota is spent.
+        """
+        async with semaphore:
+            if not self.limiter:
+                return await self._request_page(params)
+            try:
+                return await call_with_retries(self.limiter, lambda: self._request_page(params))
+            except UpstreamThrottled as e:
+                return e.status, []
+            except RateLimitExceeded as e:
+                # Local budget, not Google's health: kept out of the breaker like a 429
+                logger.warning(f"Skipping Google page: {e}")
+                return 429, []
+    
+    async def _request_page(self, params: Dict[str, Any]) -> tuple:
+        with timed_upstream("google") as timing:
+            # Each page request is bounded by the breaker's call timeout (GOOGLE_TIMEOUT)
+            return await asyncio.wait_for(self._get_page(params, timing), timeout=self.breaker.call_timeout)
+    
+    async def _get_page(self, params: Dict[str, Any], timing: Dict[str, Any]) -> tuple:
+        async with self.http_pool.session.get(self.base_url, params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                items = data.get('items', [])
+                timing["results"] = len(items)
+                return response.status, items
+            logger.error(f"Google API returned status {response.status}")
+            timing["outcome"] = "throttled" if response.status == 429 else f"http_{response.status}"
+            if response.status == 429 and self.limiter:
+                raise UpstreamThrottled(429, parse_retry_after(response.headers.get('Retry-After')))
+            return response.status, []
+    
     def _parse_date_range(self, date_range: str) -> tuple:
         """Parse date range string like '1975-2025'"""
         try:
@@ -272,31 +494,7 @@ class GooglePDFSearch:
         except:
             return "Unknown"
     
-    def _estimate_publication_year(self, title: str, snippet: str, url: str) -> Optional[int]:
-        """Try to estimate publication year from content"""
-        text = f"{title} {snippet} {url}".lower()
-        
-        # Look for year patterns (1975-2025)
-        year_patterns = [
-            r'\b(20[0-2][0-9])\b',  # 2000-2029
-            r'\b(19[7-9][0-9])\b'    # 1970-1999
-        ]
-        
-        years = []
-        for pattern in year_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                year = int(match)
-                if 1975 <= year <= 2025:
-                    years.append(year)
-        
-        if years:
-            # Return the most recent year found
-            return max(years)
-        
-        return None
-    
-    def _format_google_result(self, item: Dict[str, Any], rank: int, start_year: int, end_year: int) -> Optional[PDFResult]:
+    def _format_google_result(self, item: Dict[str, Any], rank: int, start_year: int, end_year: int, features: Optional[TextFeatures] = None) -> Optional[PDFResult]:
         """Convert Google search result to PDFResult format"""
         try:
             title = item.get('title', 'Untitled')
@@ -311,21 +509,16 @@ class GooglePDFSearch:
             # Extract domain for credibility scoring
             domain = self._extract_domain(url)
             
-            # Estimate publication year
-            pub_year = self._estimate_publication_year(title, snippet, url)
+            # Publication year, file size and categories from one text scan
+            if features is None:
+                features = self.feature_extractor.extract(title, snippet, url)
+            pub_year = features.year
+            file_size = features.file_size
+            categories = features.categories
             
             # Calculate relevance score based on domain credibility and recency
             relevance_score = self._calculate_relevance_score(domain, pub_year, rank)
             
-            # Determine if this looks like an academic/research document
-            is_academic = self._is_academic_content(title, snippet, domain)
-            
-            # Extract potential file size from snippet
-            file_size = self._extract_file_size(snippet)
-            
-            # Generate categories based on content
-            categories = self._extract_categories(title, snippet)
-            
             return PDFResult(
                 title=title[:200],
                 description=snippet[:500] if snippet else None,
@@ -350,15 +543,8 @@ class GooglePDFSearch:
         """Calculate relevance score based on domain authority and recency"""
         score = 1.0
         
-        # Domain authority bonus
-        academic_domains = [
-            'edu', 'gov', 'org', 'ac.uk', 'mit.edu', 'stanford.edu', 
-            'harvard.edu', 'ieee.org', 'acm.org', 'arxiv.org', 'nih.gov',
-            'who.int', 'un.org', 'worldbank.org', 'oecd.org'
-        ]
-        
-        if any(domain.endswith(ad) for ad in academic_domains):
-            score += 0.3
+        # Domain authority bonus (most specific listed suffix of the host)
+        score += self.domain_authority.weight(domain)
         
         # Recency bonus (prefer 2015-2025, but also value historical documents)
         if pub_year:
@@ -379,55 +565,6 @@ class GooglePDFSearch:
         
         return max(score, 0.1)
     
-    def _is_academic_content(self, title: str, snippet: str, domain: str) -> bool:
-        """Determine if content appears to be academic/research"""
-        academic_indicators = [
-            'research', 'study', 'analysis', 'survey', 'review', 'paper',
-            'journal', 'conference', 'proceedings', 'thesis', 'dissertation',
-            'report', 'white paper', 'technical', 'scientific'
-        ]
-        
-        text = f"{title} {snippet}".lower()
-        return any(indicator in text for indicator in academic_indicators)
-    
-    def _extract_file_size(self, snippet: str) -> Optional[str]:
-        """Extract file size from snippet if available"""
-        size_patterns = [
-            r'(\d+(?:\.\d+)?)\s*(mb|kb|gb)',
-            r'(\d+(?:\.\d+)?)\s*(megabytes|kilobytes|gigabytes)'
-        ]
-        
-        for pattern in size_patterns:
-            match = re.search(pattern, snippet.lower())
-            if match:
-                size, unit = match.groups()
-                return f"{size} {unit.upper()}"
-        
-        return None
-    
-    def _extract_categories(self, title: str, snippet: str) -> List[str]:
-        """Extract potential categories from title and snippet"""
-        text = f"{title} {snippet}".lower()
-        
-        category_keywords = {
-            'Machine Learning': ['machine learning', 'deep learning', 'neural network', 'ai', 'artificial intelligence'],
-            'Computer Science': ['algorithm', 'software', 'programming', 'computer science', 'computing'],
-            'Medicine': ['medical', 'health', 'disease', 'treatment', 'clinical', 'patient'],
-            'Physics': ['physics', 'quantum', 'particle', 'energy', 'mechanics'],
-            'Biology': ['biology', 'genetic', 'molecular', 'cell', 'organism'],
-            'Engineering': ['engineering', 'design', 'system', 'technical', 'infrastructure'],
-            'Economics': ['economic', 'finance', 'market', 'business', 'trade'],
-            'Environment': ['climate', 'environment', 'sustainability', 'energy', 'green'],
-            'Social Science': ['social', 'society', 'policy', 'public', 'governance']
-        }
-        
-        categories = []
-        for category, keywords in category_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                categories.append(category)
-        
-        return categories[:3]  # Limit to 3 categories
-    
     def _filter_and_rank_by_date(self, results: List[PDFResult], start_year: int, end_year: int) -> List[PDFResult]:
         """Filter results by date range and rank by relevance and recency"""
         filtered = []
@@ -453,172 +590,249 @@ class GooglePDFSearch:
 
 # Multi-Source Search Manager with Google Priority
 class MultiSourceSearchManager:
-    def __init__(self):
-        self.google_search = GooglePDFSearch()
-        # Other search engines (keeping them for fallback/comparison)
+    def __init__(self, http_pool: HTTPSessionPool, rate_limiters: Optional[RateLimiterRegistry] = None,
+                 domain_authority: Optional[DomainAuthorityIndex] = None, offloader: Optional[CPUOffloader] = None):
+        self.offloader = offloader or CPUOffloader()
+        self.google_search = GooglePDFSearch(http_pool, rate_limiters.get("google_cse") if rate_limiters else None,
+                                             domain_authority=domain_authority, offloader=self.offloader)
+        self.deduplicator = ResultDeduplicator()
+        # Other search engines (keeping them for fallback/comparison),
+        # each behind its own circuit breaker and timeout
         self.other_engines = {
-            'arxiv': ArxivSearch(),
-            'semantic_scholar': SemanticScholarSearch(),
+            'arxiv': ArxivSearch(http_pool, breaker_from_env("arxiv", 8), self.offloader),
+            'semantic_scholar': SemanticScholarSearch(http_pool, breaker_from_env("semantic_scholar", 8), self.offloader),
         }
+        # Start supplementary sources alongside Google instead of after it. Off
+        # by default: arXiv asks for one request every 3 seconds, so they are
+        # only queried up front when Google is likely to fall short anyway.
+        self.speculative = os.environ.get('SEARCH_SPECULATIVE_SUPPLEMENTARY', 'false').lower() == 'true'
     
-    async def search_prioritizing_google(self, query: str, max_results: int = 50, date_range: str = "2015-2025") -> tuple[List[PDFResult], int]:
-        """Search with Google as primary source, others as supplementary"""
+    async def search_prioritizing_google(self, query: str, max_results: int = 50, date_range: str = "2015-2025", speculative: Optional[bool] = None, on_results: Optional[ResultsCallback] = None) -> tuple[List[PDFResult], int]:
+        """Search with Google as primary source, others as supplementary
+        
+        In speculative mode the supplementary sources start at the same time as
+        Google and the allocation is applied when merging, so a Google shortfall
+        costs max(latencies) instead of their sum. Unless forced either way, it
+        is used only while Google's circuit is not healthy.
+        
+        on_results, if given, receives each batch of results (per Google page,
+        per supplementary source) as soon as it is known to be used.
+        """
+        if speculative is None:
+            speculative = self.speculative or self.google_search.breaker.health() != "healthy"
         
         # Allocate results: 80% Google, 20% others for better Google focus
         google_results_target = int(max_results * 0.8)
         other_results_target = max_results - google_results_target
         
+        other_tasks = []
+        if speculative and other_results_target > 0:
+            other_tasks = self._start_supplementary_searches(query, other_results_target)
+        
         # Search Google first (primary source)
-        google_results = await self.google_search.search_pdfs(query, google_results_target, date_range)
+        try:
+            google_results = await self.google_search.search_pdfs(query, google_results_target, date_range, on_results=on_results)
+        except BaseException:
+            for task in other_tasks:
+                task.cancel()
+            raise
         
         # Search other sources for supplementary results (if needed)
         other_results = []
         if len(google_results) < google_results_target and other_results_target > 0:
-            # Create tasks for other search engines
-            tasks = []
-            for engine_name, engine in self.other_engines.items():
-                if hasattr(engine, 'search_pdfs'):
-                    task = asyncio.create_task(
-                        engine.search_pdfs(query, max(2, other_results_target // len(self.other_engines))),
-                        name=engine_name
-                    )
-                    tasks.append(task)
-            
-            # Execute other searches in parallel
-            if tasks:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for result in results:
-                    if isinstance(result, Exception):
-                        logger.error(f"Error in supplementary search: {result}")
-                        continue
-                    other_results.extend(result)
+            if not other_tasks:
+                other_tasks = self._start_supplementary_searches(query, other_results_target)
+            other_results = await self._collect_supplementary_results(other_tasks, on_results)
+        else:
+            # Google filled its quota; speculative supplementary work is dropped
+            for task in other_tasks:
+                task.cancel()
         
         # Combine results with Google priority
         all_results = google_results + other_results
         
         # Remove duplicates and limit total results
-        unique_results = self._deduplicate_results(all_results)
+        unique_results = await self.offloader.run(len(all_results), self._deduplicate_results, all_results)
         final_results = unique_results[:max_results]
         
         return final_results, len(google_results)
     
-    def _deduplicate_results(self, results: List[PDFResult]) -> List[PDFResult]:
-        """Remove duplicate results based on URL and title similarity"""
-        unique_results = []
-        seen_urls = set()
-        seen_titles = set()
+    def _start_supplementary_searches(self, query: str, other_results_target: int) -> List[asyncio.Task]:
+        """Create tasks for other search engines"""
+        tasks = []
+        for engine_name, engine in self.other_engines.items():
+            if hasattr(engine, 'search_pdfs'):
+                task = asyncio.create_task(
+                    engine.search_pdfs(query, max(2, other_results_target // len(self.other_engines))),
+                    name=engine_name
+                )
+                tasks.append(task)
+        return tasks
+    
+    async def _collect_supplementary_results(self, tasks: List[asyncio.Task], on_results: Optional[ResultsCallback] = None) -> List[PDFResult]:
+        """Execute other searches in parallel and merge their results"""
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if on_results and not task.cancelled() and task.exception() is None and task.result():
+                        on_results(self.other_engines[task.get_name()].name, task.result())
+        finally:
+            for task in pending:
+                task.cancel()
         
-        for result in results:
-            # Check for URL duplicates
-            if result.url in seen_urls:
+        other_results = []
+        for task in tasks:
+            if task.cancelled():
                 continue
-            
-            # Check for title similarity
-            normalized_title = re.sub(r'[^\w\s]', '', result.title.lower()).strip()
-            if normalized_title in seen_titles:
+            if task.exception() is not None:
+                logger.error(f"Error in supplementary search: {task.exception()}")
                 continue
-            
-            seen_urls.add(result.url)
-            seen_titles.add(normalized_title)
-            unique_results.append(result)
-        
-        return unique_results
+            other_results.extend(task.result())
+        return other_results
+    
+    def _deduplicate_results(self, results: List[PDFResult]) -> List[PDFResult]:
+        """Collapse results for the same document (shared arXiv id, DOI or URL, or a
+        near-identical title), keeping the first and merging metadata from the rest"""
+        return self.deduplicator.deduplicate(results)
 
 # Keep other search engines for reference (simplified versions)
 class ArxivSearch:
-    def __init__(self):
+    def __init__(self, http_pool: HTTPSessionPool, breaker: Optional[CircuitBreaker] = None,
+                 offloader: Optional[CPUOffloader] = None):
         self.name = "arXiv"
-        self.base_url = "http://export.arxiv.org/api/query"
+        self.http_pool = http_pool
+        self.breaker = breaker or breaker_from_env("arxiv", 8)
+        self.offloader = offloader or CPUOffloader()
+        self.base_url = os.environ.get('ARXIV_API_URL', "http://export.arxiv.org/api/query")
+        # Larger pulls are paged through `start`; arXiv asks clients to wait ~3s between calls
+        self.page_size = int(os.environ.get('ARXIV_PAGE_SIZE', 100))
+        self.page_delay = float(os.environ.get('ARXIV_PAGE_DELAY', 3))
+        self.chunk_size = int(os.environ.get('ARXIV_CHUNK_SIZE', 64 * 1024))
     
     async def search_pdfs(self, query: str, max_results: int = 5) -> List[PDFResult]:
-        """Simplified arXiv search for recent papers"""
-        try:
-            params = {
-                'search_query': f'all:{query}',
-                'start': 0,
-                'max_results': max_results,
-                'sortBy': 'submittedDate',
-                'sortOrder': 'descending'
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        xml_data = await response.text()
-                        return self._parse_arxiv_xml(xml_data)
-                    return []
-        except Exception as e:
-            logger.error(f"Error searching arXiv: {e}")
-            return []
+        """arXiv search for recent papers, one page per page_size results"""
+        results = []
+        start = 0
+        while start < max_results:
+            count = min(self.page_size, max_results - start)
+            if start:
+                await asyncio.sleep(self.page_delay)
+            feed = ArxivFeedParser()
+            try:
+                results.extend(await self.breaker.call(self._search, query, start, count, feed))
+            except CircuitOpenError:
+                logger.warning(f"Skipping {self.name}: circuit open")
+                break
+            except Exception as e:
+                logger.error(f"Error searching arXiv: {str(e) or type(e).__name__}")
+                break
+            start += count
+            if feed.entries < count or (feed.total_results is not None and start >= feed.total_results):
+                break
+        return results
     
-    def _parse_arxiv_xml(self, xml_data: str) -> List[PDFResult]:
-        """Parse arXiv XML response"""
-        try:
-            root = ET.fromstring(xml_data)
-            ns = {'atom': 'http://www.w3.org/2005/Atom'}
-            
+    async def _search(self, query: str, start: int, count: int, feed: ArxivFeedParser) -> List[PDFResult]:
+        """Fetch one page, parsing entries as the body streams in"""
+        params = {
+            'search_query': f'all:{query}',
+            'start': start,
+            'max_results': count,
+            'sortBy': 'submittedDate',
+            'sortOrder': 'descending'
+        }
+        
+        async with self.http_pool.session.get(self.base_url, params=params) as response:
+            if response.status != 200:
+                raise UpstreamError(self.name, response.status)
             results = []
-            for entry in root.findall('atom:entry', ns):
-                title = entry.find('atom:title', ns).text.strip() if entry.find('atom:title', ns) is not None else "Untitled"
-                summary = entry.find('atom:summary', ns).text.strip() if entry.find('atom:summary', ns) is not None else ""
-                
-                # Get PDF URL
-                pdf_url = None
-                for link in entry.findall('atom:link', ns):
-                    if link.get('type') == 'application/pdf':
-                        pdf_url = link.get('href')
-                        break
-                
-                # Publication date
-                published = entry.find('atom:published', ns)
-                pub_date = published.text[:4] if published is not None else None
-                
-                if pdf_url:
-                    results.append(PDFResult(
-                        title=title[:200],
-                        description=summary[:500] if summary else None,
-                        url=pdf_url.replace('/pdf/', '/abs/'),
-                        download_url=pdf_url,
-                        source=self.name,
-                        publication_date=pub_date,
-                        relevance_score=0.8,
-                        language="English"
-                    ))
-            
+            try:
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    entries = feed.feed(chunk)
+                    results.extend(await self.offloader.run(len(entries), self._entries_to_results, entries))
+                results.extend(self._entries_to_results(feed.close()))
+            except ET.ParseError as e:
+                # Keep the entries that parsed before the feed broke off
+                logger.error(f"Error parsing arXiv XML: {e}")
             return results
-        except Exception as e:
+    
+    def _parse_arxiv_xml(self, xml_data: str) -> List[PDFResult]:
+        """Parse a complete arXiv XML response"""
+        try:
+            return self._entries_to_results(parse_feed(xml_data))
+        except ET.ParseError as e:
             logger.error(f"Error parsing arXiv XML: {e}")
             return []
+    
+    def _entries_to_results(self, entries: List[Dict[str, Any]]) -> List[PDFResult]:
+        results = []
+        for entry in entries:
+            pdf_url = entry['pdf_url']
+            if not pdf_url:
+                continue
+            title = (entry['title'] or "").strip() or "Untitled"
+            summary = (entry['summary'] or "").strip()
+            doi = (entry['doi'] or "").strip()
+            results.append(PDFResult(
+                title=title[:200],
+                description=summary[:500] if summary else None,
+                url=pdf_url.replace('/pdf/', '/abs/'),
+                download_url=pdf_url,
+                source=self.name,
+                publication_date=entry['published'][:4] if entry['published'] else None,
+                # Journal DOI, when the authors supplied one
+                doi=doi or None,
+                relevance_score=0.8,
+                language="English"
+            ))
+        return results
 
 class SemanticScholarSearch:
-    def __init__(self):
+    def __init__(self, http_pool: HTTPSessionPool, breaker: Optional[CircuitBreaker] = None,
+                 offloader: Optional[CPUOffloader] = None):
         self.name = "Semantic Scholar"
-        self.base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
+        self.http_pool = http_pool
+        self.breaker = breaker or breaker_from_env("semantic_scholar", 8)
+        self.offloader = offloader or CPUOffloader()
+        self.base_url = os.environ.get('SEMANTIC_SCHOLAR_API_URL', "https://api.semanticscholar.org/graph/v1/paper/search")
     
     async def search_pdfs(self, query: str, max_results: int = 5) -> List[PDFResult]:
         """Simplified Semantic Scholar search"""
         try:
-            params = {
-                'query': query,
-                'limit': max_results,
-                'fields': 'title,abstract,authors,year,url,openAccessPdf,citationCount'
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        papers = data.get('data', [])
-                        return [self._format_result(paper) for paper in papers if paper.get('openAccessPdf')]
-                    return []
+            return await self.breaker.call(self._search, query, max_results)
+        except CircuitOpenError:
+            logger.warning(f"Skipping {self.name}: circuit open")
+            return []
         except Exception as e:
-            logger.error(f"Error searching Semantic Scholar: {e}")
+            logger.error(f"Error searching Semantic Scholar: {str(e) or type(e).__name__}")
             return []
     
+    async def _search(self, query: str, max_results: int) -> List[PDFResult]:
+        params = {
+            'query': query,
+            'limit': max_results,
+            'fields': 'title,abstract,authors,year,url,openAccessPdf,citationCount,externalIds'
+        }
+        
+        async with self.http_pool.session.get(self.base_url, params=params) as response:
+            if response.status == 200:
+                data = await response.json()
+                papers = [paper for paper in data.get('data', []) if paper.get('openAccessPdf')]
+                return await self.offloader.run(len(papers), self._format_results, papers)
+            raise UpstreamError(self.name, response.status)
+    
+    def _format_results(self, papers: List[Dict[str, Any]]) -> List[PDFResult]:
+        return [self._format_result(paper) for paper in papers]
+    
     def _format_result(self, paper: Dict[str, Any]) -> PDFResult:
         """Convert Semantic Scholar result to PDFResult format"""
         pdf_info = paper.get('openAccessPdf', {})
+        external_ids = paper.get('externalIds') or {}
+        doi = external_ids.get('DOI')
+        if not doi and external_ids.get('ArXiv'):
+            # arXiv's DataCite DOI, so the paper matches its arXiv result
+            doi = f"10.48550/arXiv.{external_ids['ArXiv']}"
         return PDFResult(
             title=paper.get('title', 'Untitled')[:200],
             description=paper.get('abstract', '')[:500],
@@ -627,12 +841,76 @@ class SemanticScholarSearch:
             source=self.name,
             publication_date=str(paper.get('year')) if paper.get('year') else None,
             citation_count=paper.get('citationCount', 0),
+            doi=doi,
             relevance_score=0.7,
             language="English"
         )
 
 # Initialize search manager
-search_manager = MultiSourceSearchManager()
+search_manager = MultiSourceSearchManager(http_pool, rate_limiters, domain_authority, cpu_offloader)
+
+# Result cache in front of the multi-source search; identical searches in
+# flight at the same time are coalesced onto one upstream fan-out
+result_cache = SearchResultCache(db.search_cache)
+search_flight = SingleFlight("search")
+
+# Every served result is indexed locally; local-first searches answer from
+# here and only go to the remote sources when local recall is too low
+local_index = LocalPDFIndex()
+LOCAL_FIRST_DEFAULT = os.environ.get('LOCAL_FIRST_SEARCH', 'false').lower() == 'true'
+
+# Type-ahead over past queries, seeded from search_history at startup
+autocomplete_index = AutocompleteIndex()
+
+# Search history is written behind the request in insert_many batches; each
+# written batch is folded into the hourly/daily analytics rollups
+analytics = SearchAnalytics(db.search_rollups, db.search_query_counts)
+history_writer = WriteBehindBuffer(db.search_history, "search_history", on_flush=analytics.apply)
+history_store = SearchHistoryStore(db.search_history)
+
+async def cached_search(query: str, max_results: int, date_range: str, on_results: Optional[ResultsCallback] = None,
+                        on_reformulated: Optional[Callable[[str], None]] = None) -> tuple[List[PDFResult], int, str]:
+    """Reformulate and run search_prioritizing_google behind the tiered result cache
+    
+    The cache is keyed on the user's query rather than the LLM rewrite, so a hit
+    skips reformulation as well as the upstream calls. Returns the results, the
+    Google result count and the reformulated query the results came from.
+    """
+    
+    async def search(on_results: Optional[ResultsCallback] = None, on_reformulated: Optional[Callable[[str], None]] = None):
+        google_query = await ai_engine.reformulate_query_for_google(query)
+        logger.info(f"Original query: {query}")
+        logger.info(f"Google-optimized query: {google_query}")
+        if on_reformulated:
+            on_reformulated(google_query)
+        results, google_count = await search_manager.search_prioritizing_google(google_query, max_results, date_range, on_results=on_results)
+        return {"results": [result.model_dump() for result in results], "google_count": google_count, "reformulated_query": google_query}
+    
+    caller = object()
+    
+    async def lookup():
+        # Empty result sets usually mean an upstream problem, so they are not cached.
+        # A stale-entry refresh runs after this request is answered, so it never streams.
+        payload, status = await result_cache.get_or_fetch(
+            query, date_range, max_results,
+            lambda: search(on_results, on_reformulated),
+            should_cache=lambda payload: bool(payload["results"]),
+            refresh=search
+        )
+        # Coalesced callers share this return value, but only the caller that
+        # started the search had its events streamed to its callbacks
+        return payload, status, caller
+    
+    payload, status, leader = await search_flight.do(result_cache.make_key(query, date_range, max_results), lookup)
+    # Every caller gets its own result objects, even when the search was shared
+    results = [PDFResult(**result) for result in payload["results"]]
+    reformulated_query = payload.get("reformulated_query", query)
+    if not (status == CACHE_MISS and leader is caller):
+        if on_reformulated:
+            on_reformulated(reformulated_query)
+        if on_results and results:
+            on_results("cache", results)
+    return results, payload["google_count"], reformulated_query
 
 # API Routes
 @api_router.get("/")
@@ -644,58 +922,115 @@ async def root():
         "max_results": 50
     }
 
-@api_router.post("/search", response_model=SearchResponse)
-async def search_pdfs(request: SearchRequest):
-    """Enhanced search endpoint prioritizing Google's PDF index with up to 50 results"""
-    start_time = asyncio.get_event_loop().time()
+def build_search_pipeline(request: SearchRequest, emit: Optional[Callable[[Dict[str, Any]], None]] = None) -> StagePipeline:
+    """Search flow as a stage graph; emit, if given, receives incremental events"""
+    local_first = LOCAL_FIRST_DEFAULT if request.local_first is None else request.local_first
+    date_range = request.date_range or "2015-2025"
     
-    try:
-        # Reformulate query specifically for Google PDF search
-        reformulated_query = await ai_engine.reformulate_query_for_google(request.query)
-        logger.info(f"Original query: {request.query}")
-        logger.info(f"Google-optimized query: {reformulated_query}")
-        
+    async def local_stage(results):
+        start_year, end_year = search_manager.google_search._parse_date_range(date_range)
+        docs, sufficient = await local_index.lookup(request.query, request.max_results, start_year, end_year)
+        return [PDFResult(**doc) for doc in docs] if sufficient else None
+    
+    def on_reformulated(reformulated_query: str):
+        emit({"event": "reformulated", "query": request.query, "reformulated_query": reformulated_query})
+    
+    def on_results(source: str, batch: List[PDFResult]):
+        emit({"event": "results", "source": source, "results": [result.model_dump() for result in batch]})
+    
+    async def search_stage(results):
+        if results.get("local"):
+            if emit:
+                on_results("Local Index", results["local"])
+            # Served locally, so the Google-specific rewrite is not needed
+            return results["local"], 0, request.query
         # Search with Google priority (up to 50 results)
-        search_results, google_count = await search_manager.search_prioritizing_google(
-            reformulated_query, 
+        return await cached_search(
+            request.query,
             request.max_results,
-            request.date_range or "2015-2025"
+            date_range,
+            on_results=on_results if emit else None,
+            on_reformulated=on_reformulated if emit else None
         )
-        
+    
+    def on_summary(result: PDFResult):
+        emit({"event": "summary", "id": result.id, "ai_summary": result.ai_summary})
+    
+    async def summaries_stage(results):
         # Generate AI summaries for top results (limit to avoid rate limits)
-        for result in search_results[:8]:  # Limit AI summaries to top 8 results
-            try:
-                result.ai_summary = await ai_engine.summarize_pdf_content(
-                    result.title, 
-                    result.description or "",
-                    result.domain
-                )
-            except Exception as e:
-                logger.error(f"Error generating AI summary: {e}")
-                result.ai_summary = "AI summary not available"
-        
-        # Generate search suggestions
+        search_results, _, _ = results["search"]
+        await summary_executor.summarize_results(  # Limit AI summaries to top 8 results
+            search_results[:8],
+            on_summary=on_summary if emit else None
+        )
+    
+    async def suggestions_stage(results):
+        # Suggestions only depend on the original query
         suggestions = await ai_engine.generate_suggestions(request.query)
+        if emit:
+            emit({"event": "suggestions", "suggestions": suggestions})
+        return suggestions
+    
+    async def history_stage(results):
+        # Queue the search for analytics; the writer batches it into Mongo
+        autocomplete_index.record(request.query)
+        history_writer.add(results["record"])
+    
+    async def track_urls_stage(results):
+        # Count served URLs so popular PDFs get summaries ahead of time
+        search_results, _, _ = results["search"]
+        await summary_store.record_seen(search_results)
+    
+    async def index_results_stage(results):
+        # Add served results (with their summaries) to the local index
+        search_results, _, _ = results["search"]
+        await local_index.index_results(search_results)
+    
+    pipeline = StagePipeline("search")
+    if local_first:
+        pipeline.add_stage("local", local_stage)
+        pipeline.add_stage("search", search_stage, depends_on=["local"])
+    else:
+        pipeline.add_stage("search", search_stage)
+    pipeline.add_stage("suggestions", suggestions_stage)
+    pipeline.add_stage("summaries", summaries_stage, depends_on=["search"])
+    pipeline.add_stage("history", history_stage, background=True)
+    pipeline.add_stage("track_urls", track_urls_stage, background=True)
+    pipeline.add_stage("index_results", index_results_stage, background=True)
+    return pipeline
+
+def build_search_record(request: SearchRequest, results: Dict[str, Any], search_time: float) -> Dict[str, Any]:
+    """Search history document for analytics"""
+    search_results, google_count, reformulated_query = results["search"]
+    SEARCH_RESULTS.observe(len(search_results), "local" if results.get("local") else "upstream")
+    return {
+        "id": str(uuid.uuid4()),
+        "original_query": request.query,
+        "reformulated_query": reformulated_query,
+        "results_count": len(search_results),
+        "google_results": google_count,
+        "sources_used": list(set([result.source for result in search_results])),
+        "date_range": request.date_range,
+        "timestamp": datetime.utcnow(),
+        "search_time": search_time
+    }
+
+@api_router.post("/search", response_model=SearchResponse)
+async def search_pdfs(request: SearchRequest, background_tasks: BackgroundTasks):
+    """Enhanced search endpoint prioritizing Google's PDF index with up to 50 results"""
+    start_time = asyncio.get_event_loop().time()
+    pipeline = build_search_pipeline(request)
+    
+    try:
+        results = await pipeline.run()
+        search_results, google_count, reformulated_query = results["search"]
+        suggestions = results["suggestions"]
         
         # Calculate search time
         search_time = round(asyncio.get_event_loop().time() - start_time, 2)
         
-        # Get list of sources used
-        sources_used = list(set([result.source for result in search_results]))
-        
-        # Store search in database for analytics
-        search_record = {
-            "id": str(uuid.uuid4()),
-            "original_query": request.query,
-            "reformulated_query": reformulated_query,
-            "results_count": len(search_results),
-            "google_results": google_count,
-            "sources_used": sources_used,
-            "date_range": request.date_range,
-            "timestamp": datetime.utcnow(),
-            "search_time": search_time
-        }
-        await db.search_history.insert_one(search_record)
+        results["record"] = build_search_record(request, results, search_time)
+        background_tasks.add_task(pipeline.run_background)
         
         return SearchResponse(
             query=request.query,
@@ -704,14 +1039,82 @@ async def search_pdfs(request: SearchRequest):
             total_found=len(search_results),
             search_time=search_time,
             suggestions=suggestions,
-            sources_used=sources_used,
-            google_results_count=google_count
+            sources_used=results["record"]["sources_used"],
+            google_results_count=google_count,
+            stage_timings=dict(pipeline.timings)
         )
         
     except Exception as e:
         logger.error(f"Search error: {e}")
         raise HTTPException(status_code=500, detail="Search failed. Please try again.")
 
+@api_router.post("/search/stream")
+async def search_pdfs_stream(request: SearchRequest):
+    """Streaming search: NDJSON events sent as each stage and source completes
+    
+    Events: reformulated, results (one per Google page or supplementary source),
+    summary and suggestions (patching earlier results by id), then complete with
+    the final ranked result ids and timings, or error.
+    """
+    loop = asyncio.get_event_loop()
+    start_time = loop.time()
+    queue: asyncio.Queue = asyncio.Queue()
+    first_result_time = None
+    
+    def emit(event: Dict[str, Any]):
+        nonlocal first_result_time
+        if event["event"] == "results" and first_result_time is None:
+            first_result_time = round(loop.time() - start_time, 3)
+        queue.put_nowait(event)
+    
+    pipeline = build_search_pipeline(request, emit)
+    
+    async def run_pipeline():
+        try:
+            results = await pipeline.run()
+            search_results, google_count, _ = results["search"]
+            search_time = round(loop.time() - start_time, 2)
+            results["record"] = build_search_record(request, results, search_time)
+            logger.info(f"Streamed search: first result after {first_result_time}s, complete after {search_time}s")
+            emit({
+                "event": "complete",
+                "result_ids": [result.id for result in search_results],
+                "total_found": len(search_results),
+                "sources_used": results["record"]["sources_used"],
+                "google_results_count": google_count,
+                "time_to_first_result": first_result_time,
+                "search_time": search_time,
+                "stage_timings": dict(pipeline.timings)
+            })
+        except Exception as e:
+            logger.error(f"Streaming search error: {e}")
+            emit({"event": "error", "detail": "Search failed. Please try again."})
+        finally:
+            queue.put_nowait(None)
+    
+    async def event_stream():
+        task = asyncio.create_task(run_pipeline())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield json.dumps(event, default=str) + "\n"
+        finally:
+            # Client went away or stream finished; stop any remaining work
+            if not task.done():
+                task.cancel()
+    
+    async def run_background():
+        if "record" in pipeline.results:
+            await pipeline.run_background()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(run_background)
+    )
+
 @api_router.get("/sources")
 async def get_available_sources():
     """Get list of available search sources with Google priority"""
@@ -751,6 +1154,12 @@ async def get_search_suggestions(q: str = Query(..., description="Query to gener
         logger.error(f"Error getting suggestions: {e}")
         return {"suggestions": []}
 
+@api_router.get("/autocomplete")
+async def autocomplete(q: str = Query(..., description="Prefix typed so far"),
+                       limit: int = Query(10, ge=1, le=20)):
+    """Instant completions from past searches (LLM suggestions remain at /suggestions)"""
+    return {"suggestions": autocomplete_index.complete(q, limit)}
+
 @api_router.post("/summarize")
 async def summarize_pdf(request: SummarizeRequest):
     """Generate AI summary for a specific PDF"""
@@ -773,31 +1182,92 @@ async def summarize_pdf(request: SummarizeRequest):
         raise HTTPException(status_code=500, detail="Summarization failed")
 
 @api_router.get("/search/history")
-async def get_search_history(limit: int = Query(10, description="Number of recent searches to return")):
-    """Get recent search history with Google analytics"""
+async def get_search_history(
+    limit: int = Query(10, ge=1, le=100, description="Number of recent searches to return"),
+    before: Optional[str] = Query(None, description="next_before token from the previous page"),
+    query: Optional[str] = Query(None, description="Only searches with this exact original query"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id and timestamp are always included)")
+):
+    """Get recent search history with Google analytics, newest first
+    
+    Returns {"history": [...], "next_before": token}; pass the token back as
+    `before` to get the next page. next_before is null on the last page.
+    """
     try:
-        history = await db.search_history.find().sort("timestamp", -1).limit(limit).to_list(limit)
-        return history
+        field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        return await history_store.page(limit, before=before, query=query, fields=field_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching search history: {e}")
-        return []
+        return {"history": [], "next_before": None}
+
+@api_router.get("/analytics")
+async def get_analytics(
+    granularity: str = Query("day", description="Bucket size: hour or day"),
+    days: int = Query(7, ge=1, le=366, description="How many days back to report")
+):
+    """Search metrics per time bucket, served from the pre-aggregated rollups
+    
+    Each bucket and the totals carry searches, zero_result_rate, avg_results,
+    google_share, search_time_avg/p50/p95; totals add per-source counts and
+    the top queries of the period.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    until = datetime.utcnow()
+    try:
+        return await analytics.report(granularity, until - timedelta(days=days), until)
+    except Exception as e:
+        logger.error(f"Error reading analytics: {e}")
+        raise HTTPException(status_code=500, detail="Analytics unavailable")
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of stage, upstream, request and write latencies"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
 @api_router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    google_status = "configured" if search_manager.google_search.api_key and search_manager.google_search.cse_id else "missing_credentials"
+    google_search = search_manager.google_search
+    google_status = google_search.breaker.health() if google_search.api_key and google_search.cse_id else "missing_credentials"
     
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow(),
         "services": {
             "database": "connected",
-            "openai": "configured" if ai_engine.openai_key else "missing_key",
+            "openai": ai_engine.breaker.health() if ai_engine.openai_key else "missing_key",
             "google_search": google_status,
+            "arxiv": search_manager.other_engines['arxiv'].breaker.health(),
+            "semantic_scholar": search_manager.other_engines['semantic_scholar'].breaker.health(),
             "focus": "Recent PDFs (1975-2025)",
             "primary_source": "Google PDF Search",
             "max_results": 50
         },
+        "circuit_breakers": {
+            "google_search": google_search.breaker.snapshot(),
+            "arxiv": search_manager.other_engines['arxiv'].breaker.snapshot(),
+            "semantic_scholar": search_manager.other_engines['semantic_scholar'].breaker.snapshot(),
+            "openai": ai_engine.breaker.snapshot()
+        },
+        "http_pool": http_pool.stats(),
+        "summaries": summary_executor.stats(),
+        "search_cache": result_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "singleflight": {
+            "search": search_flight.stats(),
+            "llm": ai_engine.flight.stats()
+        },
+        "rate_limits": rate_limiters.snapshot(),
+        "domain_authority": domain_authority.stats(),
+        "dedup": search_manager.deduplicator.stats(),
+        "local_index": local_index.stats(),
+        "autocomplete": autocomplete_index.stats(),
+        "history_writer": history_writer.stats(),
+        "analytics": analytics.stats(),
+        "cpu_offload": cpu_offloader.stats(),
         "version": "3.0.0"
     }
 
@@ -810,8 +1280,12 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Outermost, so the total covers CORS handling as well
+app.add_middleware(ServerTimingMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -819,6 +1293,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_http_pool():
+    await http_pool.start()
+
+@app.on_event("startup")
+async def startup_caches():
+    try:
+        await result_cache.ensure_indexes()
+        await llm_cache.ensure_indexes()
+        await summary_store.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Error creating cache indexes: {e}")
+
+@app.on_event("startup")
+async def startup_history_indexes():
+    try:
+        await history_store.ensure_indexes()
+        await analytics.ensure_indexes(db.search_history)
+    except Exception as e:
+        logger.error(f"Error creating search history indexes: {e}")
+
+# Long-running maintenance jobs, cancelled on shutdown
+background_jobs: List[asyncio.Task] = []
+
+@app.on_event("startup")
+async def startup_background_jobs():
+    history_writer.start()
+    if summary_store.backfill_interval > 0:
+        background_jobs.append(asyncio.create_task(summary_store.run_backfill_loop(ai_engine)))
+    background_jobs.append(asyncio.create_task(autocomplete_index.load(db.search_history)))
+    if domain_authority.reload_interval > 0:
+        background_jobs.append(asyncio.create_task(domain_authority.run_reload_loop()))
+
+@app.on_event("shutdown")
+async def shutdown_background_jobs():
+    for job in background_jobs:
+        job.cancel()
+    await asyncio.gather(*background_jobs, return_exceptions=True)
+
+@app.on_event("shutdown")
+async def shutdown_result_cache():
+    # Stale-entry refreshes use the HTTP pool, so stop them before it closes
+    await result_cache.close()
+
+@app.on_event("shutdown")
+async def shutdown_local_index():
+    local_index.close()
+
+@app.on_event("shutdown")
+async def shutdown_cpu_offload():
+    cpu_offloader.close()
+
+@app.on_event("shutdown")
+async def shutdown_http_pool():
+    await http_pool.close()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Write out buffered search history before the connection goes away
+    await history_writer.close()
     client.close()
\ No newline at end of file
@@ -0,0 +1,142 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from canonical import canonical_url
+from metrics import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_NOT_AVAILABLE = "AI summary not available"
+
+
+class SummaryExecutor:
+    """Runs AI summaries for a batch of results with bounded concurrency.
+
+    Each summary gets its own timeout and the whole batch shares a deadline;
+    anything that does not finish in time is filled with the "not available"
+    placeholder so the search response is never held hostage by the LLM.
+    """
+
+    def __init__(self, ai_engine, max_concurrency: int = None, per_summary_timeout: float = None,
+                 total_deadline: float = None, summary_store=None):
+        self.ai_engine = ai_engine
+        self.summary_store = summary_store
+        self.max_concurrency = max_concurrency or int(os.environ.get('SUMMARY_CONCURRENCY', 4))
+        self.per_summary_timeout = per_summary_timeout or float(os.environ.get('SUMMARY_TIMEOUT', 8))
+        self.total_deadline = total_deadline or float(os.environ.get('SUMMARY_DEADLINE', 12))
+
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.deadline_skipped = 0
+        self.store_hits = 0
+        self._latencies = LatencyWindow()
+
+    async def summarize_results(self, results: List[Any], on_summary: Optional[Callable[[Any], None]] = None) -> None:
+        """Fill ai_summary on each result in place, calling on_summary(result) as each one is set"""
+        if not results:
+            return
+
+        # Summaries already stored for these URLs cost one bulk lookup
+        if self.summary_store:
+            try:
+                stored = await self.summary_store.get_many(result.url for result in results)
+            except Exception as e:
+                logger.error(f"Error reading stored PDF summaries: {e}")
+                stored = {}
+            missing = []
+            for result in results:
+                summary = stored.get(canonical_url(result.url))
+                if summary:
+                    result.ai_summary = summary
+                    self.store_hits += 1
+                    if on_summary:
+                        on_summary(result)
+                else:
+                    missing.append(result)
+            results = missing
+            if not results:
+                return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = {asyncio.create_task(self._summarize_one(result, semaphore, on_summary)): result for result in results}
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.total_deadline)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        if pending:
+            logger.warning(f"Summary deadline of {self.total_deadline}s reached, skipping {len(pending)} summaries")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.deadline_skipped += len(pending)
+
+        for task, result in tasks.items():
+            if task not in done or task.cancelled() or task.exception() is not None:
+                result.ai_summary = SUMMARY_NOT_AVAILABLE
+                if on_summary:
+                    on_summary(result)
+
+    async def _summarize_one(self, result: Any, semaphore: asyncio.Semaphore, on_summary=None) -> str:
+        summary = await self._generate(result, semaphore)
+        result.ai_summary = summary
+        if on_summary:
+            on_summary(result)
+        return summary
+
+    async def _generate(self, result: Any, semaphore: asyncio.Semaphore) -> str:
+        async with semaphore:
+            self.calls += 1
+            started = time.monotonic()
+            try:
+                summary = await asyncio.wait_for(
+                    self.ai_engine.summarize_pdf_content(result.title, result.description or "", result.domain),
+                    timeout=self.per_summary_timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.warning(f"AI summary timed out after {self.per_summary_timeout}s: {result.title[:80]}")
+                return SUMMARY_NOT_AVAILABLE
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Error generating AI summary: {e}")
+                return SUMMARY_NOT_AVAILABLE
+            finally:
+                self._latencies.observe(time.monotonic() - started)
+
+            if not summary or summary == SUMMARY_NOT_AVAILABLE:
+                self.failures += 1
+                return SUMMARY_NOT_AVAILABLE
+            self.successes += 1
+
+        if self.summary_store and result.url:
+            try:
+                await self.summary_store.put(result.url, summary, result.title, result.description, result.domain)
+            except Exception as e:
+                logger.error(f"Error storing PDF summary: {e}")
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counts and recent per-call latency for monitoring"""
+        latency = self._latencies.summary(digits=3)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "per_summary_timeout": self.per_summary_timeout,
+            "total_deadline": self.total_deadline,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "deadline_skipped": self.deadline_skipped,
+            "store_hits": self.store_hits,
+            "latency_avg": latency["avg"],
+            "latency_p95": latency["p95"],
+            "latency_max": latency["max"]
+        }
@@ -0,0 +1,114 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from canonical import canonical_url
+from summary_executor import SUMMARY_NOT_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+
+class PDFSummaryStore:
+    """AI summaries persisted per canonical PDF URL (pdf_summaries collection).
+
+    Every URL we serve is recorded with a seen counter, so a background job
+    can summarize the frequently returned ones ahead of time and searches can
+    fetch all known summaries for a response with a single $in query.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.backfill_interval = float(os.environ.get('SUMMARY_BACKFILL_INTERVAL', 300))
+        self.backfill_batch = int(os.environ.get('SUMMARY_BACKFILL_BATCH', 20))
+        self.backfill_min_seen = int(os.environ.get('SUMMARY_BACKFILL_MIN_SEEN', 3))
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("has_summary", 1), ("seen_count", -1)])
+
+    async def get(self, url: str) -> Optional[str]:
+        """Stored summary for a single URL"""
+        doc = await self.collection.find_one(
+            {"_id": canonical_url(url), "has_summary": True},
+            {"summary": 1}
+        )
+        return doc["summary"] if doc else None
+
+    async def get_many(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Stored summaries for many URLs in one round trip, keyed by canonical URL"""
+        keys = list({canonical_url(url) for url in urls if url})
+        if not keys:
+            return {}
+        cursor = self.collection.find(
+            {"_id": {"$in": keys}, "has_summary": True},
+            {"summary": 1}
+        )
+        return {doc["_id"]: doc["summary"] async for doc in cursor}
+
+    async def put(self, url: str, summary: str, title: str = None, description: str = None, domain: str = None):
+        """Store (or replace) the summary for a URL"""
+        fields = {"summary": summary, "has_summary": True, "summarized_at": datetime.utcnow()}
+        await self.collection.update_one(
+            {"_id": canonical_url(url)},
+            {
+                "$set": fields,
+                "$setOnInsert": {"title": title, "description": description, "domain": domain,
+                                 "seen_count": 0, "first_seen": datetime.utcnow()}
+            },
+            upsert=True
+        )
+
+    async def record_seen(self, results: List[Any]):
+        """Count each served result so popular URLs can be summarized ahead of time"""
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": canonical_url(result.url)},
+                {
+                    "$inc": {"seen_count": 1},
+                    "$set": {"last_seen": now},
+                    "$setOnInsert": {
+                        "title": result.title,
+                        "description": result.description,
+                        "domain": result.domain,
+                        "has_summary": False,
+                        "first_seen": now
+                    }
+                },
+                upsert=True
+            )
+            for result in results if result.url
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def backfill(self, ai_engine) -> int:
+        """Summarize the most frequently seen URLs that have no summary yet"""
+        docs = await self.collection.find(
+            {"has_summary": False, "seen_count": {"$gte": self.backfill_min_seen}},
+            {"title": 1, "description": 1, "domain": 1}
+        ).sort("seen_count", -1).limit(self.backfill_batch).to_list(self.backfill_batch)
+
+        summarized = 0
+        for doc in docs:
+            summary = await ai_engine.summarize_pdf_content(doc.get("title") or "", doc.get("description") or "", doc.get("domain"))
+            if summary and summary != SUMMARY_NOT_AVAILABLE:
+                await self.put(doc["_id"], summary)
+                summarized += 1
+        return summarized
+
+    async def run_backfill_loop(self, ai_engine):
+        """Background job started on app startup"""
+        while True:
+            await asyncio.sleep(self.backfill_interval)
+            try:
+                summarized = await self.backfill(ai_engine)
+                if summarized:
+                    logger.info(f"Backfilled {summarized} PDF summaries")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error backfilling PDF summaries: {e}")
@@ -0,0 +1,148 @@
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CATEGORY_KEYWORDS = {
+    'Machine Learning': ['machine learning', 'deep learning', 'neural network', 'ai', 'artificial intelligence'],
+    'Computer Science': ['algorithm', 'software', 'programming', 'computer science', 'computing'],
+    'Medicine': ['medical', 'health', 'disease', 'treatment', 'clinical', 'patient'],
+    'Physics': ['physics', 'quantum', 'particle', 'energy', 'mechanics'],
+    'Biology': ['biology', 'genetic', 'molecular', 'cell', 'organism'],
+    'Engineering': ['engineering', 'design', 'system', 'technical', 'infrastructure'],
+    'Economics': ['economic', 'finance', 'market', 'business', 'trade'],
+    'Environment': ['climate', 'environment', 'sustainability', 'energy', 'green'],
+    'Social Science': ['social', 'society', 'policy', 'public', 'governance']
+}
+
+ACADEMIC_INDICATORS = [
+    'research', 'study', 'analysis', 'survey', 'review', 'paper',
+    'journal', 'conference', 'proceedings', 'thesis', 'dissertation',
+    'report', 'white paper', 'technical', 'scientific'
+]
+
+# Separates items when a batch is scanned as one string
+_ITEM_SEPARATOR = "\x00"
+
+# Every size unit contains one of these; snippets without any skip the size regex
+_SIZE_UNIT_HINTS = ("mb", "kb", "gb", "bytes")
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation for words with shared prefixes factored out"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Regex alternation is greedy left to right, so a longer keyword
+        # ('white paper') still wins when the shorter one ends here
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class TextFeatures:
+    __slots__ = ("year", "file_size", "is_academic", "categories")
+
+    def __init__(self, year: Optional[int] = None, file_size: Optional[str] = None,
+                 is_academic: bool = False, categories: Optional[List[str]] = None):
+        self.year = year
+        self.file_size = file_size
+        self.is_academic = is_academic
+        self.categories = categories or []
+
+
+class TextFeatureExtractor:
+    """Pulls publication year, file size, academic flag and categories out of
+    search-result text with precompiled regexes.
+
+    Keywords are matched on word boundaries (an optional plural 's'/'es' is
+    allowed), so 'ai' no longer matches inside 'maintain'. A whole batch of
+    results is lowercased, joined and scanned in a single pass; file sizes
+    are read from each snippet separately.
+    """
+
+    def __init__(self, category_keywords: Dict[str, List[str]] = None,
+                 academic_indicators: Sequence[str] = None, max_categories: int = 3):
+        category_keywords = category_keywords or CATEGORY_KEYWORDS
+        academic_indicators = academic_indicators or ACADEMIC_INDICATORS
+        self.categories = list(category_keywords)
+        self.max_categories = max_categories
+
+        # keyword -> (category indexes, is academic indicator)
+        self._keywords: Dict[str, Tuple[Tuple[int, ...], bool]] = {}
+        for keyword in set(academic_indicators) | {k for ks in category_keywords.values() for k in ks}:
+            indexes = tuple(i for i, ks in enumerate(category_keywords.values()) if keyword in ks)
+            self._keywords[keyword] = (indexes, keyword in academic_indicators)
+
+        # Only word starts are tried; keywords are folded into a prefix trie
+        # so the engine does not retry every alternative at each position
+        self._pattern = re.compile(
+            r'\b(?=[a-z0-9])(?:'
+            r'(?P<year>(?:19[7-9][0-9]|20[0-2][0-9])\b)'
+            r'|(?P<keyword>' + _trie_pattern(self._keywords) + r')(?:e?s)?\b)'
+        )
+        # Sizes may follow a letter ('v2.1mb'), so they cannot share the
+        # word-start guard; they get their own pass over the snippet only,
+        # where the leading \d lets the engine skip straight to digits
+        self._size_pattern = re.compile(r'(\d+(?:\.\d+)?)\s*(mb|kb|gb|megabytes|kilobytes|gigabytes)\b')
+
+    def extract(self, title: str, snippet: str, url: str = "") -> TextFeatures:
+        return self.extract_batch([(title, snippet, url)])[0]
+
+    def extract_batch(self, items: Iterable[Tuple[str, str, str]]) -> List[TextFeatures]:
+        """Features for many (title, snippet, url) triples in one scan"""
+        parts = []
+        # Per item: (start, url start)
+        bounds = []
+        features = []
+        offset = 0
+        for title, snippet, url in items:
+            title, snippet, url = (title or "").lower(), (snippet or "").lower(), (url or "").lower()
+            snippet_start = offset + len(title) + 1
+            url_start = snippet_start + len(snippet) + 1
+            bounds.append((offset, url_start))
+            parts.append(f"{title} {snippet} {url}")
+            offset = url_start + len(url) + len(_ITEM_SEPARATOR)
+
+            # File sizes are only read from the snippet
+            size = self._size_pattern.search(snippet) if any(unit in snippet for unit in _SIZE_UNIT_HINTS) else None
+            features.append(TextFeatures(file_size=f"{size.group(1)} {size.group(2).upper()}" if size else None))
+
+        if not bounds:
+            return features
+        starts = [bound[0] for bound in bounds]
+        category_hits = [set() for _ in bounds]
+
+        for match in self._pattern.finditer(_ITEM_SEPARATOR.join(parts)):
+            position = match.start()
+            index = bisect_right(starts, position) - 1
+            url_start = bounds[index][1]
+            feature = features[index]
+
+            kind = match.lastgroup
+            if kind == 'year':
+                year = int(match.group('year'))
+                if 1975 <= year <= 2025 and (feature.year is None or year > feature.year):
+                    feature.year = year
+            elif position < url_start:
+                # Categories and academic indicators come from title and snippet only
+                indexes, academic = self._keywords[match.group('keyword')]
+                category_hits[index].update(indexes)
+                if academic:
+                    feature.is_academic = True
+
+        for feature, hits in zip(features, category_hits):
+            feature.categories = [self.categories[i] for i in sorted(hits)[:self.max_categories]]
+        return features
+
+
+# Compiled once per process and shared by every search engine
+default_extractor = TextFeatureExtractor()
@@ -0,0 +1,213 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import json_util
+from pymongo.errors import BulkWriteError
+
+from metrics import LatencyWindow, MONGO_WRITE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+POLICY_DROP = "drop"
+POLICY_SPILL = "spill"
+
+
+class WriteBehindBuffer:
+    """Buffers documents for a Mongo collection and writes them with insert_many.
+
+    add() never waits on Mongo: documents queue in memory and a background
+    task flushes them once `batch_size` are waiting or `flush_interval`
+    seconds have passed. At most `max_pending` documents are held; beyond
+    that the overflow policy either drops the oldest ones or spills them to
+    a JSON-lines file that is replayed once writes succeed again. Failed
+    batches go back to the front of the queue. `on_flush`, if given, is
+    awaited with every batch once it has been written.
+
+    Settings come from <NAME>_BATCH_SIZE, <NAME>_FLUSH_INTERVAL,
+    <NAME>_MAX_PENDING, <NAME>_OVERFLOW_POLICY and <NAME>_SPILL_PATH.
+    """
+
+    def __init__(self, collection, name: str, batch_size: int = None, flush_interval: float = None,
+                 max_pending: int = None, policy: str = None, spill_path: Optional[str] = None,
+                 on_flush: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None):
+        prefix = name.upper()
+        self.collection = collection
+        self.name = name
+        self.batch_size = batch_size or int(os.environ.get(f'{prefix}_BATCH_SIZE', 100))
+        self.flush_interval = flush_interval or float(os.environ.get(f'{prefix}_FLUSH_INTERVAL', 2))
+        self.max_pending = max_pending or int(os.environ.get(f'{prefix}_MAX_PENDING', 10000))
+        self.policy = (policy or os.environ.get(f'{prefix}_OVERFLOW_POLICY', POLICY_DROP)).lower()
+        self.spill_path = Path(spill_path or os.environ.get(f'{prefix}_SPILL_PATH')
+                               or Path(__file__).parent / 'data' / f'{name}.spill.jsonl')
+
+        self.on_flush = on_flush
+        self._pending: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._closing = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_flush_size = 0
+        self._flush_latencies = LatencyWindow()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"write-behind:{self.name}")
+
+    def add(self, doc: Dict[str, Any]):
+        """Queue a document; returns immediately"""
+        self.enqueued += 1
+        self._pending.append(doc)
+        if len(self._pending) > self.max_pending:
+            self._overflow([self._pending.popleft() for _ in range(len(self._pending) - self.max_pending)])
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _overflow(self, docs: List[Dict[str, Any]]):
+        if self.policy == POLICY_SPILL:
+            try:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    for doc in docs:
+                        f.write(json_util.dumps(doc) + "\n")
+                self.spilled += len(docs)
+                return
+            except OSError as e:
+                logger.error(f"Error spilling {self.name} writes to {self.spill_path}: {e}")
+        self.dropped += len(docs)
+        logger.warning(f"{self.name} write buffer full, dropped {len(docs)} documents")
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything queued, one insert_many per batch; returns documents written"""
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                started = time.monotonic()
+                try:
+                    await self.collection.insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    MONGO_WRITE_SECONDS.observe(time.monotonic() - started, self.name, "partial")
+                    # Duplicates were already written (e.g. a retried batch); retry only real failures
+                    failed_indexes = {error['index'] for error in e.details.get('writeErrors', []) if error.get('code') != 11000}
+                    failed = [batch[i] for i in sorted(failed_indexes)]
+                    self.flush_errors += 1
+                    self.written += e.details.get('nInserted', 0)
+                    written += e.details.get('nInserted', 0)
+                    # Duplicates were inserted by an attempt whose hook never ran
+                    await self._after_flush([doc for i, doc in enumerate(batch) if i not in failed_indexes])
+                    if failed:
+                        logger.error(f"Error flushing {len(failed)} {self.name} documents: {e}")
+                        self._requeue(failed)
+                        break
+                    continue
+                except Exception as e:
+                    MONGO_WRITE_SECONDS.observe(time.monotonic() - started, self.name, "error")
+                    self.flush_errors += 1
+                    logger.error(f"Error flushing {len(batch)} {self.name} documents: {e}")
+                    self._requeue(batch)
+                    break
+                latency = time.monotonic() - started
+                MONGO_WRITE_SECONDS.observe(latency, self.name, "ok")
+                self._flush_latencies.observe(latency)
+                self.flushes += 1
+                self.last_flush_size = len(batch)
+                self.written += len(batch)
+                written += len(batch)
+                await self._after_flush(batch)
+            else:
+                self._replay_spill()
+        return written
+
+    async def _after_flush(self, batch: List[Dict[str, Any]]):
+        if not self.on_flush or not batch:
+            return
+        try:
+            await self.on_flush(batch)
+        except Exception as e:
+            logger.error(f"Error in {self.name} flush hook: {e}")
+
+    def _requeue(self, batch: List[Dict[str, Any]]):
+        # Back to the front in order; anything beyond the bound overflows
+        self._pending.extendleft(reversed(batch))
+        if len(self._pending) > self.max_pending:
+            self._overflow([self._pending.pop() for _ in range(len(self._pending) - self.max_pending)])
+
+    def _replay_spill(self):
+        """Re-queue spilled documents once there is room and Mongo is accepting writes"""
+        if self.policy != POLICY_SPILL or not self.spill_path.exists():
+            return
+        try:
+            with open(self.spill_path, encoding='utf-8') as f:
+                docs = [json_util.loads(line) for line in f if line.strip()]
+            self.spill_path.unlink()
+        except Exception as e:
+            logger.error(f"Error replaying spilled {self.name} writes: {e}")
+            return
+        self.replayed += len(docs)
+        for doc in docs:
+            self._pending.append(doc)
+        if len(self._pending) > self.max_pending:
+            self._overflow([self._pending.pop() for _ in range(len(self._pending) - self.max_pending)])
+        if docs:
+            logger.info(f"Replaying {len(docs)} spilled {self.name} documents")
+            self._wakeup.set()
+
+    async def close(self, timeout: float = 10.0):
+        """Stop the flush loop and write out what is left"""
+        if self._task:
+            # Let an in-progress insert finish rather than cancelling it halfway
+            self._closing = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out flushing {self.name} on shutdown")
+        if self._pending:
+            # Spilled to disk when configured, otherwise lost
+            self._overflow(list(self._pending))
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        latency = self._flush_latencies.summary()
+        return {
+            "queue_depth": len(self._pending),
+            "max_pending": self.max_pending,
+            "policy": self.policy,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "last_flush_size": self.last_flush_size,
+            "flush_latency_p50": latency["p50"],
+            "flush_latency_p95": latency["p95"]
+        }
@@ -47,7 +47,12 @@ class BackendTests(unittest.TestCase):
         
         # Verify Google Custom Search configuration
         self.assertIn("google_search", services, "Services should include google_search status")
-        self.assertEqual(services["google_search"], "configured", "Google Custom Search should be configured")
+        self.assertIn(services["google_search"], ["healthy", "degraded"], "Google Custom Search should be configured and reachable")
+        
+        # Verify per-source circuit breaker state is reported
+        self.assertIn("circuit_breakers", data, "Health check should include circuit breaker state")
+        for source in ["google_search", "arxiv", "semantic_scholar", "openai"]:
+            self.assertIn(source, data["circuit_breakers"], f"Circuit breaker state should include {source}")
         
         # Verify primary source is Google PDF Search
         self.assertEqual(services.get("primary_source"), "Google PDF Search", "Primary source should be Google PDF Search")
@@ -262,6 +267,97 @@ class BackendTests(unittest.TestCase):
         
         print("✅ Google Custom Search credentials test passed")
 
+    def test_08_autocomplete_endpoint(self):
+        """Test the history-backed autocomplete endpoint"""
+        print("\n=== Testing Autocomplete Endpoint ===")
+        
+        # Make sure at least one past query starts with the prefix
+        requests.post(f"{API_URL}/search", json={"query": "machine learning", "max_results": 10})
+        time.sleep(1)
+        
+        start_time = time.time()
+        response = requests.get(f"{API_URL}/autocomplete", params={"q": "mach", "limit": 5})
+        print(f"Autocomplete answered in {time.time() - start_time:.3f} seconds")
+        
+        self.assertEqual(response.status_code, 200, "Autocomplete endpoint should return 200 OK")
+        data = response.json()
+        print(f"Autocomplete response: {json.dumps(data, indent=2)}")
+        
+        self.assertIn("suggestions", data, "Response should include suggestions field")
+        self.assertIsInstance(data["suggestions"], list, "Suggestions should be a list")
+        self.assertLessEqual(len(data["suggestions"]), 5, "Should respect the limit")
+        for suggestion in data["suggestions"]:
+            self.assertTrue(suggestion.startswith("mach"), "Each suggestion should complete the prefix")
+        self.assertIn("machine learning", data["suggestions"], "Recent searches should be suggested")
+        
+        print("✅ Autocomplete endpoint test passed")
+
+    def test_09_search_history_pagination(self):
+        """Test keyset pagination of the search history endpoint"""
+        print("\n=== Testing Search History Pagination ===")
+        
+        response = requests.get(f"{API_URL}/search/history", params={"limit": 2})
+        self.assertEqual(response.status_code, 200, "Search history endpoint should return 200 OK")
+        data = response.json()
+        print(f"First page: {json.dumps(data, indent=2)}")
+        
+        self.assertIn("history", data, "Response should include history field")
+        self.assertIn("next_before", data, "Response should include next_before field")
+        self.assertLessEqual(len(data["history"]), 2, "Should respect the limit")
+        for record in data["history"]:
+            self.assertNotIn("_id", record, "Mongo _id should not be returned")
+        
+        if data["next_before"]:
+            response = requests.get(f"{API_URL}/search/history", params={"limit": 2, "before": data["next_before"]})
+            self.assertEqual(response.status_code, 200, "Next page should return 200 OK")
+            next_page = response.json()
+            first_ids = {record["id"] for record in data["history"]}
+            for record in next_page["history"]:
+                self.assertNotIn(record["id"], first_ids, "Pages should not overlap")
+                self.assertLessEqual(record["timestamp"], data["history"][-1]["timestamp"], "Pages should be newest first")
+        
+        response = requests.get(f"{API_URL}/search/history", params={"before": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400, "An invalid cursor should be rejected")
+        
+        print("✅ Search history pagination test passed")
+
+    def test_10_analytics_endpoint(self):
+        """Test the rollup-backed analytics endpoint"""
+        print("\n=== Testing Analytics Endpoint ===")
+        
+        response = requests.get(f"{API_URL}/analytics", params={"granularity": "day", "days": 7})
+        self.assertEqual(response.status_code, 200, "Analytics endpoint should return 200 OK")
+        data = response.json()
+        print(f"Analytics totals: {json.dumps(data.get('totals'), indent=2)}")
+        
+        for field in ["granularity", "totals", "top_queries", "buckets"]:
+            self.assertIn(field, data, f"Analytics response should include {field}")
+        for field in ["searches", "zero_result_rate", "google_share", "search_time_p50", "search_time_p95"]:
+            self.assertIn(field, data["totals"], f"Totals should include {field}")
+        for bucket in data["buckets"]:
+            self.assertIn("bucket", bucket, "Each bucket should have its start time")
+        
+        response = requests.get(f"{API_URL}/analytics", params={"granularity": "week"})
+        self.assertEqual(response.status_code, 400, "Unknown granularity should be rejected")
+        
+        print("✅ Analytics endpoint test passed")
+
+    def test_11_metrics_endpoint(self):
+        """Test Prometheus metrics and the Server-Timing header"""
+        print("\n=== Testing Metrics Endpoint ===")
+        
+        response = requests.get(f"{API_URL}/health")
+        self.assertIn("Server-Timing", response.headers, "Responses should carry a Server-Timing header")
+        self.assertIn("total;dur=", response.headers["Server-Timing"], "Server-Timing should include the total")
+        
+        response = requests.get(f"{API_URL}/metrics")
+        self.assertEqual(response.status_code, 200, "Metrics endpoint should return 200 OK")
+        self.assertTrue(response.headers["Content-Type"].startswith("text/plain"), "Metrics should be Prometheus text")
+        for metric in ["pdfscope_http_request_seconds", "pdfscope_stage_seconds", "pdfscope_upstream_seconds"]:
+            self.assertIn(f"# TYPE {metric} histogram", response.text, f"Metrics should include {metric}")
+        
+        print("✅ Metrics endpoint test passed")
+
 def run_tests():
     """Run all the backend tests"""
     print(f"Starting backend tests at {time.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -274,6 +370,10 @@ def run_tests():
     suite.addTest(BackendTests('test_03_suggestions_endpoint'))
     suite.addTest(BackendTests('test_04_summarize_endpoint'))
     suite.addTest(BackendTests('test_05_search_with_different_query'))
+    suite.addTest(BackendTests('test_08_autocomplete_endpoint'))
+    suite.addTest(BackendTests('test_09_search_history_pagination'))
+    suite.addTest(BackendTests('test_10_analytics_endpoint'))
+    suite.addTest(BackendTests('test_11_metrics_endpoint'))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,56 @@
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from autocomplete import AutocompleteIndex  # noqa: E402
+
+
+class BoundTests(unittest.TestCase):
+    def test_rebuild_keeps_the_best_queries(self):
+        index = AutocompleteIndex(max_queries=10, rebuild_slack=0.5)
+        index.record("popular query", count=50)
+        for i in range(15):
+            index.record(f"query {i:02d}")
+        self.assertEqual(index.rebuilds, 1)
+        self.assertLessEqual(index.stats()["queries"], 15)
+        self.assertIn("popular query", index.complete("pop"))
+
+    def test_size_stays_bounded(self):
+        index = AutocompleteIndex(max_queries=20, rebuild_slack=0.25)
+        for i in range(1000):
+            index.record(f"search {i}")
+        self.assertLessEqual(index.stats()["queries"], 25)
+        self.assertLess(index.nodes, 200)
+        # Recency wins among equally frequent queries
+        self.assertEqual(index.complete("search 99")[:1], ["search 999"])
+
+    def test_old_queries_are_evicted_first(self):
+        index = AutocompleteIndex(max_queries=2, rebuild_slack=0.5)
+        index.record("stale topic", when=datetime.utcnow() - timedelta(days=365))
+        index.record("fresh topic")
+        index.record("fresher topic")
+        index.record("newest topic")
+        self.assertEqual(index.complete("stale"), [])
+        self.assertEqual(index.complete("newest"), ["newest topic"])
+
+
+class BackgroundRebuildTests(unittest.IsolatedAsyncioTestCase):
+    async def test_searches_during_rebuild_are_kept(self):
+        index = AutocompleteIndex(max_queries=10, rebuild_slack=0.5)
+        for i in range(16):
+            index.record(f"query {i:02d}")
+        task = index._rebuild_task
+        self.assertIsNotNone(task)
+        # Recorded after the rebuild took its snapshot
+        index.record("late arrival")
+        await task
+        self.assertEqual(index.rebuilds, 1)
+        self.assertEqual(index.complete("late"), ["late arrival"])
+        self.assertEqual(index.stats()["queries"], 11)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class HalfOpenTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch("circuit_breaker.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", min_calls=2, open_seconds=30, slow_call_seconds=5,
+                                      half_open_max_calls=1)
+
+    def trip(self):
+        for _ in range(2):
+            self.assertTrue(self.breaker.allow_request())
+            self.breaker.record_failure(0.1)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_open_circuit_fails_fast_until_cool_down(self):
+        self.trip()
+        self.clock.now += 29
+        self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.short_circuited, 1)
+        self.assertEqual(self.breaker.health(), "unavailable")
+
+        self.clock.now += 1
+        self.assertEqual(self.breaker.health(), "degraded")
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_half_open_admits_limited_trials(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_successful_trial_closes(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success(0.2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.snapshot()["calls_in_window"], 0)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_trial_reopens(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure(0.2)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.times_opened, 2)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_slow_trial_reopens(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success(6)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    async def test_ignored_error_frees_the_trial_slot(self):
+        self.trip()
+        self.clock.now += 30
+
+        async def throttled():
+            raise LookupError("rate limited")
+
+        with self.assertRaises(LookupError):
+            await self.breaker.call(throttled, ignore=(LookupError,))
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertEqual(self.breaker.half_open_in_flight, 0)
+
+        async def ok():
+            return []
+
+        self.assertEqual(await self.breaker.call(ok), [])
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    async def test_cancelled_trial_frees_the_slot(self):
+        self.trip()
+        self.clock.now += 30
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        task = asyncio.create_task(self.breaker.call(hang))
+        await started.wait()
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.call(hang)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+
+if __name__ == "__main__":
+    unittest.main()
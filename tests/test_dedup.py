@@ -0,0 +1,133 @@
+import os
+import sys
+import random
+import subprocess
+import unittest
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dedup import ResultDeduplicator, minhash  # noqa: E402
+
+
+class Result(BaseModel):
+    # The PDFResult fields the deduplicator reads and merges
+    title: str
+    url: str
+    download_url: Optional[str] = None
+    description: Optional[str] = None
+    authors: Optional[List[str]] = None
+    publication_date: Optional[str] = None
+    file_size: Optional[str] = None
+    page_count: Optional[int] = None
+    language: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    relevance_score: Optional[float] = None
+    ai_summary: Optional[str] = None
+    categories: Optional[List[str]] = None
+    doi: Optional[str] = None
+    citation_count: Optional[int] = None
+    domain: Optional[str] = None
+    google_rank: Optional[int] = None
+
+
+def vocabulary(rng, size=5000):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return list({"".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(size)})
+
+
+def jaccard(a, b):
+    a, b = set(a.lower().split()), set(b.lower().split())
+    return len(a & b) / len(a | b)
+
+
+def edited_pairs(count, seed=7):
+    """Title pairs one word apart (substitution or insertion), Jaccard 0.8-0.9"""
+    rng = random.Random(seed)
+    words = vocabulary(rng)
+    pairs = []
+    while len(pairs) < count:
+        title = rng.sample(words, rng.randint(9, 12))
+        edited = list(title)
+        if rng.random() < 0.5:
+            edited[rng.randrange(len(edited))] = rng.choice(words)
+        else:
+            edited.insert(rng.randrange(len(edited) + 1), rng.choice(words))
+        a, b = " ".join(title).capitalize(), " ".join(edited).capitalize()
+        if 0.8 <= jaccard(a, b) < 0.9:
+            pairs.append((a, b))
+    return pairs
+
+
+def merged(deduplicator, a, b):
+    results = [Result(title=a, url="https://one.example.org/a.pdf"), Result(title=b, url="https://two.example.org/b.pdf")]
+    return len(deduplicator.deduplicate(results)) == 1
+
+
+class TitleRecallTests(unittest.TestCase):
+    def test_one_word_edits_merge(self):
+        deduplicator = ResultDeduplicator()
+        pairs = edited_pairs(400)
+        merges = sum(merged(deduplicator, a, b) for a, b in pairs)
+        self.assertGreaterEqual(merges / len(pairs), 0.98)
+
+    def test_candidate_rate_matches_band_curve(self):
+        # Candidate generation alone, before the Jaccard check
+        deduplicator = ResultDeduplicator()
+        pairs = edited_pairs(400, seed=11)
+        for a, b in pairs:
+            deduplicator.deduplicate([Result(title=a, url="https://one.example.org/a.pdf"),
+                                      Result(title=b, url="https://two.example.org/b.pdf")])
+        self.assertGreaterEqual(deduplicator.candidate_pairs / len(pairs), 0.98)
+
+    def test_unrelated_titles_stay_apart(self):
+        rng = random.Random(3)
+        words = vocabulary(rng)
+        results = [Result(title=" ".join(rng.sample(words, 8)), url=f"https://example.org/{i}.pdf") for i in range(500)]
+        deduplicator = ResultDeduplicator()
+        self.assertEqual(len(deduplicator.deduplicate(results)), 500)
+        self.assertLess(deduplicator.candidate_pairs, 50)
+
+    def test_different_numbers_stay_apart(self):
+        deduplicator = ResultDeduplicator()
+        self.assertFalse(merged(deduplicator, "Municipal water quality annual report 2019 summary tables",
+                                "Municipal water quality annual report 2020 summary tables"))
+        self.assertTrue(merged(deduplicator, "Municipal water quality annual report 2019 summary tables",
+                               "Municipal water quality annual report 2019 summary tables appendix"))
+
+
+class DeterminismTests(unittest.TestCase):
+    SCRIPT = (
+        "import sys; sys.path.insert(0, sys.argv[1]); sys.path.insert(0, sys.argv[2])\n"
+        "from test_dedup import ResultDeduplicator, Result, edited_pairs, minhash\n"
+        "print(minhash('graph neural networks for molecules'.split(), 12))\n"
+        "results = [Result(title=t, url=f'https://example.org/{i}.pdf') for i, pair in enumerate(edited_pairs(150)) for t in pair]\n"
+        "print([r.url for r in ResultDeduplicator(bands=4, rows=6).deduplicate(results)])\n"
+    )
+
+    def run_with_seed(self, seed):
+        env = dict(os.environ, PYTHONHASHSEED=str(seed))
+        output = subprocess.run(
+            [sys.executable, "-c", self.SCRIPT, str(BACKEND_DIR), str(Path(__file__).resolve().parent)],
+            env=env, capture_output=True, text=True, check=True
+        )
+        return output.stdout
+
+    def test_same_result_under_any_hash_seed(self):
+        # A weak band setting so the outcome depends on the exact hash values
+        outputs = {self.run_with_seed(seed) for seed in (0, 1, 12345)}
+        self.assertEqual(len(outputs), 1)
+
+    def test_signature_is_stable(self):
+        signature = minhash(["graph", "neural", "networks"], 40)
+        self.assertEqual(signature, minhash(["networks", "graph", "neural", "graph"], 40))
+        self.assertEqual(len(signature), 40)
+        self.assertEqual(minhash([], 40), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from domain_authority import DomainAuthorityIndex  # noqa: E402
+
+
+class ReloadTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "domain_authority.json"
+        self.write(1, {"ac.uk": 0.2})
+        self.index = DomainAuthorityIndex(str(self.path), reload_interval=30)
+
+    def write(self, version, domains):
+        self.path.write_text(json.dumps({"version": version, "domains": domains}))
+        # Make the change visible even on filesystems with coarse mtimes
+        os.utime(self.path, (version, version))
+
+    async def test_weight_never_reloads(self):
+        self.write(2, {"ac.uk": 0.5})
+        with mock.patch.object(self.index, "_load") as load:
+            self.assertEqual(self.index.weight("www.cam.ac.uk"), 0.2)
+        load.assert_not_called()
+
+    async def test_changed_file_is_swapped_in(self):
+        self.write(2, {"ac.uk": 0.5, "mit.edu": 0.3})
+        self.assertTrue(await self.index.maybe_reload())
+        self.assertEqual(self.index.weight("www.cam.ac.uk"), 0.5)
+        self.assertEqual(self.index.weight("web.mit.edu"), 0.3)
+        self.assertEqual(self.index.version, 2)
+        self.assertFalse(await self.index.maybe_reload())
+
+    async def test_broken_file_keeps_current_trie(self):
+        self.path.write_text("{not json")
+        os.utime(self.path, (5, 5))
+        self.assertFalse(await self.index.maybe_reload())
+        self.assertEqual(self.index.weight("www.cam.ac.uk"), 0.2)
+        self.assertEqual(self.index.reload_errors, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from rate_limit import (  # noqa: E402
+    PRIORITY_PRIMARY, PRIORITY_LOW, UpstreamLimiter, UpstreamThrottled, call_with_retries,
+)
+
+
+class RetryAfterTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.limiter = UpstreamLimiter("openai", rate=100, burst=10)
+
+    def throttled(self, retry_after):
+        async def func():
+            raise UpstreamThrottled(429, retry_after)
+        return func
+
+    async def test_long_retry_after_pauses_before_giving_up(self):
+        with self.assertRaises(UpstreamThrottled):
+            await call_with_retries(self.limiter, self.throttled(60))
+        self.assertGreater(self.limiter.snapshot()["paused_for"], 59)
+
+    async def test_retry_after_on_the_last_attempt_still_pauses(self):
+        with self.assertRaises(UpstreamThrottled):
+            await call_with_retries(self.limiter, self.throttled(5), attempts=1)
+        self.assertGreater(self.limiter.snapshot()["paused_for"], 4)
+
+    async def test_low_priority_call_pauses_without_retrying(self):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            raise UpstreamThrottled(429, 2)
+
+        with self.assertRaises(UpstreamThrottled):
+            await call_with_retries(self.limiter, func, PRIORITY_LOW)
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(self.limiter.snapshot()["paused_for"], 1)
+
+    async def test_short_retry_after_is_retried(self):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            if len(calls) == 1:
+                raise UpstreamThrottled(429, 0.01)
+            return "ok"
+
+        self.assertEqual(await call_with_retries(self.limiter, func, PRIORITY_PRIMARY), "ok")
+        self.assertEqual(self.limiter.throttled, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
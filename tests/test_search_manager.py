@@ -0,0 +1,86 @@
+import os
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# server.py reads these at import time; these tests never reach Mongo or the network
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "pdfscope_test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("GOOGLE_CSE_ID", "test")
+
+import server  # noqa: E402
+from circuit_breaker import CLOSED, HALF_OPEN  # noqa: E402
+
+
+def make_results(prefix, count):
+    return [server.PDFResult(title=f"{prefix} paper number {i}", description="", url=f"https://example.org/{prefix}{i}.pdf",
+                             source=prefix, relevance_score=0.5) for i in range(count)]
+
+
+class SupplementarySearchTests(unittest.IsolatedAsyncioTestCase):
+    """When arXiv and Semantic Scholar are queried alongside Google"""
+
+    async def asyncSetUp(self):
+        self.manager = server.search_manager
+        self.breaker = self.manager.google_search.breaker
+        self.google_count = 8
+        self.supplementary_calls = []
+
+        async def google(query, max_results, date_range, on_results=None):
+            # Yield so speculative tasks get the chance to start
+            await asyncio.sleep(0)
+            return make_results("google", self.google_count)
+
+        def supplementary(name):
+            async def search_pdfs(query, max_results=5):
+                self.supplementary_calls.append(name)
+                return make_results(name, 1)
+            return search_pdfs
+
+        patches = [
+            mock.patch.object(self.manager, "speculative", False),
+            mock.patch.object(self.manager.google_search, "search_pdfs", google),
+            mock.patch.object(self.breaker, "state", CLOSED),
+        ] + [mock.patch.object(engine, "search_pdfs", supplementary(name))
+             for name, engine in self.manager.other_engines.items()]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_healthy_google_filling_its_quota_skips_supplementary(self):
+        results, google_count = await self.manager.search_prioritizing_google("query", max_results=10)
+        self.assertEqual(google_count, 8)
+        self.assertEqual(self.supplementary_calls, [])
+
+    async def test_google_shortfall_queries_supplementary_after_google(self):
+        self.google_count = 3
+        results, google_count = await self.manager.search_prioritizing_google("query", max_results=10)
+        self.assertEqual(sorted(self.supplementary_calls), ["arxiv", "semantic_scholar"])
+        self.assertEqual(len(results), 5)
+
+    async def speculated(self):
+        started = []
+        with mock.patch.object(self.manager, "_start_supplementary_searches", lambda *args: started.append(args) or []):
+            await self.manager.search_prioritizing_google("query", max_results=10)
+        return bool(started)
+
+    async def test_healthy_google_does_not_speculate(self):
+        self.assertFalse(await self.speculated())
+
+    async def test_degraded_google_starts_supplementary_up_front(self):
+        self.breaker.state = HALF_OPEN
+        self.assertTrue(await self.speculated())
+
+    async def test_speculation_can_be_forced_on(self):
+        self.manager.speculative = True
+        self.assertTrue(await self.speculated())
+
+
+if __name__ == "__main__":
+    unittest.main()
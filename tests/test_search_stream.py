@@ -0,0 +1,191 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# server.py reads these at import time; these tests never reach Mongo or the network
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "pdfscope_test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("GOOGLE_CSE_ID", "test")
+
+import server  # noqa: E402
+from caching import SearchResultCache  # noqa: E402
+
+
+class MemoryCollection:
+    """Just enough of a Motor collection for SearchResultCache's shared tier"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+
+def make_results(prefix, count):
+    return [server.PDFResult(title=f"{prefix} paper {i}", description="", url=f"https://example.org/{prefix}{i}.pdf",
+                             source="Google PDF Search", relevance_score=0.5) for i in range(count)]
+
+
+class StaleHitStreamingTests(unittest.IsolatedAsyncioTestCase):
+    """/api/search/stream on a stale cache entry while the background refresh runs"""
+
+    async def asyncSetUp(self):
+        self.cache = SearchResultCache(MemoryCollection(), ttl=60, stale_ttl=3600, stale_while_revalidate=True)
+        self.request = server.SearchRequest(query="graph neural networks", max_results=11, local_first=False)
+        self.stale = make_results("stale", 11)
+        key = self.cache.make_key(self.request.query, self.request.date_range, self.request.max_results)
+        self.cache.memory.set(key, {
+            "payload": {"results": [result.model_dump() for result in self.stale], "google_count": 11},
+            "fresh_until": time.time() - 1
+        }, 3600)
+
+        self.fresh = make_results("fresh", 11)
+        self.refresh_calls = []
+
+        async def search_prioritizing_google(query, max_results, date_range, on_results=None):
+            # Report a batch before the first await, as a fast upstream page would
+            self.refresh_calls.append(on_results)
+            if on_results:
+                on_results("Google PDF Search", self.fresh)
+            await asyncio.sleep(0)
+            return self.fresh, len(self.fresh)
+
+        async def reformulate(query):
+            return query
+
+        async def suggestions(query):
+            return []
+
+        async def summarize_results(results, on_summary=None):
+            return None
+
+        patches = [
+            mock.patch.object(server, "result_cache", self.cache),
+            mock.patch.object(server.search_manager, "search_prioritizing_google", search_prioritizing_google),
+            mock.patch.object(server.ai_engine, "reformulate_query_for_google", reformulate),
+            mock.patch.object(server.ai_engine, "generate_suggestions", suggestions),
+            mock.patch.object(server.summary_executor, "summarize_results", summarize_results),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def asyncTearDown(self):
+        await self.cache.close()
+
+    async def test_stale_hit_streams_every_served_result(self):
+        events = []
+        results = await server.build_search_pipeline(self.request, events.append).run()
+        served_ids = [result.id for result in results["search"][0]]
+
+        streamed_ids = [result["id"] for event in events if event["event"] == "results" for result in event["results"]]
+        self.assertEqual(served_ids, [result.id for result in self.stale])
+        self.assertEqual(streamed_ids, served_ids)
+        self.assertEqual(self.cache.stale_hits, 1)
+
+    async def test_refresh_does_not_stream_into_the_request(self):
+        events = []
+        await server.build_search_pipeline(self.request, events.append).run()
+        await asyncio.gather(*self.cache._refreshing.values())
+
+        self.assertEqual(self.refresh_calls, [None])
+        self.assertEqual(self.cache.refreshes, 1)
+        fresh_ids = {result.id for result in self.fresh}
+        streamed_ids = {result["id"] for event in events if event["event"] == "results" for result in event["results"]}
+        self.assertFalse(streamed_ids & fresh_ids)
+
+    async def test_close_cancels_pending_refresh(self):
+        started = asyncio.Event()
+
+        async def slow_search(query, max_results, date_range, on_results=None):
+            started.set()
+            await asyncio.sleep(3600)
+
+        with mock.patch.object(server.search_manager, "search_prioritizing_google", slow_search):
+            await server.cached_search(self.request.query, self.request.max_results, self.request.date_range)
+            await started.wait()
+            refresh = next(iter(self.cache._refreshing.values()))
+            await self.cache.close()
+
+        self.assertTrue(refresh.cancelled())
+        self.assertEqual(self.cache.refreshes, 0)
+
+
+class CachedSearchStreamingTests(unittest.IsolatedAsyncioTestCase):
+    """Which cache outcomes reach on_results as a "cache" batch"""
+
+    async def asyncSetUp(self):
+        self.cache = SearchResultCache(MemoryCollection(), ttl=60, stale_ttl=3600)
+        self.results = make_results("live", 5)
+        self.reformulated = []
+
+        async def search_prioritizing_google(query, max_results, date_range, on_results=None):
+            await asyncio.sleep(0.01)
+            if on_results:
+                on_results("Google PDF Search", self.results)
+            return self.results, len(self.results)
+
+        async def reformulate(query):
+            self.reformulated.append(query)
+            return f"{query} filetype:pdf"
+
+        for patch in [mock.patch.object(server, "result_cache", self.cache),
+                      mock.patch.object(server.search_manager, "search_prioritizing_google", search_prioritizing_google),
+                      mock.patch.object(server.ai_engine, "reformulate_query_for_google", reformulate)]:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_miss_streams_live_batches_only(self):
+        batches = []
+        await server.cached_search("sparse attention", 5, "2015-2025", lambda source, batch: batches.append(source))
+        self.assertEqual(batches, ["Google PDF Search"])
+
+    async def test_fresh_hit_streams_cached_results(self):
+        await server.cached_search("sparse attention", 5, "2015-2025")
+        batches = []
+        await server.cached_search("sparse attention", 5, "2015-2025", lambda source, batch: batches.append((source, len(batch))))
+        self.assertEqual(batches, [("cache", 5)])
+
+    async def test_coalesced_caller_gets_cache_batch(self):
+        leader, follower = [], []
+        await asyncio.gather(
+            server.cached_search("sparse attention", 5, "2015-2025", lambda source, batch: leader.append(source)),
+            server.cached_search("sparse attention", 5, "2015-2025", lambda source, batch: follower.append(source)),
+        )
+        self.assertEqual(leader, ["Google PDF Search"])
+        self.assertEqual(follower, ["cache"])
+
+    # The cache is checked on the user's query, before reformulation
+
+    async def test_hit_skips_reformulation(self):
+        await server.cached_search("sparse attention", 5, "2015-2025")
+        _, _, reformulated_query = await server.cached_search("sparse attention", 5, "2015-2025")
+        self.assertEqual(self.reformulated, ["sparse attention"])
+        self.assertEqual(reformulated_query, "sparse attention filetype:pdf")
+
+    async def test_case_and_spacing_share_an_entry(self):
+        await server.cached_search("Sparse Attention", 5, "2015-2025")
+        await server.cached_search("  sparse   attention ", 5, "2015-2025")
+        self.assertEqual(len(self.reformulated), 1)
+        self.assertEqual(self.cache.memory_hits, 1)
+
+    async def test_hit_reports_cached_reformulation(self):
+        await server.cached_search("sparse attention", 5, "2015-2025")
+        reformulated = []
+        await server.cached_search("sparse attention", 5, "2015-2025", on_reformulated=reformulated.append)
+        self.assertEqual(reformulated, ["sparse attention filetype:pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from singleflight import SingleFlight  # noqa: E402
+
+
+class SingleFlightTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.flight = SingleFlight("test")
+        self.started = 0
+        self.release = asyncio.Event()
+        self.cancelled = asyncio.Event()
+
+    async def work(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        return "result"
+
+    async def test_concurrent_callers_share_one_call(self):
+        first = asyncio.create_task(self.flight.do("key", self.work))
+        second = asyncio.create_task(self.flight.do("key", self.work))
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await asyncio.gather(first, second), ["result", "result"])
+        self.assertEqual(self.started, 1)
+        self.assertEqual(self.flight.stats()["coalesced"], 1)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    async def test_first_caller_disconnect_keeps_work_for_others(self):
+        first = asyncio.create_task(self.flight.do("key", self.work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(self.flight.do("key", self.work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.assertFalse(self.cancelled.is_set())
+
+        self.release.set()
+        self.assertEqual(await second, "result")
+        self.assertEqual(self.started, 1)
+        self.assertEqual(self.flight.stats()["abandoned"], 0)
+
+    async def test_work_is_cancelled_once_every_caller_left(self):
+        first = asyncio.create_task(self.flight.do("key", self.work))
+        second = asyncio.create_task(self.flight.do("key", self.work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.wait_for(self.cancelled.wait(), timeout=1)
+        self.assertEqual(self.flight.stats()["abandoned"], 1)
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+    async def test_abandoned_key_starts_fresh(self):
+        first = asyncio.create_task(self.flight.do("key", self.work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        again = asyncio.create_task(self.flight.do("key", self.work))
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await again, "result")
+        self.assertEqual(self.started, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from text_features import TextFeatureExtractor  # noqa: E402
+
+
+class FileSizeTests(unittest.TestCase):
+    def setUp(self):
+        self.extractor = TextFeatureExtractor()
+
+    def size(self, snippet):
+        return self.extractor.extract("Untitled", snippet).file_size
+
+    def test_size_after_a_letter_keeps_the_whole_number(self):
+        # Regression: the match used to start inside the number ("1 MB")
+        self.assertEqual(self.size("v2.1mb"), "2.1 MB")
+        self.assertEqual(self.size("Download report-v12.5MB"), "12.5 MB")
+
+    def test_sizes_in_running_text(self):
+        self.assertEqual(self.size("PDF, 3.4 MB, 12 pages"), "3.4 MB")
+        self.assertEqual(self.size("about 850kb"), "850 KB")
+        self.assertEqual(self.size("2 gigabytes of data"), "2 GIGABYTES")
+
+    def test_size_is_read_from_the_snippet_only(self):
+        features = self.extractor.extract("Slides 5 MB", "no size here", "https://example.org/7mb.pdf")
+        self.assertIsNone(features.file_size)
+
+    def test_size_and_year_in_one_snippet(self):
+        features = self.extractor.extract("Annual report", "Published 2019, v2.1mb download")
+        self.assertEqual(features.file_size, "2.1 MB")
+        self.assertEqual(features.year, 2019)
+
+    def test_batch_matches_single_extraction(self):
+        items = [("A study", "v2.1mb"), ("Survey", "1.5 MB in 2021"), ("Notes", "")]
+        batch = self.extractor.extract_batch((title, snippet, "") for title, snippet in items)
+        self.assertEqual([f.file_size for f in batch], [self.size(snippet) for _, snippet in items])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from pymongo.errors import BulkWriteError  # noqa: E402
+
+from write_buffer import POLICY_SPILL, WriteBehindBuffer  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+        self.failures = []  # exceptions raised by the next insert_many calls
+        self.during_insert = None
+
+    async def insert_many(self, docs, ordered=True):
+        if self.during_insert:
+            self.during_insert()
+        if self.failures:
+            raise self.failures.pop(0)
+        self.docs.extend(docs)
+
+
+class WriteBehindBufferTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.spill_path = Path(directory.name) / "test.spill.jsonl"
+        self.collection = FakeCollection()
+        self.flushed = []
+
+        async def on_flush(batch):
+            self.flushed.extend(doc["n"] for doc in batch)
+
+        self.buffer = WriteBehindBuffer(self.collection, "test", batch_size=2, flush_interval=60,
+                                        max_pending=4, policy=POLICY_SPILL,
+                                        spill_path=str(self.spill_path), on_flush=on_flush)
+
+    def add(self, *numbers):
+        for n in numbers:
+            self.buffer.add({"n": n})
+
+    def pending(self):
+        return [doc["n"] for doc in self.buffer._pending]
+
+    async def test_failed_batch_is_requeued_in_order(self):
+        self.add(1, 2, 3)
+        self.collection.failures.append(ConnectionError("down"))
+        self.assertEqual(await self.buffer.flush(), 0)
+        self.assertEqual(self.pending(), [1, 2, 3])
+        self.assertEqual(self.buffer.flush_errors, 1)
+
+        self.assertEqual(await self.buffer.flush(), 3)
+        self.assertEqual([doc["n"] for doc in self.collection.docs], [1, 2, 3])
+        self.assertEqual(self.flushed, [1, 2, 3])
+
+    async def test_partial_failure_requeues_only_failed_documents(self):
+        self.add(1, 2)
+        self.collection.failures.append(BulkWriteError({
+            "nInserted": 0,
+            "writeErrors": [{"index": 0, "code": 11000}, {"index": 1, "code": 121}]
+        }))
+        await self.buffer.flush()
+        # The duplicate was written by an earlier attempt; only the real failure stays
+        self.assertEqual(self.pending(), [2])
+        self.assertEqual(self.flushed, [1])
+
+    async def test_overflow_spills_oldest_and_replays_after_success(self):
+        self.add(1, 2, 3, 4, 5, 6)
+        self.assertEqual(self.pending(), [3, 4, 5, 6])
+        self.assertEqual(self.buffer.spilled, 2)
+        self.assertTrue(self.spill_path.exists())
+
+        await self.buffer.flush()
+        self.assertFalse(self.spill_path.exists())
+        self.assertEqual(self.buffer.replayed, 2)
+        self.assertEqual(self.pending(), [1, 2])
+
+        await self.buffer.flush()
+        self.assertEqual(sorted(doc["n"] for doc in self.collection.docs), [1, 2, 3, 4, 5, 6])
+
+    async def test_requeue_beyond_bound_spills_newest(self):
+        self.add(1, 2, 3, 4)
+        self.collection.failures.append(ConnectionError("down"))
+        # More documents arrive while the failing batch is in flight
+        self.collection.during_insert = lambda: self.add(5, 6)
+        await self.buffer.flush()
+        self.assertEqual(self.pending(), [1, 2, 3, 4])
+        self.assertEqual(self.buffer.spilled, 2)
+
+    async def test_spill_is_not_replayed_while_writes_fail(self):
+        self.add(1, 2, 3, 4, 5)
+        self.collection.failures.append(ConnectionError("down"))
+        await self.buffer.flush()
+        self.assertTrue(self.spill_path.exists())
+        self.assertEqual(self.buffer.replayed, 0)
+
+    async def test_close_spills_what_cannot_be_written(self):
+        self.add(1, 2)
+        self.collection.failures.append(ConnectionError("down"))
+        await self.buffer.close(timeout=1)
+        self.assertEqual(self.buffer.spilled, 2)
+        self.assertEqual(self.pending(), [])
+
+        self.buffer.add({"n": 3})
+        await self.buffer.flush()
+        self.assertEqual(self.pending(), [1, 2])
+        await self.buffer.flush()
+        self.assertEqual(sorted(doc["n"] for doc in self.collection.docs), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()